@@ -1,28 +1,14 @@
 ﻿
 import mysql.connector
 from mysql.connector import pooling
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Database configuration from environment variables
-DB_HOST = os.getenv('DB_HOST', 'localhost')
-DB_USER = os.getenv('DB_USER', 'root')
-DB_PASSWORD = os.getenv('DB_PASSWORD', '')
-DB_NAME = os.getenv('DB_NAME', 'brightbuy')
-DB_PORT = int(os.getenv('DB_PORT', 3306))
-
-# Database connection configuration
-DB_CONFIG = {
-    'host': DB_HOST,
-    'user': DB_USER,
-    'password': DB_PASSWORD,
-    'database': DB_NAME,
-    'port': DB_PORT,
-    'autocommit': False,
-    'raise_on_warnings': True
-}
+from mysql.connector.errors import PoolError
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from app.db_config import DB_CONFIG, DB_POOL_WAIT_SECONDS
+from app.services.query_stats import query_stats
 
 # Create connection pool for better performance
 connection_pool = mysql.connector.pooling.MySQLConnectionPool(
@@ -32,21 +18,215 @@ connection_pool = mysql.connector.pooling.MySQLConnectionPool(
     **DB_CONFIG
 )
 
+# mysql-connector's pool raises PoolError at once when it is empty; checkouts
+# take a slot here first so a burst queues for up to DB_POOL_WAIT_SECONDS instead
+_pool_slots = threading.BoundedSemaphore(connection_pool.pool_size)
+
+class PoolStats:
+    """Pool occupancy counters, kept per process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.held_seconds_total = 0.0
+        # Threads blocked in get_connection() on a full pool, and checkouts that
+        # gave up after DB_POOL_WAIT_SECONDS
+        self.waiting = 0
+        self.exhausted = 0
+
+    def wait_started(self):
+        with self.lock:
+            self.waiting += 1
+
+    def wait_finished(self, exhausted: bool = False):
+        with self.lock:
+            self.waiting -= 1
+            if exhausted:
+                self.exhausted += 1
+
+    def checked_out(self):
+        with self.lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def returned(self, held_seconds: float):
+        with self.lock:
+            self.in_use -= 1
+            self.held_seconds_total += held_seconds
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "pool_size": connection_pool.pool_size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "waiting": self.waiting,
+                "exhausted": self.exhausted,
+                "held_seconds_total": round(self.held_seconds_total, 3)
+            }
+
+
+pool_stats = PoolStats()
+
+# Connections checked out and not yet returned in the current request (or,
+# outside requests, the current thread's context). A mutable set, so that
+# get_db's setup and teardown, which Starlette runs on different threadpool
+# threads with copies of the request's context, update the same one.
+_held_connections: ContextVar[Optional[set]] = ContextVar('held_connections', default=None)
+
+
+def _context_connections() -> set:
+    held = _held_connections.get()
+    if held is None:
+        held = set()
+        _held_connections.set(held)
+    return held
+
+
+class ConnectionTrackingMiddleware:
+    """ASGI middleware: one set of held connections per HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _held_connections.set(set())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _held_connections.reset(token)
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times statements and fetches into query_stats"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._entry = None
+
+    def execute(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, *args, **kwargs)
+        finally:
+            self._entry = query_stats.executed(operation, time.perf_counter() - started)
+
+    def executemany(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, *args, **kwargs)
+        finally:
+            self._entry = query_stats.executed(operation, time.perf_counter() - started)
+
+    def callproc(self, procname, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.callproc(procname, *args, **kwargs)
+        finally:
+            self._entry = query_stats.executed(f"CALL {procname}", time.perf_counter() - started)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._entry is not None:
+                query_stats.fetched(self._entry, time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(lambda: self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TrackedConnection:
+    """Pooled connection wrapper that reports checkout/return to pool_stats"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._checked_out_at = time.monotonic()
+        self._returned = False
+        # The request that checked it out, whichever thread closes it
+        self._holders = _context_connections()
+        self._holders.add(self)
+        pool_stats.checked_out()
+
+    def close(self):
+        try:
+            self._connection.close()
+        finally:
+            if not self._returned:
+                self._returned = True
+                self._holders.discard(self)
+                pool_stats.returned(time.monotonic() - self._checked_out_at)
+                _pool_slots.release()
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def connections_held_by_current_request() -> int:
+    """Pooled connections the current request has checked out and not returned"""
+    return len(_held_connections.get() or ())
+
+
 def get_connection():
     """
     Get a connection from the pool.
-    Returns a mysql.connector connection object.
+    Returns a mysql.connector connection object. With every connection
+    checked out, waits up to DB_POOL_WAIT_SECONDS for one to be returned
+    and raises PoolError after that.
     """
-    return connection_pool.get_connection()
+    if not _pool_slots.acquire(blocking=False):
+        pool_stats.wait_started()
+        acquired = _pool_slots.acquire(timeout=DB_POOL_WAIT_SECONDS)
+        pool_stats.wait_finished(exhausted=not acquired)
+        if not acquired:
+            raise PoolError("Failed getting connection; pool exhausted")
+    try:
+        return TrackedConnection(connection_pool.get_connection())
+    except BaseException:
+        _pool_slots.release()
+        raise
 
 def get_db():
     """
     Dependency function to get database connection.
     Returns a mysql.connector connection object with dictionary cursor.
     """
-    connection = connection_pool.get_connection()
+    connection = get_connection()
     try:
         yield connection
     finally:
-        if connection.is_connected():
-            connection.close()
\ No newline at end of file
+        # Close even a dropped connection: the pool takes it back (and
+        # reconnects it on the next checkout) and its slot is freed
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Database connection settings from environment variables.
+Kept apart from app.database, which opens the connection pool on import,
+so the CLIs under database/ and the restore tool can read the settings
+without connecting ten times first.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', '')
+DB_NAME = os.getenv('DB_NAME', 'brightbuy')
+DB_PORT = int(os.getenv('DB_PORT', 3306))
+
+# Database connection configuration
+DB_CONFIG = {
+    'host': DB_HOST,
+    'user': DB_USER,
+    'password': DB_PASSWORD,
+    'database': DB_NAME,
+    'port': DB_PORT,
+    'autocommit': False,
+    'raise_on_warnings': True
+}
+
+# How long get_connection() waits for a free pooled connection before giving up
+DB_POOL_WAIT_SECONDS = float(os.getenv('DB_POOL_WAIT_SECONDS', 5))
@@ -0,0 +1,180 @@
+"""
+Logging Configuration
+One setup for the API process, called from app/main.py before the app is
+built:
+
+  - Records are handed to a queue in the calling thread and written by a
+    QueueListener thread, so request threads never wait on stdout.
+  - The message is formatted in the listener. On request paths log with
+    %-style arguments (logger.info("Order %s placed", order_id)) rather
+    than f-strings, so a disabled level costs one level check and an
+    enabled one defers the formatting.
+  - Output is one JSON object per line (LOG_FORMAT=json, the default) or
+    the usual text line (LOG_FORMAT=text) for local runs.
+  - RequestIdMiddleware gives each request an id (the caller's X-Request-ID
+    when it sent a usable one) that is echoed in the response and added to
+    every record logged while serving it, including from the threadpool.
+  - LOG_LEVEL sets the root level; LOG_LEVELS overrides it per module:
+        LOG_LEVELS=app.security=DEBUG,app.services.stock=WARNING
+
+Scripts run from the command line keep logging.basicConfig in their
+__main__ blocks.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+REQUEST_ID_HEADER = b"x-request-id"
+_USABLE_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """'app.security=DEBUG,app.services.stock=WARNING' -> {logger name: level}"""
+    levels = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, level = item.partition('=')
+        value = logging.getLevelName(level.strip().upper())
+        if not name.strip() or not isinstance(value, int):
+            raise ValueError(f"Bad LOG_LEVELS entry: {item.strip()!r}")
+        levels[name.strip()] = value
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; extra= fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.threadName and record.threadName != 'MainThread':
+            entry["thread"] = record.threadName
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that stamps the request id in the calling thread and, unlike
+    the stock QueueHandler, leaves message formatting to the listener thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        if record.exc_info and not record.exc_text:
+            # Render while the frames are still current
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, 'request_id') or record.request_id is None:
+            record.request_id = '-'
+        return super().format(record)
+
+
+def setup_logging(level: str = LOG_LEVEL, levels: str = LOG_LEVELS, log_format: str = LOG_FORMAT, stream=None):
+    """Route the root logger through a queue to one stream handler; safe to call twice"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else _TextFormatter(TEXT_FORMAT))
+
+    # Neither formatter prints them, so don't look them up for every record
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(RequestContextQueueHandler(log_queue))
+    root.setLevel(level)
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """ASGI middleware: request id per HTTP request, echoed as X-Request-ID"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode('latin-1')
+                if _USABLE_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER, request_id.encode('latin-1'))
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,8 +1,21 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import mysql.connector
-from app.database import get_db
+from app.logging_config import RequestIdMiddleware, setup_logging
+
+# Before the app modules are imported, so their import-time messages are kept
+setup_logging()
+
 from app.services import db_export
+from app.services.stock import stock_service
+from app.services.inventory_alerts import inventory_alerts
+from app.services.report_jobs import report_jobs
+from app.services.report_scheduler import report_scheduler, REPORT_SCHEDULER_ENABLED
+from app.database import ConnectionTrackingMiddleware
+from app.services.query_stats import QueryStatsMiddleware
+from app.services.request_metrics import RequestMetricsMiddleware
+from app.services.profiler import ProfilerMiddleware
 
 from app.routes import category
 from app.routes import user 
@@ -16,8 +29,25 @@ from app.routes import analytics
 from app.routes import admin
 from app.routes import favorite
 from app.routes import reports
+from app.routes import metrics
+from app.routes import health
+from app.routes import profiler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background workers
+    stock_service.start()
+    inventory_alerts.start()
+    if REPORT_SCHEDULER_ENABLED:
+        report_scheduler.start()
+    yield
+    stock_service.stop()
+    inventory_alerts.stop()
+    report_scheduler.stop()
+    report_jobs.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -27,21 +57,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-@app.get("/ping-db")
-def ping_db():
-    try:
-        # Get a connection from the pool
-        db_gen = get_db()
-        db = next(db_gen)
-        cursor = db.cursor()
-        cursor.execute("SELECT 1")
-        result = cursor.fetchone()
-        cursor.close()
-        db.close()
-        return {"status": "Database connected successfully!", "result": result}
-    except Exception as e:
-        return {"error": str(e)}
+# Pooled connections held per request, for the report jobs' dispatch check
+app.add_middleware(ConnectionTrackingMiddleware)
+# Per-request SQL counts and timings (GET /metrics/queries)
+app.add_middleware(QueryStatsMiddleware)
+# Request counts, latency and in-flight requests per route (GET /metrics)
+app.add_middleware(RequestMetricsMiddleware)
+# Counts requests for route profiling sessions; a no-op while none runs
+app.add_middleware(ProfilerMiddleware)
+# Outermost, so every record logged for a request carries its id
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(category.router)
 app.include_router(user.router)
@@ -55,6 +80,9 @@ app.include_router(analytics.router)
 app.include_router(admin.router)
 app.include_router(favorite.router)
 app.include_router(reports.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.include_router(profiler.router)
 
 
 
@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Optional
+import logging
 import mysql.connector
 from app.database import get_db
 from app.security import get_admin_user
 from app.schemas.product import ProductCreate
 from app.schemas.variant import VariantCreate
+from app.services.catalog_facets import catalog_facets
+from app.services.stock import stock_service
+from app.services.variant_attributes import attribute_index
+from app.services import customer_stats
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+logger = logging.getLogger(__name__)
+
 @router.get("/users", response_model=List[dict])
 def list_users(db: mysql.connector.MySQLConnection = Depends(get_db), admin=Depends(get_admin_user)):
     cursor = db.cursor(dictionary=True)
@@ -87,6 +94,8 @@ def create_product(
                     (v.variant_name, product_id, v.price, v.quantity, v.SKU)
                 )
             db.commit()
+        attribute_index.invalidate()
+        catalog_facets.invalidate()
         return {"product_id": product_id, "product_name": product.product_name, "category_id": product.category_id, "description": product.description}
     except Exception as e:
         db.rollback()
@@ -103,15 +112,12 @@ def delete_product(
     cursor = db.cursor(dictionary=True)
     try:
         # Check if product exists
-        print(f"DEBUG: Checking if product {product_id} exists...")
         cursor.execute("SELECT product_id FROM product WHERE product_id = %s", (product_id,))
         product = cursor.fetchone()
         
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        print(f"DEBUG: Product {product_id} found, checking orders...")
-        
         # Check if product variants exist in orders
         cursor.execute(
             """SELECT COUNT(*) as count 
@@ -128,7 +134,6 @@ def delete_product(
                 detail=f"Cannot delete product: it has {result['count']} order(s). Please archive instead of delete."
             )
         
-        print(f"DEBUG: No orders found, deleting variants one by one...")
         # Fetch all variant IDs for this product
         cursor.execute("SELECT variant_id FROM variant WHERE product_id = %s", (product_id,))
         variant_ids = [row['variant_id'] for row in cursor.fetchall()]
@@ -140,29 +145,26 @@ def delete_product(
                 delete_variant(variant_id, db=db, admin=admin)
                 variants_deleted += 1
             except HTTPException as ve:
-                print(f"DEBUG: Could not delete variant {variant_id}: {ve.detail}")
+                logger.warning("Product %s: could not delete variant %s: %s", product_id, variant_id, ve.detail)
                 # Optionally, you can choose to raise or skip
                 continue
-        print(f"DEBUG: Deleted {variants_deleted} variants")
         
         # Delete favorites related to this product (if table exists)
-        print(f"DEBUG: Attempting to delete favorites...")
         try:
             cursor.execute("DELETE FROM favorite_product WHERE product_id = %s", (product_id,))
-            print(f"DEBUG: Deleted favorites successfully")
         except mysql.connector.Error as e:
             # Ignore if table doesn't exist (error 1146)
-            print(f"DEBUG: Favorite deletion error: {e.errno} - {e.msg}")
             if e.errno != 1146:
                 raise
+            logger.debug("favorite_product table missing, no favorites to delete")
         
-        print(f"DEBUG: Deleting product...")
         # Delete the product
         cursor.execute("DELETE FROM product WHERE product_id = %s", (product_id,))
         
-        print(f"DEBUG: Committing transaction...")
         db.commit()
-        print(f"DEBUG: Commit successful!")
+        logger.info("Product %s deleted with %s variants", product_id, variants_deleted)
+        attribute_index.invalidate()
+        catalog_facets.invalidate()
         
         return {
             "deleted": True, 
@@ -171,13 +173,10 @@ def delete_product(
             "message": "Product and associated data deleted successfully"
         }
     except HTTPException:
-        print(f"DEBUG: HTTPException occurred, rolling back...")
         db.rollback()
         raise
     except mysql.connector.Error as e:
-        print(f"DEBUG: MySQL Error: {e.errno} - {e.msg}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Deleting product %s failed (MySQL error %s)", product_id, e.errno)
         db.rollback()
         # Handle foreign key constraint errors
         if e.errno == 1451:
@@ -187,9 +186,7 @@ def delete_product(
             )
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
-        print(f"DEBUG: General Exception: {type(e).__name__} - {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Deleting product %s failed", product_id)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
     finally:
@@ -208,6 +205,8 @@ def update_variant_quantity(
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Variant not found")
         db.commit()
+        stock_service.set_quantity(variant_id, quantity)
+        catalog_facets.invalidate()
         return {"updated": True, "variant_id": variant_id, "quantity": quantity}
     except HTTPException:
         db.rollback()
@@ -243,6 +242,9 @@ def delete_variant(
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Variant not found")
         db.commit()
+        stock_service.remove(variant_id)
+        attribute_index.invalidate()
+        catalog_facets.invalidate()
         return {"deleted": True, "variant_id": variant_id}
     except HTTPException:
         db.rollback()
@@ -292,6 +294,9 @@ def add_variant_to_product(
         )
         db.commit()
         variant_id = cursor.lastrowid
+        stock_service.set_quantity(variant_id, variant.quantity)
+        attribute_index.invalidate()
+        catalog_facets.invalidate()
         return {
             "variant_id": variant_id,
             "variant_name": variant.variant_name,
@@ -323,12 +328,13 @@ def update_payment_status(
     cursor = db.cursor(dictionary=True)
     try:
         # Check if order exists
-        cursor.execute("SELECT order_id FROM orders WHERE order_id = %s", (order_id,))
-        if cursor.fetchone() is None:
+        cursor.execute("SELECT order_id, user_id FROM orders WHERE order_id = %s", (order_id,))
+        order = cursor.fetchone()
+        if order is None:
             raise HTTPException(status_code=404, detail="Order not found")
         
-        # Check if payment record exists
-        cursor.execute("SELECT payment_id, payment_status FROM payment WHERE order_id = %s", (order_id,))
+        # Check if payment record exists (locked, so the stats move exactly once)
+        cursor.execute("SELECT payment_id, payment_status FROM payment WHERE order_id = %s FOR UPDATE", (order_id,))
         payment = cursor.fetchone()
         
         if not payment:
@@ -347,6 +353,7 @@ def update_payment_status(
             "UPDATE payment SET payment_status = 'completed' WHERE order_id = %s",
             (order_id,)
         )
+        customer_stats.payment_status_changed(cursor, order['user_id'], payment['payment_status'], 'completed')
         db.commit()
         
         return {
@@ -7,6 +7,12 @@ from typing import Optional, List
 from datetime import date, timedelta
 from pydantic import BaseModel
 from app.database import get_db
+from app.security import get_admin_user
+from app.services import customer_sketches, customer_stats, sales_facts
+from app.services.inventory_alerts import (
+    ALERT_LEVELS, LOW_STOCK_TRACK_LIMIT, alert_level, describe_variants, inventory_alerts, low_stock_index
+)
+from app.services.sales_analytics import sales_query_engine
 import mysql.connector
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
@@ -63,6 +69,11 @@ class LowStockVariant(BaseModel):
     sold_last_30_days: int
 
 
+class AlertSubscriptionCreate(BaseModel):
+    email: Optional[str] = None
+    min_level: str = "CRITICAL"
+
+
 class SalesReportDay(BaseModel):
     sale_date: date
     total_orders: int
@@ -221,12 +232,12 @@ def get_products_by_category(
 
 
 # ============================================
-# 3. GetLowStockVariants - Inventory Management
+# 3. Low Stock - Inventory Management
 # ============================================
 
 @router.get("/inventory/low-stock", response_model=dict)
 def get_low_stock_variants(
-    threshold: int = Query(10, description="Stock level threshold", ge=1),
+    threshold: int = Query(10, description="Stock level threshold", ge=1, le=LOW_STOCK_TRACK_LIMIT),
     db: mysql.connector.MySQLConnection = Depends(get_db)
 ):
     """
@@ -239,14 +250,39 @@ def get_low_stock_variants(
     - Alert level (OUT OF STOCK/CRITICAL/LOW)
     - Sales velocity (last 30 days)
     - Product and category information
+    
+    Reads the in-memory low-stock index (kept current on every stock change)
+    and the daily variant rollup instead of scanning variants and orders.
     """
     cursor = None
     try:
-        cursor = db.cursor(dictionary=True)
+        tracked = low_stock_index.below(threshold)
         
-        # Call stored procedure
-        cursor.execute("CALL GetLowStockVariants(%s)", (threshold,))
-        low_stock_items = cursor.fetchall()
+        cursor = db.cursor(dictionary=True)
+        variant_ids = [variant_id for variant_id, _ in tracked]
+        variants = describe_variants(cursor, variant_ids)
+        velocity = sales_facts.variant_velocity(cursor, variant_ids)
+        
+        low_stock_items = []
+        for variant_id, quantity in tracked:
+            variant = variants.get(variant_id)
+            if not variant:
+                continue
+            low_stock_items.append({
+                "variant_id": variant_id,
+                "variant_name": variant['variant_name'],
+                "current_stock": quantity,
+                "price": variant['price'],
+                "SKU": variant['SKU'],
+                "product_id": variant['product_id'],
+                "product_name": variant['product_name'],
+                "category_id": variant['category_id'],
+                "category_name": variant['category_name'],
+                "threshold": threshold,
+                "stock_alert_level": alert_level(quantity, threshold),
+                "sold_last_30_days": velocity.get(variant_id, 0)
+            })
+        low_stock_items.sort(key=lambda item: (item['current_stock'], -item['sold_last_30_days']))
         
         # Categorize by alert level
         out_of_stock = [item for item in low_stock_items if item.get('stock_alert_level') == 'OUT OF STOCK']
@@ -268,7 +304,7 @@ def get_low_stock_variants(
                 "out_of_stock": len(out_of_stock),
                 "critical": len(critical),
                 "low": len(low),
-                "total_value_at_risk": round(total_value_at_risk, 2)
+                "total_value_at_risk": round(float(total_value_at_risk), 2)
             },
             "low_stock_items": low_stock_items,
             "urgent_action_required": out_of_stock + critical  # Items needing immediate attention
@@ -284,10 +320,106 @@ def get_low_stock_variants(
         raise HTTPException(status_code=500, detail=f"Error fetching low stock: {str(e)}")
 
 
+@router.get("/inventory/alerts/subscriptions", response_model=dict)
+def list_alert_subscriptions(
+    db: mysql.connector.MySQLConnection = Depends(get_db),
+    admin=Depends(get_admin_user)
+):
+    """List the admins subscribed to low-stock alert emails"""
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        subscriptions = inventory_alerts.list_subscriptions(cursor)
+        cursor.close()
+        return {"subscriptions": subscriptions, "alert_levels": list(ALERT_LEVELS)}
+    except mysql.connector.Error as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/inventory/alerts/subscriptions", response_model=dict, status_code=201)
+def subscribe_to_alerts(
+    subscription: AlertSubscriptionCreate,
+    db: mysql.connector.MySQLConnection = Depends(get_db),
+    admin=Depends(get_admin_user)
+):
+    """
+    Subscribe the current admin to low-stock alert emails
+    
+    - **email**: Where to send alerts (default: the admin's account email)
+    - **min_level**: Least severe level that sends an email (LOW, CRITICAL or OUT OF STOCK)
+    """
+    email = subscription.email or admin.get("email")
+    if not email:
+        raise HTTPException(status_code=400, detail="email is required")
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        inventory_alerts.subscribe(cursor, int(admin["sub"]), email, subscription.min_level.upper())
+        db.commit()
+        cursor.close()
+        return {"subscribed": True, "email": email, "min_level": subscription.min_level.upper()}
+    except ValueError as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except mysql.connector.Error as e:
+        db.rollback()
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.delete("/inventory/alerts/subscriptions/{subscription_id}", response_model=dict)
+def unsubscribe_from_alerts(
+    subscription_id: int,
+    db: mysql.connector.MySQLConnection = Depends(get_db),
+    admin=Depends(get_admin_user)
+):
+    """Remove a low-stock alert subscription"""
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        if not inventory_alerts.unsubscribe(cursor, subscription_id):
+            raise HTTPException(status_code=404, detail="Subscription not found")
+        db.commit()
+        cursor.close()
+        return {"unsubscribed": True, "subscription_id": subscription_id}
+    except HTTPException:
+        if cursor:
+            cursor.close()
+        raise
+    except mysql.connector.Error as e:
+        db.rollback()
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 # ============================================
 # 4. GetSalesReport - Sales Analytics
 # ============================================
 
+def _unique_customers(cursor, start_date: date, end_date: date) -> int:
+    """Approximate distinct customers from the daily sketches, exact if a day has none"""
+    estimate, sketched_days = customer_sketches.unique_customers(cursor, start_date, end_date)
+    cursor.execute(
+        "SELECT DISTINCT sale_date FROM sales_daily_orders WHERE sale_date BETWEEN %s AND %s",
+        (start_date, end_date)
+    )
+    order_days = {row['sale_date'] for row in cursor.fetchall()}
+    if order_days <= sketched_days:
+        return estimate
+    # Days from before the sketches were built
+    cursor.execute(
+        """SELECT COUNT(DISTINCT user_id) AS unique_customers FROM orders
+           WHERE order_date >= %s AND order_date < DATE_ADD(%s, INTERVAL 1 DAY)""",
+        (start_date, end_date)
+    )
+    return cursor.fetchone()['unique_customers']
+
+
 @router.get("/sales/report", response_model=dict)
 def get_sales_report(
     start_date: Optional[date] = Query(None, description="Start date (default: 30 days ago)"),
@@ -317,6 +449,10 @@ def get_sales_report(
         if not end_date:
             end_date = date.today()
         
+        # Distinct customers over the whole range: per-day counts can't be
+        # added up, so merge the daily customer sketches instead
+        total_customers = _unique_customers(cursor, start_date, end_date)
+        
         # Call stored procedure
         cursor.execute("CALL GetSalesReport(%s, %s)", (start_date, end_date))
         daily_sales = cursor.fetchall()
@@ -324,7 +460,6 @@ def get_sales_report(
         # Calculate summary statistics
         total_revenue = sum(float(day.get('total_revenue', 0) or 0) for day in daily_sales)
         total_orders = sum(int(day.get('total_orders', 0) or 0) for day in daily_sales)
-        total_customers = len(set(day.get('unique_customers', 0) for day in daily_sales if day.get('unique_customers')))
         total_items_sold = sum(int(day.get('total_items_sold', 0) or 0) for day in daily_sales)
         
         # Calculate averages
@@ -373,6 +508,62 @@ def get_sales_report(
         raise HTTPException(status_code=500, detail=f"Error generating sales report: {str(e)}")
 
 
+@router.get("/sales/query", response_model=dict)
+def query_sales(
+    start_date: Optional[date] = Query(None, description="Start date (default: 90 days ago)"),
+    end_date: Optional[date] = Query(None, description="End date (default: today)"),
+    grain: str = Query("day", description="day, week, month or quarter"),
+    group_by: Optional[str] = Query(None, description="Comma-separated dimensions: category, payment_method, city"),
+    metrics: str = Query("orders,revenue", description="Comma-separated: orders, revenue, items_sold, first_orders, average_order_value, repeat_order_rate, unique_customers"),
+    compare: Optional[str] = Query(None, description="previous (period over period) or year (year over year)"),
+    db: mysql.connector.MySQLConnection = Depends(get_db)
+):
+    """
+    Query the daily sales rollups at any grain
+    
+    - **grain**: bucket size (week = Monday to Sunday)
+    - **group_by**: dimensions to break each bucket down by
+    - **metrics**: measures to return
+    - **compare**: add previous_<metric> and <metric>_change_pct per row
+    
+    Example: week-over-week revenue by category
+    `/analytics/sales/query?grain=week&group_by=category&metrics=revenue&compare=previous`
+    """
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        
+        if not end_date:
+            end_date = date.today()
+        if not start_date:
+            start_date = end_date - timedelta(days=90)
+        
+        result = sales_query_engine.query(
+            cursor,
+            start_date,
+            end_date,
+            grain=grain,
+            group_by=[d.strip() for d in group_by.split(',') if d.strip()] if group_by else [],
+            metrics=[m.strip() for m in metrics.split(',') if m.strip()],
+            compare=compare
+        )
+        cursor.close()
+        return result
+        
+    except ValueError as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except mysql.connector.Error as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Error querying sales: {str(e)}")
+
+
 # ============================================
 # 5. UpdateOrderStatus - Order Management
 # ============================================
@@ -409,6 +600,20 @@ def update_order_status(
                 detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
             )
         
+        # Customer statistics move with the status, in the same transaction;
+        # the rows stay locked until commit
+        cursor.execute(
+            """SELECT o.user_id, d.delivery_status
+               FROM orders o
+               LEFT JOIN delivery d ON o.order_id = d.order_id
+               WHERE o.order_id = %s
+               FOR UPDATE""",
+            (order_id,)
+        )
+        current = cursor.fetchone()
+        if current:
+            customer_stats.delivery_status_changed(cursor, current['user_id'], current['delivery_status'], status_update.status)
+        
         # Try stored procedure first; if missing, fallback to direct UPDATE
         result = None
         try:
@@ -453,6 +658,7 @@ def update_order_status(
         
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except HTTPException:
+        db.rollback()
         raise
     except Exception as e:
         db.rollback()
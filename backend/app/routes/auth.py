@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 import bcrypt
+import logging
 import secrets
 from datetime import datetime, timedelta
 from app.database import get_db
@@ -9,6 +10,8 @@ from app.services.email_service import send_verification_code
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+logger = logging.getLogger(__name__)
+
 @router.post("/login", response_model=LoginResponse)
 def login_user(login_data: LoginRequest, db=Depends(get_db)):
     cursor = None
@@ -105,7 +108,7 @@ def login_user(login_data: LoginRequest, db=Depends(get_db)):
     except Exception as e:
         if cursor:
             cursor.close()
-        print(" Internal Error:", e)
+        logger.exception("Login failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -204,5 +207,5 @@ def verify_2fa_code(verify_data: VerifyCodeRequest, db=Depends(get_db)):
     except Exception as e:
         if cursor:
             cursor.close()
-        print(" Internal Error:", e)
+        logger.exception("2FA verification failed")
         raise HTTPException(status_code=500, detail=str(e))
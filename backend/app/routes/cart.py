@@ -6,6 +6,7 @@ from app.database import get_db
 from app.schemas.cart import CartOut, AddToCartRequest, CartItemOut
 from typing import List, Optional
 from pydantic import BaseModel
+from app.services.delivery import delivery_estimator
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
@@ -306,77 +307,26 @@ def get_delivery_estimate(
     try:
         cursor = db.cursor(dictionary=True)
         
-        # Get cart
-        cursor.execute("SELECT cart_id FROM cart WHERE user_id = %s", (user_id,))
-        cart = cursor.fetchone()
-        
-        if not cart:
-            return {"estimated_days": None, "message": "Cart not found"}
-        
-        # Get cart items with stock quantities
+        # Get cart and its items in one query; stock and city data are cached
         cursor.execute(
-            """SELECT ci.variant_id, ci.quantity, v.quantity as stock_quantity
-               FROM cart_item ci
-               JOIN variant v ON ci.variant_id = v.variant_id
-               WHERE ci.cart_id = %s""",
-            (cart['cart_id'],)
+            """SELECT c.cart_id, ci.variant_id, ci.quantity
+               FROM cart c
+               LEFT JOIN cart_item ci ON ci.cart_id = c.cart_id AND ci.variant_id IS NOT NULL
+               WHERE c.user_id = %s""",
+            (user_id,)
         )
-        cart_items = cursor.fetchall()
+        rows = cursor.fetchall()
         
+        if not rows:
+            return {"estimated_days": None, "message": "Cart not found"}
+        
+        cart_items = [row for row in rows if row['variant_id'] is not None]
         if not cart_items:
             return {"estimated_days": None, "message": "Cart is empty"}
         
-        estimated_days = 0
-        has_low_stock = False
-        is_main_city = None
-        
-        if delivery_method == "store_pickup":
-            estimated_days = 2
-        elif delivery_method == "home_delivery":
-            # Check for low stock (quantity < 10)
-            has_low_stock = any(item['stock_quantity'] < 10 for item in cart_items)
-            
-            if not city:
-                # Return range-based estimate when no city selected
-                main_city_days = 5 + (3 if has_low_stock else 0)
-                other_city_days = 7 + (3 if has_low_stock else 0)
-                return {
-                    "estimated_days": None,
-                    "delivery_method": delivery_method,
-                    "has_low_stock": has_low_stock,
-                    "main_city_estimate": main_city_days,
-                    "other_city_estimate": other_city_days,
-                    "message": "Select city for exact estimate"
-                }
-            
-            # Check if city is a main city
-            cursor.execute(
-                "SELECT Is_main_city FROM location WHERE city = %s",
-                (city,)
-            )
-            location = cursor.fetchone()
-            
-            if not location:
-                # Default to non-main city if not found
-                base_days = 7
-                is_main_city = False
-            else:
-                is_main_city = location['Is_main_city']
-                base_days = 5 if is_main_city else 7
-            
-            if has_low_stock:
-                base_days += 3
-            
-            estimated_days = base_days
-        
+        estimate = delivery_estimator.estimate_cart(cursor, cart_items, delivery_method, city=city)
         cursor.close()
-        
-        return {
-            "estimated_days": estimated_days,
-            "delivery_method": delivery_method,
-            "has_low_stock": has_low_stock,
-            "is_main_city": is_main_city
-        }
+        return estimate
         
     except Exception as e:
         if cursor:
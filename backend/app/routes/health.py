@@ -0,0 +1,31 @@
+"""
+Health Routes
+Liveness and readiness probes (app/services/health.py). Neither needs a token.
+"""
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.health import readiness
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+def healthz():
+    """Liveness: the process is serving requests. Never touches the database."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+def readyz():
+    """Readiness: database reachable (checked at most every few seconds) and caches loaded"""
+    result = readiness.check()
+    return JSONResponse(result, status_code=200 if result["ready"] else 503)
+
+
+@router.get("/ping-db")
+def ping_db():
+    """Database check kept for existing callers; shares the readiness probe's cached result"""
+    error = readiness.database_error()
+    if error:
+        return {"error": error}
+    return {"status": "Database connected successfully!"}
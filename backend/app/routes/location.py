@@ -3,6 +3,7 @@ Location Routes
 """
 from fastapi import APIRouter, Depends, HTTPException
 from app.database import get_db
+from app.services.delivery import location_cache
 from typing import List
 from pydantic import BaseModel
 
@@ -25,8 +26,7 @@ def get_all_cities(db=Depends(get_db)):
     Get all cities from location table
     """
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM location ORDER BY city")
-    cities = cursor.fetchall()
+    cities = location_cache.all(cursor)
     cursor.close()
     return cities
 
@@ -37,8 +37,7 @@ def get_city_by_name(city_name: str, db=Depends(get_db)):
     Get city details by name
     """
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM location WHERE city = %s", (city_name,))
-    city = cursor.fetchone()
+    city = location_cache.by_name(cursor, city_name)
     cursor.close()
     if not city:
         raise HTTPException(status_code=404, detail="City not found")
@@ -0,0 +1,41 @@
+"""
+Metrics Routes
+Runtime statistics for operators. GET /metrics is the Prometheus scrape
+endpoint (app/services/request_metrics.py); when METRICS_TOKEN is set the
+scraper must send it as a bearer token. /metrics/queries reports the
+per-route SQL accounting kept by app/services/query_stats.py.
+"""
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.security import get_admin_user
+from app.services.query_stats import query_stats
+from app.services.request_metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text exposition of request, database, cache and queue metrics"""
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
+@router.get("/queries")
+def get_query_stats(
+    top: int = Query(20, ge=1, le=200, description="Statement fingerprints to return, by total time"),
+    admin = Depends(get_admin_user)
+):
+    """Statements and database time per request for each route, and the costliest statements"""
+    return query_stats.snapshot(top)
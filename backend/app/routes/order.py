@@ -1,16 +1,114 @@
 """
 Order Routes - MySQL Connector Version
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from app.database import get_connection
-from app.schemas.order import OrderOut, CreateOrderRequest, OrderItemOut
-from typing import List
-from datetime import datetime, timedelta
+from app.security import get_current_user
+from app.schemas.order import OrderOut, CreateOrderRequest, OrderItemOut, ReservationOut
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 from app.services.email_service import send_order_confirmation
+from app.services.stock import stock_service
+from app.services.stock_reservations import reservation_manager, InsufficientStock, ReservationLimitExceeded
+from app.services.delivery import delivery_estimator, location_cache, PICKUP_DAYS
+from app.services import customer_sketches, customer_stats, sales_facts
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+def _cart_reservation_items(cart_items) -> dict:
+    items = {}
+    for item in cart_items:
+        items[item['variant_id']] = items.get(item['variant_id'], 0) + item['quantity']
+    return items
+
+
+def _reserve_cart(cursor, user_id: int, cart_items, reservation_id=None):
+    """
+    Reuse the caller's reservation when it still covers the cart,
+    otherwise reserve the cart now, replacing any reservation the user
+    already holds. Raises HTTPException(400) on insufficient stock or
+    when the cart is over the reservation limit.
+    """
+    items = _cart_reservation_items(cart_items)
+    if reservation_id:
+        reservation = reservation_manager.get(reservation_id)
+        if reservation and reservation.owner == user_id and reservation.items == items:
+            return reservation
+    try:
+        return reservation_manager.reserve(cursor, items, owner=user_id)
+    except ReservationLimitExceeded as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InsufficientStock as e:
+        names = {item['variant_id']: item.get('variant_name') for item in cart_items}
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient stock for {names.get(e.variant_id) or e.variant_id}. Available: {e.available}, Requested: {e.requested}"
+        )
+
+
+def _reservation_owner(current_user: Dict[str, Any], user_id: Optional[int]) -> int:
+    """The authenticated user; a user_id naming someone else is rejected (403)"""
+    owner = int(current_user["sub"])
+    if user_id is not None and user_id != owner:
+        raise HTTPException(status_code=403, detail="Cannot manage another user's reservation")
+    return owner
+
+
+@router.post("/reserve", response_model=ReservationOut, status_code=status.HTTP_201_CREATED)
+def reserve_cart_stock(user_id: Optional[int] = None, current_user: Dict[str, Any] = Depends(get_current_user)):
+    """
+    Reserve stock for the authenticated user's cart when checkout starts.
+    The reservation expires automatically unless confirmed by /checkout.
+    """
+    user_id = _reservation_owner(current_user, user_id)
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            """SELECT ci.variant_id, ci.quantity, v.variant_name
+               FROM cart c
+               JOIN cart_item ci ON ci.cart_id = c.cart_id
+               JOIN variant v ON ci.variant_id = v.variant_id
+               WHERE c.user_id = %s""",
+            (user_id,)
+        )
+        cart_items = cursor.fetchall()
+        if not cart_items:
+            raise HTTPException(status_code=400, detail="Cart is empty")
+
+        reservation = _reserve_cart(cursor, user_id, cart_items)
+        return ReservationOut(
+            reservation_id=reservation.reservation_id,
+            user_id=user_id,
+            items=reservation.items,
+            expires_in_seconds=reservation_manager.ttl_seconds
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reserving stock: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+@router.delete("/reserve/{reservation_id}")
+def release_cart_reservation(
+    reservation_id: str,
+    user_id: Optional[int] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Release the user's checkout reservation (e.g. when the user leaves checkout)"""
+    user_id = _reservation_owner(current_user, user_id)
+    if not reservation_manager.release(reservation_id, owner=user_id):
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return {"released": True, "reservation_id": reservation_id}
+
 
 @router.post("/checkout", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
 def create_order_from_cart(request: CreateOrderRequest):
@@ -20,6 +118,8 @@ def create_order_from_cart(request: CreateOrderRequest):
     """
     conn = None
     cursor = None
+    reservation = None
+    location = None
     
     try:
         conn = get_connection()
@@ -32,12 +132,8 @@ def create_order_from_cart(request: CreateOrderRequest):
         address_id = request.address_id
         if request.delivery_method == "home_delivery":
             if request.address_details:
-                # Find city_id from location table
-                cursor.execute(
-                    "SELECT city_id, Is_main_city FROM location WHERE city = %s",
-                    (request.address_details.city,)
-                )
-                location = cursor.fetchone()
+                # Find city_id from the cached location table
+                location = location_cache.by_name(cursor, request.address_details.city)
                 
                 if not location:
                     raise HTTPException(
@@ -77,9 +173,11 @@ def create_order_from_cart(request: CreateOrderRequest):
         # Get cart items with variant details
         cursor.execute(
             """SELECT ci.cart_item_id, ci.variant_id, ci.quantity, 
-                      v.variant_name, v.price, v.quantity as stock_quantity
+                      v.variant_name, v.price, v.quantity as stock_quantity,
+                      p.category_id
                FROM cart_item ci
                JOIN variant v ON ci.variant_id = v.variant_id
+               JOIN product p ON v.product_id = p.product_id
                WHERE ci.cart_id = %s""",
             (cart['cart_id'],)
         )
@@ -88,26 +186,24 @@ def create_order_from_cart(request: CreateOrderRequest):
         if not cart_items or len(cart_items) == 0:
             raise HTTPException(status_code=400, detail="Cart is empty")
         
-        # Calculate total amount and check stock
+        # Reserve stock (soft hold; the conditional decrement below is the final check)
+        reservation = _reserve_cart(cursor, request.user_id, cart_items, request.reservation_id)
+        
+        # Calculate total amount
         total_amount = 0.0
         for item in cart_items:
-            # Check stock
-            if item['stock_quantity'] < item['quantity']:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for {item['variant_name']}. Available: {item['stock_quantity']}, Requested: {item['quantity']}"
-                )
             total_amount += float(item['price']) * item['quantity']
         
         # Create order
+        order_date = datetime.utcnow()
         cursor.execute(
             """INSERT INTO orders (cart_id, user_id, order_date, total_amount) 
                VALUES (%s, %s, %s, %s)""",
-            (cart['cart_id'], request.user_id, datetime.utcnow(), total_amount)
+            (cart['cart_id'], request.user_id, order_date, total_amount)
         )
         order_id = cursor.lastrowid
         
-        # Create order items and reduce variant quantities
+        # Create order items
         for cart_item in cart_items:
             item_price = float(cart_item['price'])
             
@@ -117,13 +213,6 @@ def create_order_from_cart(request: CreateOrderRequest):
                    VALUES (%s, %s, %s, %s)""",
                 (order_id, cart_item['variant_id'], cart_item['quantity'], item_price)
             )
-            
-            # Reduce variant quantity
-            cursor.execute(
-                """UPDATE variant SET quantity = quantity - %s 
-                   WHERE variant_id = %s""",
-                (cart_item['quantity'], cart_item['variant_id'])
-            )
         
         # Create payment record
         payment_status = "completed" if request.payment_method == "card" else "pending"
@@ -150,42 +239,21 @@ def create_order_from_cart(request: CreateOrderRequest):
         # Calculate estimated delivery date
         estimated_date = None
         estimated_days = 0
-        is_main_city = False
+        city_id = None
         
         if request.delivery_method == "home_delivery" and address_id:
-            # Get Is_main_city for the address
-            cursor.execute(
-                """SELECT l.Is_main_city 
-                   FROM address a 
-                   JOIN location l ON a.city_id = l.city_id 
-                   WHERE a.address_id = %s""",
-                (address_id,)
-            )
-            location_info = cursor.fetchone()
-            if location_info:
-                is_main_city = location_info['Is_main_city']
-            
-            # Calculate base delivery days based on city type
-            base_days = 5 if is_main_city else 7
-            
-            # Check for low stock variants (quantity < 10)
-            has_low_stock = False
-            for cart_item in cart_items:
-                if cart_item['stock_quantity'] < 10:
-                    has_low_stock = True
-                    break
-            
-            # Add 3 days if any variant has low stock
-            if has_low_stock:
-                base_days += 3
-            
-            estimated_days = base_days
-            estimated_date = (datetime.utcnow() + timedelta(days=base_days)).date()
+            city_id = location['city_id'] if location else None
+            if city_id is None:
+                cursor.execute("SELECT city_id FROM address WHERE address_id = %s", (address_id,))
+                address = cursor.fetchone()
+                city_id = address['city_id'] if address else None
+            estimate = delivery_estimator.estimate_cart(cursor, cart_items, request.delivery_method, city_id=city_id)
+            estimated_days = estimate['estimated_days']
+            estimated_date = delivery_estimator.estimated_date(estimated_days)
             
         elif request.delivery_method == "store_pickup":
-            # Store pickup: 2 days
-            estimated_days = 2
-            estimated_date = (datetime.utcnow() + timedelta(days=2)).date()
+            estimated_days = PICKUP_DAYS
+            estimated_date = delivery_estimator.estimated_date(estimated_days)
         
         # Create delivery record
         cursor.execute(
@@ -193,6 +261,10 @@ def create_order_from_cart(request: CreateOrderRequest):
                VALUES (%s, %s, %s, %s, %s)""",
             (order_id, request.delivery_method, address_id, estimated_date, "pending")
         )
+
+        # Customer statistics, in the same transaction as the order
+        customer_stats.record_order(cursor, request.user_id, total_amount, order_date, payment_status, "pending")
+        first_order = sales_facts.is_first_order(cursor, request.user_id, order_id)
         
         # Clear cart items
         cursor.execute("DELETE FROM cart_item WHERE cart_id = %s", (cart['cart_id'],))
@@ -200,8 +272,39 @@ def create_order_from_cart(request: CreateOrderRequest):
         # Reset cart total
         cursor.execute("UPDATE cart SET total_amount = 0 WHERE cart_id = %s", (cart['cart_id'],))
 
+        # Reduce variant quantities late, so the variant row locks are only
+        # held for the commit; the guard rejects the order if stock ran out
+        for variant_id in sorted(reservation.items):
+            quantity = reservation.items[variant_id]
+            cursor.execute(
+                """UPDATE variant SET quantity = quantity - %s 
+                   WHERE variant_id = %s AND quantity >= %s""",
+                (quantity, variant_id, quantity)
+            )
+            if cursor.rowcount == 0:
+                item_name = next((i['variant_name'] for i in cart_items if i['variant_id'] == variant_id), variant_id)
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Insufficient stock for {item_name}. Requested: {quantity}"
+                )
+
+        # Daily sales rollups last: every checkout of the day upserts these
+        # (sharded) rows, so keep their locks to the commit
+        sales_facts.record_order(
+            cursor, order_id, order_date, request.payment_method, city_id,
+            [(item['variant_id'], item['category_id'], item['quantity'], float(item['price'])) for item in cart_items],
+            first_order
+        )
+        customer_sketches.record_customer(cursor, order_date.date(), request.user_id)
+
         # Commit transaction
         conn.commit()
+        
+        # Confirm the reservation and write the decrements through to the stock cache
+        reservation_manager.confirm(reservation.reservation_id)
+        for variant_id, quantity in reservation.items.items():
+            stock_service.adjust(variant_id, -quantity)
+        reservation = None
 
         # Get order items with product details for response
         cursor.execute(
@@ -287,6 +390,9 @@ def create_order_from_cart(request: CreateOrderRequest):
             detail=f"Error creating order: {str(e)}"
         )
     finally:
+        # Return reserved units if the order did not commit
+        if reservation:
+            reservation_manager.release(reservation.reservation_id)
         if cursor:
             cursor.close()
         if conn:
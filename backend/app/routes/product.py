@@ -2,8 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 import mysql.connector
 from typing import List, Optional
 from app.database import get_db
-from app.schemas.product import ProductOut
+from app.schemas.product import ProductOut, CatalogPageOut
 from app.schemas.variant import ProductWithVariantsOut
+from app.services.catalog_facets import catalog_facets
+from app.services.stock import stock_service
+from app.services.variant_attributes import (
+    attribute_index,
+    load_product_attributes,
+    load_variant_attributes,
+    parse_attribute_filters,
+)
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -11,8 +19,14 @@ router = APIRouter(prefix="/products", tags=["Products"])
 def get_products(
     category_id: Optional[int] = Query(None),
     category_name: Optional[str] = Query(None),
+    attribute: Optional[List[str]] = Query(None, description="Attribute filter as name:value (e.g. Colour:Black), repeatable"),
     db: mysql.connector.MySQLConnection = Depends(get_db)
 ):
+    try:
+        attribute_filters = parse_attribute_filters(attribute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     cursor = db.cursor(dictionary=True)
     try:
         # Build query to get products with category info
@@ -27,15 +41,36 @@ def get_products(
             FROM product p
             LEFT JOIN category c ON p.category_id = c.category_id
         """
+        conditions = []
+        params = []
         
         if category_id:
-            cursor.execute(base_query + " WHERE p.category_id = %s", (category_id,))
+            conditions.append("p.category_id = %s")
+            params.append(category_id)
         elif category_name:
-            cursor.execute(base_query + " WHERE c.category_name = %s", (category_name,))
-        else:
-            cursor.execute(base_query)
+            conditions.append("c.category_name = %s")
+            params.append(category_name)
+        
+        if attribute_filters:
+            # Resolve attribute filters from the in-memory index
+            product_ids = attribute_index.match_products(cursor, attribute_filters)
+            if not product_ids:
+                cursor.close()
+                return []
+            conditions.append(f"p.product_id IN ({', '.join(['%s'] * len(product_ids))})")
+            params.extend(sorted(product_ids))
+        
+        if conditions:
+            base_query += " WHERE " + " AND ".join(conditions)
+        cursor.execute(base_query, tuple(params))
         
         products = cursor.fetchall()
+        
+        # Attributes for every listed product in one grouped query
+        product_attributes = load_product_attributes(
+            cursor,
+            [p["product_id"] for p in products] if conditions else None
+        )
         cursor.close()
         
         # Format response to match schema
@@ -49,7 +84,8 @@ def get_products(
                 "category": {
                     "category_id": p["cat_id"],
                     "category_name": p["category_name"]
-                } if p.get("cat_id") else None
+                } if p.get("cat_id") else None,
+                "attributes": product_attributes.get(p["product_id"], {})
             }
             result.append(product_dict)
         
@@ -59,6 +95,104 @@ def get_products(
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+@router.get("/catalog", response_model=CatalogPageOut)
+def get_catalog_page(
+    category_id: Optional[int] = Query(None),
+    attribute: Optional[List[str]] = Query(None, description="Attribute filter as name:value (e.g. Colour:Black), repeatable"),
+    in_stock: Optional[bool] = Query(None),
+    price_bucket: Optional[List[int]] = Query(None, description="Price bucket index from the price_buckets facet, repeatable"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(24, ge=1, le=100),
+    db: mysql.connector.MySQLConnection = Depends(get_db)
+):
+    """
+    Get a page of products together with facet counts (category, attribute
+    values, stock and price bucket) for the current filter set
+    """
+    try:
+        attribute_filters = parse_attribute_filters(attribute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        
+        product_ids, facets = catalog_facets.search(
+            cursor,
+            category_id=category_id,
+            attribute_filters=attribute_filters,
+            in_stock=in_stock,
+            price_buckets=set(price_bucket) if price_bucket else None
+        )
+        page_ids = product_ids[(page - 1) * page_size:page * page_size]
+        
+        products = []
+        if page_ids:
+            cursor.execute(f"""
+                SELECT 
+                    p.product_id, 
+                    p.product_name, 
+                    p.category_id, 
+                    p.description,
+                    c.category_id as cat_id,
+                    c.category_name
+                FROM product p
+                LEFT JOIN category c ON p.category_id = c.category_id
+                WHERE p.product_id IN ({', '.join(['%s'] * len(page_ids))})
+                ORDER BY p.product_id
+            """, tuple(page_ids))
+            rows = cursor.fetchall()
+            product_attributes = load_product_attributes(cursor, page_ids)
+            
+            for p in rows:
+                products.append({
+                    "product_id": p["product_id"],
+                    "product_name": p["product_name"],
+                    "category_id": p["category_id"],
+                    "description": p["description"],
+                    "category": {
+                        "category_id": p["cat_id"],
+                        "category_name": p["category_name"]
+                    } if p.get("cat_id") else None,
+                    "attributes": product_attributes.get(p["product_id"], {})
+                })
+        
+        cursor.close()
+        
+        return {
+            "total": len(product_ids),
+            "page": page,
+            "page_size": page_size,
+            "products": products,
+            "facets": facets
+        }
+    except Exception as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/variants/availability", response_model=dict)
+def get_variants_availability(
+    variant_id: List[int] = Query(..., description="Variant IDs, repeatable"),
+    db: mysql.connector.MySQLConnection = Depends(get_db)
+):
+    """Batch stock availability for the given variants"""
+    if len(variant_id) > 200:
+        raise HTTPException(status_code=400, detail="At most 200 variant IDs per request")
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        quantities = stock_service.get_availability(cursor, variant_id)
+        cursor.close()
+        return {"variants": stock_service.describe(quantities)}
+    except Exception as e:
+        if cursor:
+            cursor.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.get("/{product_id}/variants/", response_model=ProductWithVariantsOut)
 def get_product_with_variants(product_id: int, db: mysql.connector.MySQLConnection = Depends(get_db)):
     """Get a specific product with all its variants"""
@@ -98,6 +232,12 @@ def get_product_with_variants(product_id: int, db: mysql.connector.MySQLConnecti
             WHERE product_id = %s
         """, (product_id,))
         variants = cursor.fetchall()
+        stock_service.prime(variants)
+        
+        # Attach attributes for all variants with one grouped query
+        variant_attributes = load_variant_attributes(cursor, [v["variant_id"] for v in variants])
+        for variant in variants:
+            variant["attributes"] = variant_attributes.get(variant["variant_id"], [])
         
         cursor.close()
         
@@ -0,0 +1,109 @@
+"""
+Profiler Routes
+Admin-only access to the sampling profiler (app/services/profiler.py).
+Start a session, poll it, then download the collapsed stacks and feed them
+to flamegraph.pl or speedscope:
+
+    POST /admin/profiler/sample?seconds=30
+    POST /admin/profiler/route?route=/orders/checkout&requests=20
+    GET  /admin/profiler/{session_id}
+    GET  /admin/profiler/{session_id}/collapsed
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from typing import Optional
+from app.security import get_admin_user
+from app.services.profiler import (
+    PROFILE_INTERVAL_SECONDS, PROFILE_MAX_REQUESTS, PROFILE_MAX_SECONDS, ProfilerBusy, profiler
+)
+
+router = APIRouter(prefix="/admin/profiler", tags=["Admin"])
+
+
+def _find_route(request: Request, target: str, method: Optional[str]) -> APIRoute:
+    """Route by path template (/orders/checkout) or endpoint name (create_order_from_cart)"""
+    matches = [
+        route for route in request.app.routes
+        if isinstance(route, APIRoute) and target in (route.path, route.name)
+        and (method is None or method.upper() in route.methods)
+    ]
+    if not matches:
+        raise HTTPException(status_code=404, detail=f"No route matches {target}")
+    if len(matches) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{target} matches {len(matches)} routes; pass method to pick one"
+        )
+    return matches[0]
+
+
+def _get_session(session_id: str):
+    session = profiler.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profiling session not found")
+    return session
+
+
+@router.post("/sample", status_code=status.HTTP_202_ACCEPTED)
+def start_sampling(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(PROFILE_INTERVAL_SECONDS * 1000, ge=1, le=1000),
+    all_threads: bool = Query(False, description="Keep stacks that never enter app code"),
+    admin = Depends(get_admin_user)
+):
+    """Sample every thread of this process for the given number of seconds"""
+    try:
+        session = profiler.sample(seconds, interval_ms / 1000, app_only=not all_threads)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.to_dict()
+
+
+@router.post("/route", status_code=status.HTTP_202_ACCEPTED)
+def start_route_profile(
+    request: Request,
+    route: str = Query(..., description="Path template or endpoint name"),
+    method: Optional[str] = Query(None),
+    requests: int = Query(10, ge=1, le=PROFILE_MAX_REQUESTS),
+    timeout: float = Query(120, gt=0, le=PROFILE_MAX_SECONDS, description="Give up after this many seconds"),
+    interval_ms: float = Query(PROFILE_INTERVAL_SECONDS * 1000, ge=1, le=1000),
+    admin = Depends(get_admin_user)
+):
+    """Profile the next requests to one route"""
+    target = _find_route(request, route, method)
+    try:
+        session = profiler.profile_route(target, requests, timeout, interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.to_dict()
+
+
+@router.get("")
+def list_profiles(admin = Depends(get_admin_user)):
+    return [session.to_dict() for session in profiler.sessions()]
+
+
+@router.get("/{session_id}")
+def get_profile(session_id: str, admin = Depends(get_admin_user)):
+    return _get_session(session_id).to_dict()
+
+
+@router.get("/{session_id}/collapsed", response_class=PlainTextResponse)
+def download_profile(session_id: str, admin = Depends(get_admin_user)):
+    """Collapsed stacks so far (the session may still be running)"""
+    session = _get_session(session_id)
+    return PlainTextResponse(
+        session.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{session.session_id}.collapsed"'}
+    )
+
+
+@router.delete("/{session_id}")
+def stop_profile(session_id: str, admin = Depends(get_admin_user)):
+    _get_session(session_id)
+    return profiler.stop(session_id).to_dict()
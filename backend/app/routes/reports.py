@@ -1,192 +1,173 @@
 """
 PDF Report Generation Routes
 Generates formatted PDF reports using database views
+
+Every report also takes format=csv|ndjson|arrow, which streams the raw rows
+straight from the cursor into a temp file (app/services/report_export.py)
+instead of rendering a PDF.
+
+Reports are fetched in the request and rendered by the report job workers
+(app/services/report_jobs.py); finished PDFs are cached on disk. Endpoints
+take a pooled connection only for the fetch phase instead of depending on
+get_db, which would keep it checked out until the response is sent.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
+from app.database import get_connection, pool_stats
 from app.security import get_admin_user
-from datetime import datetime, date
-from io import BytesIO
+from app.schemas.report import ReportJobRequest, ReportJobOut
+from app.services.report_jobs import report_jobs, ReportJob
+from app.services.report_export import EXPORT_FORMATS, export_filename, export_report
+from app.services.report_rendering import REPORTS, ReportNotFound
 from typing import Optional
-import mysql.connector
-
-# Import ReportLab for PDF generation
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-    from reportlab.platypus import Image as RLImage
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-except ImportError:
-    raise ImportError("Please install reportlab: pip install reportlab")
+import os
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# Longest a synchronous report endpoint waits for its render
+REPORT_SYNC_TIMEOUT_SECONDS = 120
+
+
+def _submit(report_type: str, params: dict, wait: bool) -> ReportJob:
+    """
+    Fetch the report rows with a pooled connection, return the connection,
+    then render. The connection is never held while the PDF is laid out.
+    """
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        job, data = report_jobs.prepare(cursor, report_type, params)
+    except ReportNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown report type '{report_type}'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+    if data is not None:
+        job = report_jobs.dispatch(job, data)
+    if wait:
+        job.done.wait(REPORT_SYNC_TIMEOUT_SECONDS)
+    return job
+
 
-def create_header(elements, title, subtitle=None):
-    """Create a styled header for PDF reports"""
-    styles = getSampleStyleSheet()
-    
-    # Main title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=12,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
+def _file_response(job: ReportJob) -> FileResponse:
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Error generating report: {job.error}")
+    if job.status != "completed":
+        raise HTTPException(status_code=504, detail="Report generation timed out")
+    if not job.path or not os.path.exists(job.path):
+        raise HTTPException(status_code=410, detail="Report artifact expired, please request it again")
+    return FileResponse(job.path, media_type="application/pdf", filename=job.filename)
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _export(report_type: str, params: dict, fmt: str) -> FileResponse:
+    """
+    Stream the report rows to a temp file in fmt. The connection goes back to
+    the pool before the file is sent; the file is deleted after sending.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}', use pdf, {', '.join(EXPORT_FORMATS)}")
+    conn = None
+    cursor = None
+    try:
+        params = REPORTS[report_type].normalize_params(params)
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        path = export_report(cursor, report_type, params, fmt)
+    except ReportNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+    return FileResponse(
+        path,
+        media_type=EXPORT_FORMATS[fmt][1],
+        filename=export_filename(report_type, params, fmt),
+        background=BackgroundTask(_remove_file, path)
     )
-    elements.append(Paragraph(title, title_style))
-    
-    # Subtitle
-    if subtitle:
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#7F8C8D'),
-            spaceAfter=20,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph(subtitle, subtitle_style))
-    
-    # Divider
-    elements.append(Spacer(1, 0.2*inch))
-    return elements
-
-
-def create_footer_text():
-    """Generate footer text with timestamp"""
-    return f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')} | BrightBuy Sales System"
 
 
-@router.get("/quarterly-sales/{year}")
-def generate_quarterly_sales_report(
-    year: int,
-    db: mysql.connector.MySQLConnection = Depends(get_db),
+def _report(report_type: str, format: str = "pdf", **params) -> FileResponse:
+    try:
+        if format != "pdf":
+            return _export(report_type, params, format)
+        return _file_response(_submit(report_type, params, wait=True))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+
+
+@router.post("/jobs", response_model=ReportJobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+    request: ReportJobRequest,
     admin = Depends(get_admin_user)
 ):
     """
-    Generate PDF report for quarterly sales of a given year
+    Queue a report for background rendering.
+    Identical requests (same report, parameters and order data) reuse the
+    cached PDF or the render already in progress.
     """
-    cursor = None
     try:
-        cursor = db.cursor(dictionary=True)
-        
-        # Fetch data from view
-        cursor.execute("""
-            SELECT * FROM quarterly_sales_report 
-            WHERE year = %s 
-            ORDER BY quarter ASC
-        """, (year,))
-        
-        data = cursor.fetchall()
-        cursor.close()
-        
-        if not data:
-            raise HTTPException(status_code=404, detail=f"No sales data found for year {year}")
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        
-        # Header
-        elements = create_header(
-            elements,
-            f"Quarterly Sales Report - {year}",
-            f"Complete sales analysis for all quarters in {year}"
-        )
-        
-        # Summary statistics
-        total_revenue = sum(row['total_revenue'] for row in data)
-        total_orders = sum(row['total_orders'] for row in data)
-        
-        summary_style = getSampleStyleSheet()['Normal']
-        summary_style.fontSize = 11
-        summary_style.spaceAfter = 15
-        
-        summary_text = f"""
-        <b>Annual Summary:</b><br/>
-        Total Revenue: <b>${total_revenue:,.2f}</b> | 
-        Total Orders: <b>{total_orders:,}</b> | 
-        Average Order Value: <b>${total_revenue/total_orders if total_orders > 0 else 0:,.2f}</b>
-        """
-        elements.append(Paragraph(summary_text, summary_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Table data
-        table_data = [
-            ['Quarter', 'Total Orders', 'Customers', 'Revenue', 'Avg Order', 'Items Sold']
-        ]
-        
-        for row in data:
-            table_data.append([
-                row['quarter_label'],
-                f"{row['total_orders']:,}",
-                f"{row['unique_customers']:,}",
-                f"${row['total_revenue']:,.2f}",
-                f"${row['average_order_value']:,.2f}",
-                f"{row['total_items_sold']:,}"
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[1.2*inch, 1.2*inch, 1.2*inch, 1.3*inch, 1.2*inch, 1.2*inch])
-        table.setStyle(TableStyle([
-            # Header row
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ECF0F1')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 0.5*inch))
-        
-        # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph(create_footer_text(), footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=quarterly_sales_{year}.pdf"
-            }
-        )
-        
+        job = _submit(request.report_type, request.params, wait=False)
+        return ReportJobOut(**job.to_dict())
     except HTTPException:
         raise
     except Exception as e:
-        if cursor:
-            cursor.close()
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queueing report: {str(e)}")
+
+
+@router.get("/pool-stats")
+def get_pool_stats(admin = Depends(get_admin_user)):
+    """Database pool occupancy, to check reports aren't pinning connections"""
+    return pool_stats.snapshot()
+
+
+@router.get("/jobs/{job_id}")
+def get_report_job(job_id: str, admin = Depends(get_admin_user)):
+    """
+    Download the finished PDF of a report job.
+    Returns the job status with 202 while it is still rendering.
+    """
+    job = report_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job.status == "pending":
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=ReportJobOut(**job.to_dict()).model_dump())
+    return _file_response(job)
+
+
+@router.get("/quarterly-sales/{year}")
+def generate_quarterly_sales_report(
+    year: int,
+    format: str = Query("pdf", description="pdf, csv, ndjson or arrow"),
+    admin = Depends(get_admin_user)
+):
+    """
+    Generate PDF report for quarterly sales of a given year
+    """
+    return _report("quarterly-sales", format, year=year)
 
 
 @router.get("/top-selling-products")
@@ -194,688 +175,57 @@ def generate_top_selling_products_report(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     limit: int = Query(20, description="Number of top products to show"),
-    db: mysql.connector.MySQLConnection = Depends(get_db),
+    format: str = Query("pdf", description="pdf, csv, ndjson or arrow"),
     admin = Depends(get_admin_user)
 ):
     """
     Generate PDF report for top-selling products in a given period
     """
-    cursor = None
-    try:
-        cursor = db.cursor(dictionary=True)
-        
-        # Build query based on date filters
-        if start_date and end_date:
-            query = """
-                SELECT p.product_id, p.product_name, c.category_name,
-                       v.variant_name, v.SKU,
-                       SUM(oi.quantity) as total_quantity_sold,
-                       SUM(oi.quantity * oi.price) as total_revenue,
-                       AVG(oi.price) as average_price,
-                       COUNT(DISTINCT oi.order_id) as number_of_orders
-                FROM order_item oi
-                JOIN variant v ON oi.variant_id = v.variant_id
-                JOIN product p ON v.product_id = p.product_id
-                LEFT JOIN category c ON p.category_id = c.category_id
-                JOIN orders o ON oi.order_id = o.order_id
-                WHERE DATE(o.order_date) BETWEEN %s AND %s
-                GROUP BY p.product_id, p.product_name, c.category_name, v.variant_name, v.SKU
-                ORDER BY total_quantity_sold DESC
-                LIMIT %s
-            """
-            cursor.execute(query, (start_date, end_date, limit))
-            period_text = f"Period: {start_date} to {end_date}"
-        else:
-            cursor.execute("SELECT * FROM top_selling_products LIMIT %s", (limit,))
-            period_text = "All Time"
-        
-        data = cursor.fetchall()
-        cursor.close()
-        
-        if not data:
-            raise HTTPException(status_code=404, detail="No sales data found for the specified period")
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        
-        # Header
-        elements = create_header(
-            elements,
-            "Top Selling Products Report",
-            period_text
-        )
-        
-        # Summary
-        total_revenue = sum(row['total_revenue'] for row in data)
-        total_quantity = sum(row['total_quantity_sold'] for row in data)
-        
-        summary_style = getSampleStyleSheet()['Normal']
-        summary_style.fontSize = 11
-        summary_style.spaceAfter = 15
-        
-        summary_text = f"""
-        <b>Summary:</b><br/>
-        Top {len(data)} Products | 
-        Total Units Sold: <b>{total_quantity:,}</b> | 
-        Total Revenue: <b>${total_revenue:,.2f}</b>
-        """
-        elements.append(Paragraph(summary_text, summary_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Table data
-        table_data = [
-            ['Rank', 'Product', 'Category', 'Variant', 'Units Sold', 'Revenue', 'Avg Price']
-        ]
-        
-        for idx, row in enumerate(data, 1):
-            table_data.append([
-                str(idx),
-                row['product_name'][:20],
-                (row['category_name'] or 'N/A')[:15],
-                row['variant_name'][:15],
-                f"{row['total_quantity_sold']:,}",
-                f"${row['total_revenue']:,.2f}",
-                f"${row['average_price']:,.2f}"
-            ])
-        
-        # Create table with adjusted widths
-        table = Table(table_data, colWidths=[0.5*inch, 1.8*inch, 1.2*inch, 1.2*inch, 0.9*inch, 1.1*inch, 0.9*inch])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27AE60')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#E8F8F5')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 0.5*inch))
-        
-        # Footer
-        footer_style = ParagraphStyle('Footer', parent=getSampleStyleSheet()['Normal'],
-                                     fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-        elements.append(Paragraph(create_footer_text(), footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        filename = f"top_selling_products_{start_date or 'all_time'}_to_{end_date or 'now'}.pdf"
-        
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        if cursor:
-            cursor.close()
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    return _report("top-selling-products", format, start_date=start_date, end_date=end_date, limit=limit)
 
 
 @router.get("/category-orders")
 def generate_category_orders_report(
-    db: mysql.connector.MySQLConnection = Depends(get_db),
+    format: str = Query("pdf", description="pdf, csv, ndjson or arrow"),
     admin = Depends(get_admin_user)
 ):
     """
     Generate PDF report for category-wise total number of orders
     """
-    cursor = None
-    try:
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM category_order_summary ORDER BY total_revenue DESC")
-        data = cursor.fetchall()
-        cursor.close()
-        
-        if not data:
-            raise HTTPException(status_code=404, detail="No category data found")
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        
-        # Header
-        elements = create_header(
-            elements,
-            "Category-wise Order Summary",
-            "Complete analysis of orders and revenue by product category"
-        )
-        
-        # Summary
-        total_orders = sum(row['total_orders'] for row in data)
-        total_revenue = sum(row['total_revenue'] for row in data)
-        
-        summary_style = getSampleStyleSheet()['Normal']
-        summary_style.fontSize = 11
-        summary_style.spaceAfter = 15
-        
-        summary_text = f"""
-        <b>Overall Summary:</b><br/>
-        Total Categories: <b>{len(data)}</b> | 
-        Total Orders: <b>{total_orders:,}</b> | 
-        Total Revenue: <b>${total_revenue:,.2f}</b>
-        """
-        elements.append(Paragraph(summary_text, summary_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Table data
-        table_data = [
-            ['Category', 'Orders', 'Items Sold', 'Revenue', 'Avg Order', 'Products']
-        ]
-        
-        for row in data:
-            table_data.append([
-                row['category_name'][:25],
-                f"{row['total_orders']:,}",
-                f"{row['total_items_sold']:,}",
-                f"${row['total_revenue']:,.2f}",
-                f"${row['average_order_value']:,.2f}",
-                f"{row['unique_products']}"
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[2*inch, 1*inch, 1*inch, 1.3*inch, 1.2*inch, 0.8*inch])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FADBD8')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 0.5*inch))
-        
-        # Footer
-        footer_style = ParagraphStyle('Footer', parent=getSampleStyleSheet()['Normal'],
-                                     fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-        elements.append(Paragraph(create_footer_text(), footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=category_orders_summary.pdf"}
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        if cursor:
-            cursor.close()
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    return _report("category-orders", format)
 
 
 @router.get("/customer-orders/{user_id}")
 def generate_customer_orders_report(
     user_id: int,
-    db: mysql.connector.MySQLConnection = Depends(get_db),
+    format: str = Query("pdf", description="pdf, csv, ndjson or arrow"),
     admin = Depends(get_admin_user)
 ):
     """
     Generate PDF report for customer-wise order summary and payment status
     """
-    cursor = None
-    try:
-        cursor = db.cursor(dictionary=True)
-        
-        # Get customer summary
-        cursor.execute("""
-            SELECT * FROM customer_summary_statistics 
-            WHERE user_id = %s
-        """, (user_id,))
-        
-        customer_summary = cursor.fetchone()
-        
-        if not customer_summary:
-            raise HTTPException(status_code=404, detail=f"No orders found for customer ID {user_id}")
-        
-        # Get detailed orders
-        cursor.execute("""
-            SELECT * FROM customer_order_payment_summary 
-            WHERE user_id = %s 
-            ORDER BY order_date DESC
-        """, (user_id,))
-        
-        orders = cursor.fetchall()
-        cursor.close()
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        
-        # Header
-        elements = create_header(
-            elements,
-            "Customer Order & Payment Report",
-            f"Complete order history for {customer_summary['full_name']} ({customer_summary['user_name']})"
-        )
-        
-        # Customer info
-        info_style = getSampleStyleSheet()['Normal']
-        info_style.fontSize = 10
-        info_style.spaceAfter = 10
-        
-        customer_info = f"""
-        <b>Customer Information:</b><br/>
-        Name: <b>{customer_summary['full_name']}</b> | 
-        Email: <b>{customer_summary['email']}</b> | 
-        User ID: <b>{customer_summary['user_id']}</b>
-        """
-        elements.append(Paragraph(customer_info, info_style))
-        
-        # Summary statistics
-        summary_text = f"""
-        <b>Order Statistics:</b><br/>
-        Total Orders: <b>{customer_summary['total_orders']}</b> | 
-        Total Spent: <b>${customer_summary['total_spent']:,.2f}</b> | 
-        Avg Order: <b>${customer_summary['average_order_value']:,.2f}</b><br/>
-        Completed Payments: <b>{customer_summary['completed_payments']}</b> | 
-        Pending Payments: <b>{customer_summary['pending_payments']}</b> | 
-        Delivered: <b>{customer_summary['delivered_orders']}</b>
-        """
-        elements.append(Paragraph(summary_text, info_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Orders table
-        table_data = [
-            ['Order ID', 'Date', 'Amount', 'Payment', 'Status', 'Delivery', 'Items']
-        ]
-        
-        for order in orders:
-            order_date = order['order_date'].strftime('%Y-%m-%d') if order['order_date'] else 'N/A'
-            payment_status = (order['payment_status'] or 'N/A').upper()
-            delivery_status = (order['delivery_status'] or 'N/A').upper()
-            
-            table_data.append([
-                str(order['order_id']),
-                order_date,
-                f"${order['total_amount']:,.2f}",
-                (order['payment_method'] or 'N/A').upper(),
-                payment_status[:8],
-                delivery_status[:8],
-                str(order['items_in_order'])
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[0.7*inch, 1*inch, 0.9*inch, 0.9*inch, 0.9*inch, 0.9*inch, 0.6*inch])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9B59B6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F4ECF7')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 0.5*inch))
-        
-        # Footer
-        footer_style = ParagraphStyle('Footer', parent=getSampleStyleSheet()['Normal'],
-                                     fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-        elements.append(Paragraph(create_footer_text(), footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=customer_orders_{user_id}.pdf"
-            }
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        if cursor:
-            cursor.close()
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    return _report("customer-orders", format, user_id=user_id)
 
 
 @router.get("/all-customers-summary")
 def generate_all_customers_summary_report(
-    db: mysql.connector.MySQLConnection = Depends(get_db),
+    limit: int = Query(50, ge=1, description="Number of top customers to include"),
+    format: str = Query("pdf", description="pdf, csv, ndjson or arrow"),
     admin = Depends(get_admin_user)
 ):
     """
     Generate PDF report for all customers with order and payment summary
     """
-    cursor = None
-    try:
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT * FROM customer_summary_statistics 
-            ORDER BY total_spent DESC 
-            LIMIT 50
-        """)
-        
-        data = cursor.fetchall()
-        cursor.close()
-        
-        if not data:
-            raise HTTPException(status_code=404, detail="No customer data found")
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        
-        # Header
-        elements = create_header(
-            elements,
-            "All Customers Summary Report",
-            f"Top {len(data)} customers by total spending"
-        )
-        
-        # Summary
-        total_revenue = sum(row['total_spent'] for row in data)
-        total_orders = sum(row['total_orders'] for row in data)
-        
-        summary_style = getSampleStyleSheet()['Normal']
-        summary_style.fontSize = 11
-        summary_style.spaceAfter = 15
-        
-        summary_text = f"""
-        <b>Overview:</b><br/>
-        Total Customers: <b>{len(data)}</b> | 
-        Total Orders: <b>{total_orders:,}</b> | 
-        Total Revenue: <b>${total_revenue:,.2f}</b>
-        """
-        elements.append(Paragraph(summary_text, summary_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Table data
-        table_data = [
-            ['Name', 'Email', 'Orders', 'Total Spent', 'Avg Order', 'Completed', 'Pending']
-        ]
-        
-        for row in data:
-            table_data.append([
-                row['user_name'][:15],
-                row['email'][:25],
-                str(row['total_orders']),
-                f"${row['total_spent']:,.2f}",
-                f"${row['average_order_value']:,.2f}",
-                str(row['completed_payments']),
-                str(row['pending_payments'])
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[1.1*inch, 1.8*inch, 0.7*inch, 1*inch, 0.9*inch, 0.8*inch, 0.7*inch])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495E')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ECF0F1')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 1), (-1, -1), 5),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 0.5*inch))
-        
-        # Footer
-        footer_style = ParagraphStyle('Footer', parent=getSampleStyleSheet()['Normal'],
-                                     fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-        elements.append(Paragraph(create_footer_text(), footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=all_customers_summary.pdf"}
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        if cursor:
-            cursor.close()
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    return _report("all-customers-summary", format, limit=limit)
 
 
 @router.get("/delivery-time-estimates")
 def generate_delivery_time_estimates_report(
-    db: mysql.connector.MySQLConnection = Depends(get_db),
+    format: str = Query("pdf", description="pdf, csv, ndjson or arrow"),
     admin = Depends(get_admin_user)
 ):
     """
     Generate PDF report for delivery time estimates for upcoming orders
     Shows orders that are not yet delivered with estimated delivery times
     """
-    cursor = None
-    try:
-        cursor = db.cursor(dictionary=True)
-        
-        # Get upcoming orders (not delivered yet) with delivery estimates
-        cursor.execute("""
-            SELECT 
-                o.order_id,
-                o.order_date,
-                o.total_amount,
-                u.user_name,
-                u.email,
-                u.name as full_name,
-                d.delivery_method,
-                d.delivery_status,
-                d.estimated_delivery_date,
-                a.city,
-                a.state,
-                l.Is_main_city,
-                CASE 
-                    WHEN d.delivery_method = 'store_pickup' THEN 2
-                    WHEN l.Is_main_city = 1 THEN 5
-                    ELSE 7
-                END as base_delivery_days,
-                DATEDIFF(d.estimated_delivery_date, o.order_date) as estimated_days,
-                COUNT(oi.order_item_id) as total_items
-            FROM orders o
-            JOIN user u ON o.user_id = u.user_id
-            LEFT JOIN delivery d ON o.order_id = d.order_id
-            LEFT JOIN address a ON d.address_id = a.address_id
-            LEFT JOIN location l ON a.city = l.city
-            LEFT JOIN order_item oi ON o.order_id = oi.order_id
-            WHERE d.delivery_status IN ('pending', 'processing', 'shipped')
-               OR d.delivery_status IS NULL
-            GROUP BY o.order_id, o.order_date, o.total_amount, u.user_name, u.email, 
-                     u.name, d.delivery_method, d.delivery_status, d.estimated_delivery_date,
-                     a.city, a.state, l.Is_main_city
-            ORDER BY o.order_date DESC
-            LIMIT 100
-        """)
-        
-        data = cursor.fetchall()
-        cursor.close()
-        
-        if not data:
-            raise HTTPException(status_code=404, detail="No upcoming orders found")
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        
-        # Header
-        elements = create_header(
-            elements,
-            "Delivery Time Estimates Report",
-            f"Upcoming orders with estimated delivery times ({len(data)} orders)"
-        )
-        
-        # Summary statistics
-        home_delivery_count = sum(1 for row in data if row['delivery_method'] == 'home_delivery')
-        store_pickup_count = sum(1 for row in data if row['delivery_method'] == 'store_pickup')
-        total_value = sum(row['total_amount'] for row in data)
-        
-        summary_style = getSampleStyleSheet()['Normal']
-        summary_style.fontSize = 11
-        summary_style.spaceAfter = 15
-        
-        summary_text = f"""
-        <b>Summary:</b><br/>
-        Total Upcoming Orders: <b>{len(data)}</b> | 
-        Home Delivery: <b>{home_delivery_count}</b> | 
-        Store Pickup: <b>{store_pickup_count}</b> | 
-        Total Value: <b>${total_value:,.2f}</b>
-        """
-        elements.append(Paragraph(summary_text, summary_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Table data
-        table_data = [
-            ['Order ID', 'Customer', 'Order Date', 'Amount', 'Method', 'City', 'Est. Days', 'Status']
-        ]
-        
-        for row in data:
-            order_date = row['order_date'].strftime('%Y-%m-%d') if row['order_date'] else 'N/A'
-            delivery_method = (row['delivery_method'] or 'N/A').replace('_', ' ').title()
-            city = (row['city'] or 'N/A')[:15]
-            est_days = row['estimated_days'] if row['estimated_days'] else row['base_delivery_days']
-            status = (row['delivery_status'] or 'Pending').upper()[:8]
-            
-            table_data.append([
-                str(row['order_id']),
-                (row['user_name'] or 'N/A')[:12],
-                order_date,
-                f"${row['total_amount']:,.2f}",
-                delivery_method[:12],
-                city,
-                f"{est_days} days",
-                status
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[0.7*inch, 1*inch, 0.9*inch, 0.9*inch, 1.1*inch, 1*inch, 0.8*inch, 0.8*inch])
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16A085')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#D5F4E6')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Add legend
-        legend_style = ParagraphStyle(
-            'Legend',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#555555'),
-            spaceAfter=10
-        )
-        legend_text = """
-        <b>Delivery Time Guidelines:</b><br/>
-        • Store Pickup: 2 business days<br/>
-        • Home Delivery (Main Cities): 5 days<br/>
-        • Home Delivery (Other Cities): 7 days<br/>
-        • Additional 3 days may apply for low stock items
-        """
-        elements.append(Paragraph(legend_text, legend_style))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph(create_footer_text(), footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": "attachment; filename=delivery_time_estimates.pdf"
-            }
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        if cursor:
-            cursor.close()
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    return _report("delivery-time-estimates", format)
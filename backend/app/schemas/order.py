@@ -41,6 +41,14 @@ class CreateOrderRequest(BaseModel):
     address_id: Optional[int] = None  # Required for home_delivery
     address_details: Optional[AddressDetails] = None  # New address details if creating new address
     card_details: Optional[CardDetails] = None  # Card details for card payment
+    reservation_id: Optional[str] = None  # Stock reservation from POST /orders/reserve
+
+
+class ReservationOut(BaseModel):
+    reservation_id: str
+    user_id: int
+    items: dict
+    expires_in_seconds: int
 
 
 class OrderOut(BaseModel):
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from app.schemas.variant import VariantCreate
 
 # Category info for product response
@@ -17,6 +17,7 @@ class ProductOut(BaseModel):
     category_id: int
     description: Optional[str]
     category: Optional[CategoryInfo] = None
+    attributes: Dict[str, List[str]] = {}
     
     class Config:
         from_attributes = True
@@ -27,3 +28,11 @@ class ProductCreate(BaseModel):
     category_id: int
     description: Optional[str] = None
     variants: Optional[List[VariantCreate]] = None
+
+# Paginated catalog page with facet counts
+class CatalogPageOut(BaseModel):
+    total: int
+    page: int
+    page_size: int
+    products: List[ProductOut] = []
+    facets: dict = {}
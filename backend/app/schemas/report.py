@@ -0,0 +1,22 @@
+"""
+Report Schemas
+"""
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+
+class ReportJobRequest(BaseModel):
+    report_type: str  # e.g. 'quarterly-sales', 'all-customers-summary'
+    params: Dict[str, Any] = {}
+
+
+class ReportJobOut(BaseModel):
+    job_id: str
+    report_type: str
+    params: Dict[str, Any]
+    status: str  # 'pending', 'completed' or 'failed'
+    error: Optional[str] = None
+    filename: str
+    created_at: float
+    finished_at: Optional[float] = None
+    connections_held_during_render: int = 0
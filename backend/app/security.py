@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -16,6 +17,8 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60* 1  # 1 hour
 
+logger = logging.getLogger(__name__)
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -45,20 +48,17 @@ def decode_token(token: str) -> Dict[str, Any]:
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> Dict[str, Any]:
     if not credentials:
-        print("DEBUG: No credentials provided!")
+        logger.debug("Request without a bearer token")
         raise HTTPException(
             status_code=401, 
             detail="Authorization header missing. Please provide a Bearer token."
         )
-    print(f"DEBUG: Received credentials: {credentials}")
-    token = credentials.credentials
-    print(f"DEBUG: Token (first 20 chars): {token[:20]}...")
-    payload = decode_token(token)
-    print(f"DEBUG: Decoded payload: {payload}")
+    payload = decode_token(credentials.credentials)
     # Expected fields: sub (user_id), user_name, email, user_type
     if not payload.get("sub"):
         raise HTTPException(status_code=401, detail="Invalid token: missing subject")
-    print(f"DEBUG: User type: {payload.get('user_type')}")
+    # Never log the token or the payload itself
+    logger.debug("Authenticated user %s (%s)", payload["sub"], payload.get("user_type"))
     return payload
 
 
@@ -0,0 +1,752 @@
+"""
+Backup Engine
+Streaming, parallel logical backups, used by db_export.py.
+
+One pass writes a backup directory under the export directory:
+
+    backup_YYYYMMDD_HHMMSS/
+        manifest.json
+        schema.sql.zst  routines.sql.zst  triggers.sql.zst  views.sql.zst
+        data/<table>.00001.sql.zst ...
+
+Every data file holds one primary-key range of a table (at most
+BACKUP_FILE_ROWS rows) as INSERT statements, compressed with zstd when the
+zstandard package is installed and gzip otherwise. The manifest records each
+file's CRC32 and row count, and each table's high-water marks (row count,
+largest key and latest updated_at).
+
+An incremental backup takes the previous manifest as its base. Tables that
+have updated_at and unchanged high-water marks are skipped without reading
+them. Other tables are re-read range by range using the base's key ranges,
+and a range whose CRC32 still matches keeps pointing at the base backup's
+file. Only changed ranges and rows past the last range are written. The
+manifest of an incremental backup lists every file a restore needs, so a
+backup directory must be kept as long as later manifests reference it.
+
+- Tables are read in primary-key order, BACKUP_CHUNK_ROWS rows per query
+  (keyset pagination, so a chunk never re-scans the rows before it); tables
+  without a primary key are streamed through an unbuffered cursor.
+- BACKUP_WORKERS threads dump tables side by side, largest first. Every
+  worker opens START TRANSACTION WITH CONSISTENT SNAPSHOT while the lock
+  connection holds FLUSH TABLES WITH READ LOCK, so all of them see the same
+  point in time. Without the RELOAD privilege the lock is skipped and the
+  snapshots are only as close together as the workers could open them.
+- Values are formatted a column at a time with a formatter picked once per
+  column from its data type; a text column is escaped in one pass over the
+  joined column. Each chunk becomes one string written through a large
+  file buffer.
+- Progress (rows, MB and MB/s against the information_schema estimates) is
+  logged every BACKUP_PROGRESS_SECONDS and passed to an optional callback.
+"""
+import datetime
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import zlib
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import mysql.connector
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+BACKUP_WORKERS = int(os.getenv('BACKUP_WORKERS', 4))
+BACKUP_CHUNK_ROWS = int(os.getenv('BACKUP_CHUNK_ROWS', 10000))
+BACKUP_INSERT_ROWS = int(os.getenv('BACKUP_INSERT_ROWS', 1000))
+BACKUP_FILE_ROWS = int(os.getenv('BACKUP_FILE_ROWS', 100000))
+BACKUP_COMPRESSION = os.getenv('BACKUP_COMPRESSION', 'zstd' if zstandard else 'gzip')
+BACKUP_COMPRESSION_LEVEL = int(os.getenv('BACKUP_COMPRESSION_LEVEL', 3))
+COMPRESSION_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz', 'none': ''}
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+BACKUP_PROGRESS_SECONDS = 5
+WRITE_BUFFER_BYTES = 1 << 20
+
+_SEPARATOR = '\x1f'
+
+
+def escape(value: str) -> str:
+    """Backslash escapes of mysqldump (chained str.replace runs in C; str.translate is several times slower)"""
+    return (value.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n')
+            .replace('\r', '\\r').replace('\0', '\\0').replace('\x1a', '\\Z'))
+
+
+def _quote(value) -> str:
+    return "'" + escape(str(value)) + "'"
+
+
+def _hex(value) -> str:
+    return "X'" + value.hex() + "'" if value else "''"
+
+
+def _time(value: datetime.timedelta) -> str:
+    seconds = int(value.total_seconds())
+    sign = '-' if seconds < 0 else ''
+    hours, rest = divmod(abs(seconds), 3600)
+    return f"'{sign}{hours:02d}:{rest // 60:02d}:{rest % 60:02d}'"
+
+
+def _set(value) -> str:
+    return _quote(','.join(sorted(value)))
+
+
+_FORMATTERS: Dict[type, Callable] = {
+    type(None): lambda value: 'NULL',
+    int: str,
+    float: repr,
+    Decimal: str,
+    str: _quote,
+    bytes: _hex,
+    bytearray: _hex,
+    datetime.datetime: _quote,
+    datetime.date: _quote,
+    datetime.timedelta: _time,
+    set: _set,
+}
+
+
+def _any(value) -> str:
+    return _FORMATTERS.get(type(value), _quote)(value)
+
+
+def format_row(row: Sequence) -> str:
+    """Row literal for values of any type (one type lookup per value)"""
+    return '(' + ','.join([_any(value) for value in row]) + ')'
+
+
+def format_rows(rows: Sequence[Sequence]) -> List[str]:
+    return [format_row(row) for row in rows]
+
+
+# Column-wise formatters: each takes one column of a chunk and returns its literals
+
+def _numeric_column(values) -> List[str]:
+    return ['NULL' if value is None else str(value) for value in values]
+
+
+def _float_column(values) -> List[str]:
+    return ['NULL' if value is None else repr(value) for value in values]
+
+
+def _temporal_column(values) -> List[str]:
+    return ['NULL' if value is None else "'" + str(value) + "'" for value in values]
+
+
+def _text_column(values) -> List[str]:
+    """Escape the whole column at once: join, one replace chain, split"""
+    present = [value for value in values if value is not None]
+    escaped = escape(_SEPARATOR.join(present)).split(_SEPARATOR)
+    if len(escaped) != len(present):
+        # A value contains the separator itself
+        escaped = [escape(value) for value in present]
+    escaped = iter(escaped)
+    return ['NULL' if value is None else "'" + next(escaped) + "'" for value in values]
+
+
+def _binary_column(values) -> List[str]:
+    return ['NULL' if value is None else _hex(value) for value in values]
+
+
+def _any_column(values) -> List[str]:
+    return [_any(value) for value in values]
+
+
+_COLUMN_FORMATTERS: Dict[str, Callable] = {}
+for _types, _formatter in (
+    # mysql-connector returns BIT values as int, and an integer literal restores them
+    (('tinyint', 'smallint', 'mediumint', 'int', 'bigint', 'decimal', 'year', 'bit'), _numeric_column),
+    (('float', 'double'), _float_column),
+    (('date', 'datetime', 'timestamp'), _temporal_column),
+    (('char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum'), _text_column),
+    (('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob'), _binary_column),
+):
+    _COLUMN_FORMATTERS.update(dict.fromkeys(_types, _formatter))
+
+
+def chunk_formatter(column_types: Sequence[str]) -> Callable[[Sequence[Sequence]], List[str]]:
+    """
+    Row literals for a chunk of rows whose columns have the given
+    information_schema data types, formatted a column at a time. Types
+    without a column formatter (time, set, json...) are decided per value.
+    """
+    formatters = [_COLUMN_FORMATTERS.get(data_type.lower(), _any_column) for data_type in column_types]
+
+    def format_chunk(rows: Sequence[Sequence]) -> List[str]:
+        columns = [formatter(values) for formatter, values in zip(formatters, zip(*rows))]
+        return ['(' + ','.join(row) + ')' for row in zip(*columns)]
+
+    return format_chunk
+
+
+def format_insert(table: str, column_list: str, rows: Sequence[Sequence], insert_rows: int = BACKUP_INSERT_ROWS,
+                  format_chunk: Callable[[Sequence[Sequence]], List[str]] = format_rows) -> str:
+    """Multi-row INSERT statements for the rows, insert_rows per statement"""
+    literals = format_chunk(rows)
+    prefix = f"INSERT INTO `{table}` ({column_list}) VALUES\n"
+    return ''.join(
+        prefix + ',\n'.join(literals[start:start + insert_rows]) + ';\n'
+        for start in range(0, len(literals), insert_rows)
+    )
+
+
+class BackupProgress:
+    def __init__(self, estimated_rows: int, callback: Optional[Callable[[dict], None]] = None,
+                 interval: float = BACKUP_PROGRESS_SECONDS):
+        self.estimated_rows = estimated_rows
+        self.callback = callback
+        self.interval = interval
+        self.rows = 0
+        self.bytes = 0
+        self.tables_done = 0
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._reported = self._started
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self._started
+        return {
+            "rows": self.rows,
+            "estimated_rows": self.estimated_rows,
+            "percent": round(min(self.rows / self.estimated_rows, 1) * 100, 1) if self.estimated_rows else None,
+            "mb": round(self.bytes / 1e6, 2),
+            "mb_per_s": round(self.bytes / 1e6 / elapsed, 2) if elapsed else 0.0,
+            "tables_done": self.tables_done,
+            "seconds": round(elapsed, 2),
+        }
+
+    def advance(self, rows: int, size: int, table_done: bool = False):
+        with self._lock:
+            self.rows += rows
+            self.bytes += size
+            self.tables_done += table_done
+            now = time.perf_counter()
+            if now - self._reported < self.interval and not table_done:
+                return
+            self._reported = now
+            state = self.snapshot()
+        if not table_done:
+            logger.info(
+                "Backup progress: %s/%s rows (%s%%), %s MB, %s MB/s",
+                state['rows'], state['estimated_rows'], state['percent'], state['mb'], state['mb_per_s']
+            )
+        if self.callback:
+            self.callback(state)
+
+
+class BackupEngine:
+    def __init__(self, db_config: dict, workers: int = BACKUP_WORKERS, chunk_rows: int = BACKUP_CHUNK_ROWS,
+                 insert_rows: int = BACKUP_INSERT_ROWS, file_rows: int = BACKUP_FILE_ROWS):
+        self.db_config = db_config
+        self.workers = max(1, workers)
+        self.chunk_rows = chunk_rows
+        self.insert_rows = insert_rows
+        self.file_rows = file_rows
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        return mysql.connector.connect(**self.db_config)
+
+    def list_tables(self, cursor) -> List[dict]:
+        """Base tables with their insertable columns, primary key and size estimates, largest first"""
+        database = self.db_config['database']
+        cursor.execute(
+            """SELECT table_name AS name, COALESCE(table_rows, 0) AS estimated_rows,
+                      COALESCE(data_length, 0) AS data_length
+               FROM information_schema.TABLES
+               WHERE table_schema = %s AND table_type = 'BASE TABLE'""",
+            (database,)
+        )
+        tables = {row['name']: dict(row, columns=[], column_types=[], primary_key=[]) for row in cursor.fetchall()}
+        # Generated columns are recomputed on restore and cannot be inserted
+        cursor.execute(
+            """SELECT table_name AS table_name, column_name AS column_name, data_type AS data_type
+               FROM information_schema.COLUMNS
+               WHERE table_schema = %s AND extra NOT LIKE '%%GENERATED%%'
+               ORDER BY table_name, ordinal_position""",
+            (database,)
+        )
+        for row in cursor.fetchall():
+            if row['table_name'] in tables:
+                tables[row['table_name']]['columns'].append(row['column_name'])
+                tables[row['table_name']]['column_types'].append(row['data_type'])
+        cursor.execute(
+            """SELECT table_name AS table_name, column_name AS column_name
+               FROM information_schema.KEY_COLUMN_USAGE
+               WHERE table_schema = %s AND constraint_name = 'PRIMARY'
+               ORDER BY table_name, ordinal_position""",
+            (database,)
+        )
+        for row in cursor.fetchall():
+            if row['table_name'] in tables:
+                tables[row['table_name']]['primary_key'].append(row['column_name'])
+        return sorted(tables.values(), key=lambda t: t['data_length'], reverse=True)
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def open_snapshots(self, count: int):
+        """
+        count connections inside transactions that share one snapshot.
+        Returns (connections, consistent).
+        """
+        lock_conn = self._connect()
+        lock_cursor = lock_conn.cursor()
+        consistent = True
+        try:
+            try:
+                lock_cursor.execute("FLUSH TABLES WITH READ LOCK")
+            except mysql.connector.Error as e:
+                consistent = count == 1
+                if not consistent:
+                    logger.warning("FLUSH TABLES WITH READ LOCK failed (%s); worker snapshots may differ slightly", e)
+            connections = []
+            for _ in range(count):
+                conn = self._connect()
+                cursor = conn.cursor()
+                cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                cursor.close()
+                connections.append(conn)
+        finally:
+            try:
+                lock_cursor.execute("UNLOCK TABLES")
+            finally:
+                lock_cursor.close()
+                lock_conn.close()
+        return connections, consistent
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+
+    def iter_chunks(self, conn, table: dict, after: Optional[Sequence] = None, upto: Optional[Sequence] = None):
+        """
+        Yield the table's rows as lists of tuples, at most chunk_rows each.
+        For tables with a primary key, after/upto bound the key range
+        (after exclusive, upto inclusive).
+        """
+        name = table['name']
+        columns = table['columns']
+        primary_key = table['primary_key']
+        column_sql = ', '.join(f"`{c}`" for c in columns)
+
+        if not primary_key:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT {column_sql} FROM `{name}`")
+                while True:
+                    rows = cursor.fetchmany(self.chunk_rows)
+                    if not rows:
+                        return
+                    yield rows
+            finally:
+                cursor.close()
+
+        key_sql = ', '.join(f"`{c}`" for c in primary_key)
+        key_positions = [columns.index(c) for c in primary_key]
+        if len(primary_key) == 1:
+            key_expr, placeholders = key_sql, '%s'
+        else:
+            key_expr, placeholders = f"({key_sql})", f"({', '.join(['%s'] * len(primary_key))})"
+
+        cursor = conn.cursor()
+        try:
+            last_key = tuple(after) if after is not None else None
+            while True:
+                conditions, params = [], []
+                if last_key is not None:
+                    conditions.append(f"{key_expr} > {placeholders}")
+                    params.extend(last_key)
+                if upto is not None:
+                    conditions.append(f"{key_expr} <= {placeholders}")
+                    params.extend(upto)
+                where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+                cursor.execute(
+                    f"SELECT {column_sql} FROM `{name}` {where}ORDER BY {key_sql} LIMIT %s",
+                    (*params, self.chunk_rows)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    return
+                yield rows
+                if len(rows) < self.chunk_rows:
+                    return
+                last_key = tuple(rows[-1][i] for i in key_positions)
+        finally:
+            cursor.close()
+
+    def high_water(self, conn, table: dict) -> dict:
+        """Row count, largest primary key and latest updated_at of the table"""
+        name = table['name']
+        primary_key = table['primary_key']
+        cursor = conn.cursor()
+        try:
+            tracked = "MAX(`updated_at`)" if 'updated_at' in table['columns'] else "NULL"
+            cursor.execute(f"SELECT COUNT(*), {tracked} FROM `{name}`")
+            rows, updated_at = cursor.fetchone()
+            max_key = None
+            if primary_key:
+                key_sql = ', '.join(f"`{c}` DESC" for c in primary_key)
+                cursor.execute(
+                    f"SELECT {', '.join(f'`{c}`' for c in primary_key)} FROM `{name}` ORDER BY {key_sql} LIMIT 1"
+                )
+                max_key = cursor.fetchone()
+        finally:
+            cursor.close()
+        return _jsonable({"rows": rows, "max_key": list(max_key) if max_key else None, "updated_at": updated_at})
+
+    def _dump_table(self, conn, table: dict, base: Optional[dict], writer: "BackupWriter",
+                    progress: BackupProgress) -> dict:
+        name = table['name']
+        column_list = ', '.join(f"`{c}`" for c in table['columns'])
+        format_chunk = chunk_formatter(table['column_types'])
+        key_positions = [table['columns'].index(c) for c in table['primary_key']]
+        high_water = self.high_water(conn, table)
+        entry = {
+            "columns": table['columns'],
+            "column_types": table['column_types'],
+            "primary_key": table['primary_key'],
+            "high_water": high_water,
+            "files": [],
+        }
+
+        def render(chunk) -> bytes:
+            data = format_insert(name, column_list, chunk, self.insert_rows, format_chunk).encode('utf-8')
+            progress.advance(len(chunk), len(data))
+            return data
+
+        comparable = bool(
+            base and table['primary_key']
+            and base['primary_key'] == table['primary_key'] and base['columns'] == table['columns']
+        )
+        # Tables that track updated_at are skipped outright when nothing moved
+        if comparable and high_water['updated_at'] is not None and base['high_water'] == high_water:
+            entry['files'] = base['files']
+            writer.reused(len(base['files']))
+            progress.advance(high_water['rows'], 0, table_done=True)
+            return entry
+
+        after = None
+        if comparable:
+            # Re-read each of the base backup's key ranges; unchanged ranges
+            # keep pointing at the base backup's file
+            for base_file in base['files']:
+                upto = base_file['last_key']
+                parts, rows, crc = [], 0, 0
+                for chunk in self.iter_chunks(conn, table, after, upto):
+                    data = render(chunk)
+                    parts.append(data)
+                    rows += len(chunk)
+                    crc = zlib.crc32(data, crc)
+                if rows and crc == base_file['crc32']:
+                    entry['files'].append(base_file)
+                    writer.reused(1)
+                elif rows:
+                    entry['files'].append(writer.write(name, parts, upto, rows))
+                # A range that emptied out is covered by the next file's range
+                after = upto
+
+        # Rows past the base ranges (or the whole table): new files of file_rows rows
+        pending, pending_rows = [], 0
+        for chunk in self.iter_chunks(conn, table, after):
+            pending.append(render(chunk))
+            pending_rows += len(chunk)
+            if pending_rows >= self.file_rows:
+                last_key = [chunk[-1][i] for i in key_positions] if key_positions else None
+                entry['files'].append(writer.write(name, pending, last_key, pending_rows))
+                pending, pending_rows = [], 0
+        if pending:
+            last_key = [chunk[-1][i] for i in key_positions] if key_positions else None
+            entry['files'].append(writer.write(name, pending, last_key, pending_rows))
+        progress.advance(0, 0, table_done=True)
+        return entry
+
+    # ------------------------------------------------------------------
+    # Schema objects
+    # ------------------------------------------------------------------
+
+    def render_sections(self, cursor, tables: List[dict]) -> Dict[str, str]:
+        """schema, routines, triggers and views as SQL text"""
+        database = self.db_config['database']
+        sections = {}
+
+        schema = ["SET FOREIGN_KEY_CHECKS=0;\n\n"]
+        for table in sorted(t['name'] for t in tables):
+            cursor.execute(f"SHOW CREATE TABLE `{table}`")
+            create_statement = cursor.fetchone()['Create Table']
+            schema.append(f"-- Table: {table}\nDROP TABLE IF EXISTS `{table}`;\n{create_statement};\n\n")
+        schema.append("SET FOREIGN_KEY_CHECKS=1;\n")
+        sections['schema'] = ''.join(schema)
+
+        routines = ["DELIMITER $$\n\n"]
+        for kind in ("PROCEDURE", "FUNCTION"):
+            cursor.execute(f"SHOW {kind} STATUS WHERE Db = %s", (database,))
+            for name in sorted(row['Name'] for row in cursor.fetchall()):
+                cursor.execute(f"SHOW CREATE {kind} `{name}`")
+                create_routine = cursor.fetchone()[f"Create {kind.title()}"]
+                if create_routine:
+                    routines.append(f"-- {kind.title()}: {name}\nDROP {kind} IF EXISTS `{name}`$$\n{create_routine}$$\n\n")
+        routines.append("DELIMITER ;\n")
+        sections['routines'] = ''.join(routines)
+
+        triggers = ["DELIMITER $$\n\n"]
+        cursor.execute("SHOW TRIGGERS")
+        for name in sorted(row['Trigger'] for row in cursor.fetchall()):
+            cursor.execute(f"SHOW CREATE TRIGGER `{name}`")
+            create_trigger = cursor.fetchone()['SQL Original Statement']
+            triggers.append(f"-- Trigger: {name}\nDROP TRIGGER IF EXISTS `{name}`$$\n{create_trigger}$$\n\n")
+        triggers.append("DELIMITER ;\n")
+        sections['triggers'] = ''.join(triggers)
+
+        views = []
+        cursor.execute("SHOW FULL TABLES WHERE Table_type = 'VIEW'")
+        for name in sorted(list(row.values())[0] for row in cursor.fetchall()):
+            cursor.execute(f"SHOW CREATE VIEW `{name}`")
+            views.append(f"-- View: {name}\nDROP VIEW IF EXISTS `{name}`;\n{cursor.fetchone()['Create View']};\n\n")
+        sections['views'] = ''.join(views)
+        return sections
+
+    # ------------------------------------------------------------------
+    # Backup
+    # ------------------------------------------------------------------
+
+    def backup(self, export_dir: Path, base: Optional[dict] = None, compression: str = BACKUP_COMPRESSION,
+               progress_callback: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Write a backup directory under export_dir and return its manifest.
+        With base (a previous manifest) only the data that changed since
+        then is written; the manifest still lists every file a restore needs.
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Invalid compression '{compression}'. Must be one of: {', '.join(COMPRESSION_SUFFIXES)}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        export_dir = Path(export_dir)
+        started = time.perf_counter()
+        created_at = datetime.datetime.now()
+        backup_id = f"backup_{created_at.strftime('%Y%m%d_%H%M%S')}"
+        writer = BackupWriter(export_dir, backup_id, compression)
+
+        catalog_conn = self._connect()
+        catalog_cursor = catalog_conn.cursor(dictionary=True)
+        try:
+            tables = self.list_tables(catalog_cursor)
+            workers = min(self.workers, len(tables)) or 1
+            connections, consistent = self.open_snapshots(workers)
+            progress = BackupProgress(sum(t['estimated_rows'] for t in tables), progress_callback)
+            base_tables = base['tables'] if base else {}
+
+            pending: "queue.Queue[dict]" = queue.Queue()
+            for table in tables:
+                pending.put(table)
+            entries: Dict[str, dict] = {}
+            errors: List[BaseException] = []
+
+            def work(conn):
+                while not errors:
+                    try:
+                        table = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        entries[table['name']] = self._dump_table(
+                            conn, table, base_tables.get(table['name']), writer, progress
+                        )
+                    except BaseException as e:
+                        errors.append(e)
+                        return
+
+            threads = [threading.Thread(target=work, args=(conn,), name=f"backup-{i}", daemon=True)
+                       for i, conn in enumerate(connections)]
+            try:
+                for thread in threads:
+                    thread.start()
+                # Schema objects are not transactional, so the catalog
+                # connection renders them while the workers dump
+                sections = {
+                    name: writer.write_section(name, text)
+                    for name, text in self.render_sections(catalog_cursor, tables).items()
+                }
+                for thread in threads:
+                    thread.join()
+                if errors:
+                    raise errors[0]
+            finally:
+                for conn in connections:
+                    try:
+                        conn.rollback()
+                        conn.close()
+                    except mysql.connector.Error:
+                        pass
+        except BaseException:
+            writer.discard()
+            raise
+        finally:
+            catalog_cursor.close()
+            catalog_conn.close()
+
+        seconds = time.perf_counter() - started
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "backup_id": backup_id,
+            "created_at": created_at.isoformat(timespec='seconds'),
+            "database": self.db_config['database'],
+            "kind": "incremental" if base else "full",
+            "base": base['backup_id'] if base else None,
+            "compression": compression,
+            "consistent_snapshot": consistent,
+            "sections": sections,
+            "tables": {name: entries[name] for name in sorted(entries)},
+            "stats": {
+                "rows_read": progress.rows,
+                "bytes_read": progress.bytes,
+                "files_written": writer.files_written,
+                "files_reused": writer.files_reused,
+                "bytes_written": writer.bytes_written,
+                "seconds": round(seconds, 3),
+                "mb_per_s": round(progress.bytes / 1e6 / seconds, 2) if seconds else 0.0,
+                "workers": workers,
+            },
+        }
+        writer.write_manifest(manifest)
+        logger.info(
+            "%s backup %s: %s rows read, %s files written, %s reused, %.1f MB on disk in %.1fs (%s MB/s)",
+            manifest['kind'].title(), backup_id, progress.rows, writer.files_written, writer.files_reused,
+            writer.bytes_written / 1e6, seconds, manifest['stats']['mb_per_s']
+        )
+        return manifest
+
+
+class BackupWriter:
+    """Writes one backup directory: compressed data files, sections and the manifest"""
+
+    def __init__(self, export_dir: Path, backup_id: str, compression: str):
+        self.export_dir = export_dir
+        self.backup_id = backup_id
+        self.compression = compression
+        self.directory = export_dir / backup_id
+        (self.directory / "data").mkdir(parents=True, exist_ok=False)
+        self._lock = threading.Lock()
+        self._sequence: Dict[str, int] = {}
+        self.files_written = 0
+        self.files_reused = 0
+        self.bytes_written = 0
+
+    def _write(self, relative: str, parts: Iterable[bytes]) -> dict:
+        path = self.export_dir / relative
+        crc = 0
+        with open_compressed(path, 'wb', self.compression) as out:
+            for data in parts:
+                crc = zlib.crc32(data, crc)
+                out.write(data)
+        size = path.stat().st_size
+        with self._lock:
+            self.files_written += 1
+            self.bytes_written += size
+        return {"file": relative, "crc32": crc, "bytes": size}
+
+    def write(self, table: str, parts: List[bytes], last_key: Optional[Sequence], rows: int) -> dict:
+        with self._lock:
+            sequence = self._sequence.get(table, 0) + 1
+            self._sequence[table] = sequence
+        relative = f"{self.backup_id}/data/{table}.{sequence:05d}.sql{COMPRESSION_SUFFIXES[self.compression]}"
+        entry = self._write(relative, parts)
+        entry.update(rows=rows, last_key=_jsonable(list(last_key)) if last_key is not None else None)
+        return entry
+
+    def write_section(self, name: str, text: str) -> dict:
+        relative = f"{self.backup_id}/{name}.sql{COMPRESSION_SUFFIXES[self.compression]}"
+        return self._write(relative, [text.encode('utf-8')])
+
+    def reused(self, count: int):
+        with self._lock:
+            self.files_reused += count
+
+    def write_manifest(self, manifest: dict):
+        path = self.directory / MANIFEST_NAME
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temporary, path)
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _jsonable(value):
+    """Dates, decimals and bytes in keys/high-water marks as strings (MySQL converts them back)"""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.timedelta, Decimal)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+# ----------------------------------------------------------------------
+# Backup files
+# ----------------------------------------------------------------------
+
+def open_compressed(path: Path, mode: str, compression: Optional[str] = None):
+    """
+    Binary stream over a backup file. For reading, the compression is taken
+    from the file suffix.
+    """
+    path = Path(path)
+    if compression is None:
+        compression = next((c for c, suffix in COMPRESSION_SUFFIXES.items() if suffix and path.name.endswith(suffix)), 'none')
+    if compression == 'gzip':
+        if mode == 'wb':
+            return gzip.open(path, 'wb', compresslevel=BACKUP_COMPRESSION_LEVEL)
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd backups require the zstandard package")
+        raw = open(path, mode)
+        if mode == 'wb':
+            return zstandard.ZstdCompressor(level=BACKUP_COMPRESSION_LEVEL).stream_writer(raw, closefd=True)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), WRITE_BUFFER_BYTES)
+    return open(path, mode, buffering=WRITE_BUFFER_BYTES)
+
+
+def read_backup_file(export_dir: Path, entry: dict) -> bytes:
+    """Decompressed content of a manifest file entry, checked against its CRC32"""
+    with open_compressed(Path(export_dir) / entry['file'], 'rb') as f:
+        data = f.read()
+    if zlib.crc32(data) != entry['crc32']:
+        raise ValueError(f"Checksum mismatch in {entry['file']}")
+    return data
+
+
+def load_manifest(path: Path) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_manifest(export_dir: Path, backup_id: Optional[str] = None) -> Optional[dict]:
+    """The manifest of backup_id, or of the latest backup in export_dir"""
+    export_dir = Path(export_dir)
+    if backup_id:
+        path = export_dir / backup_id / MANIFEST_NAME
+        return load_manifest(path) if path.exists() else None
+    manifests = sorted(export_dir.glob(f"backup_*/{MANIFEST_NAME}"))
+    return load_manifest(manifests[-1]) if manifests else None
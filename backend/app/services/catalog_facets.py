@@ -0,0 +1,226 @@
+"""
+Catalog Faceting Engine
+Keeps per-category, per-attribute, stock and price-bucket bitmaps over the
+product catalog so every facet count for a filter set is computed in one pass
+of bitwise ANDs and popcounts instead of a GROUP BY query per facet.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+CATALOG_SNAPSHOT_TTL_SECONDS = int(os.getenv('CATALOG_SNAPSHOT_TTL_SECONDS', 120))
+
+# Price bucket upper bounds; the last bucket is open-ended
+PRICE_BUCKET_EDGES = [100, 250, 500, 1000]
+
+
+def _bucket_labels(edges: List[float]) -> List[str]:
+    labels = []
+    lower = 0
+    for edge in edges:
+        labels.append(f"{lower:g}-{edge:g}")
+        lower = edge
+    labels.append(f"{lower:g}+")
+    return labels
+
+
+PRICE_BUCKET_LABELS = _bucket_labels(PRICE_BUCKET_EDGES)
+
+
+def price_bucket(price: float) -> int:
+    for i, edge in enumerate(PRICE_BUCKET_EDGES):
+        if price < edge:
+            return i
+    return len(PRICE_BUCKET_EDGES)
+
+
+class CatalogSnapshot:
+    """
+    Columnar view of the catalog: products are assigned a bit position and
+    every facet value is an int bitmap over those positions.
+    """
+
+    def __init__(self, products, categories, variants, attributes):
+        self.product_ids: List[int] = [p['product_id'] for p in products]
+        position = {pid: i for i, pid in enumerate(self.product_ids)}
+        self.all_bits = (1 << len(self.product_ids)) - 1
+
+        parent_of = {c['category_id']: c['parent_category_id'] for c in categories}
+        self.category_names = {c['category_id']: c['category_name'] for c in categories}
+
+        # Category bitmaps roll products up into every ancestor category
+        category_bits: Dict[int, int] = defaultdict(int)
+        for p in products:
+            bit = 1 << position[p['product_id']]
+            category_id = p['category_id']
+            seen = set()
+            while category_id is not None and category_id not in seen:
+                seen.add(category_id)
+                category_bits[category_id] |= bit
+                category_id = parent_of.get(category_id)
+        self.category_bits = dict(category_bits)
+
+        in_stock = 0
+        price_bits = [0] * len(PRICE_BUCKET_LABELS)
+        variant_product: Dict[int, int] = {}
+        for v in variants:
+            pos = position.get(v['product_id'])
+            if pos is None:
+                continue
+            bit = 1 << pos
+            variant_product[v['variant_id']] = pos
+            if (v['quantity'] or 0) > 0:
+                in_stock |= bit
+            if v['price'] is not None:
+                price_bits[price_bucket(float(v['price']))] |= bit
+        self.in_stock_bits = in_stock
+        self.price_bits = price_bits
+
+        attribute_bits: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.attribute_names: Dict[str, str] = {}
+        self.value_labels: Dict[Tuple[str, str], str] = {}
+        for a in attributes:
+            pos = variant_product.get(a['variant_id'])
+            if pos is None or a['value'] is None:
+                continue
+            name, value = a['attribute_name'].lower(), a['value'].lower()
+            self.attribute_names.setdefault(name, a['attribute_name'])
+            self.value_labels.setdefault((name, value), a['value'])
+            attribute_bits[name][value] |= 1 << pos
+        self.attribute_bits = {name: dict(values) for name, values in attribute_bits.items()}
+
+    def positions_to_ids(self, bits: int) -> List[int]:
+        ids = []
+        product_ids = self.product_ids
+        while bits:
+            low = bits & -bits
+            ids.append(product_ids[low.bit_length() - 1])
+            bits ^= low
+        return ids
+
+
+class CatalogFacets:
+    """
+    Lazily built, TTL-refreshed catalog snapshot shared by all requests.
+    Admin mutations call invalidate() so the next request rebuilds it.
+    """
+
+    def __init__(self, ttl_seconds: int = CATALOG_SNAPSHOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._built_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self._built_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl_seconds
+
+    def snapshot(self, cursor) -> CatalogSnapshot:
+        if self._is_fresh():
+            self.hits += 1
+            return self._snapshot
+        with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return self._snapshot
+            self.misses += 1
+            cursor.execute("SELECT product_id, category_id FROM product ORDER BY product_id")
+            products = cursor.fetchall()
+            cursor.execute("SELECT category_id, category_name, parent_category_id FROM category")
+            categories = cursor.fetchall()
+            cursor.execute("SELECT variant_id, product_id, price, quantity FROM variant")
+            variants = cursor.fetchall()
+            cursor.execute("""
+                SELECT vav.variant_id, va.attribute_name, vav.value
+                FROM variant_attribute_value vav
+                JOIN variant_attribute va ON vav.attribute_id = va.attribute_id
+            """)
+            attributes = cursor.fetchall()
+            self._snapshot = CatalogSnapshot(products, categories, variants, attributes)
+            self._built_at = time.monotonic()
+            return self._snapshot
+
+    def search(
+        self,
+        cursor,
+        category_id: Optional[int] = None,
+        attribute_filters: Optional[Dict[str, Set[str]]] = None,
+        in_stock: Optional[bool] = None,
+        price_buckets: Optional[Set[int]] = None,
+    ) -> Tuple[List[int], dict]:
+        """
+        Apply the filters and compute every facet in one pass.
+
+        Each facet is counted with all *other* filters applied, so selecting a
+        colour still shows the counts of the alternative colours.
+        Returns (matching product ids in product_id order, facets).
+        """
+        snap = self.snapshot(cursor)
+        everything = snap.all_bits
+
+        # Bitmap for each active filter
+        filter_bits: Dict[str, int] = {}
+        if category_id is not None:
+            filter_bits['category'] = snap.category_bits.get(category_id, 0)
+        for name, values in (attribute_filters or {}).items():
+            values_bits = snap.attribute_bits.get(name, {})
+            bits = 0
+            for value in values:
+                bits |= values_bits.get(value, 0)
+            filter_bits[f'attr:{name}'] = bits
+        if in_stock is not None:
+            filter_bits['in_stock'] = snap.in_stock_bits if in_stock else everything & ~snap.in_stock_bits
+        if price_buckets:
+            bits = 0
+            for bucket in price_buckets:
+                if 0 <= bucket < len(snap.price_bits):
+                    bits |= snap.price_bits[bucket]
+            filter_bits['price'] = bits
+
+        def base_without(excluded: str) -> int:
+            bits = everything
+            for key, value in filter_bits.items():
+                if key != excluded:
+                    bits &= value
+            return bits
+
+        matched = base_without('')
+
+        category_base = base_without('category')
+        categories = [
+            {"category_id": cid, "category_name": snap.category_names.get(cid), "count": (category_base & bits).bit_count()}
+            for cid, bits in sorted(snap.category_bits.items())
+        ]
+
+        attributes = {}
+        for name, values in snap.attribute_bits.items():
+            attr_base = base_without(f'attr:{name}')
+            counts = [
+                {"value": snap.value_labels[(name, value)], "count": (attr_base & bits).bit_count()}
+                for value, bits in values.items()
+            ]
+            counts.sort(key=lambda c: (-c['count'], c['value']))
+            attributes[snap.attribute_names[name]] = counts
+
+        stock_base = base_without('in_stock')
+        price_base = base_without('price')
+        facets = {
+            "categories": [c for c in categories if c['count'] > 0],
+            "attributes": attributes,
+            "in_stock": (stock_base & snap.in_stock_bits).bit_count(),
+            "out_of_stock": (stock_base & ~snap.in_stock_bits).bit_count(),
+            "price_buckets": [
+                {"bucket": i, "label": label, "count": (price_base & snap.price_bits[i]).bit_count()}
+                for i, label in enumerate(PRICE_BUCKET_LABELS)
+            ],
+        }
+        return snap.positions_to_ids(matched), facets
+
+
+catalog_facets = CatalogFacets()
@@ -0,0 +1,89 @@
+"""
+Customer Statistics
+Maintains the customer_stats table (database/customer_stats.sql): per
+customer order count, lifetime value, first/last order date and payment and
+delivery status counts, so customer reports are primary key lookups instead
+of aggregating the customer_summary_statistics view over every order.
+
+Writers call these functions with their own cursor inside the transaction
+that changes the order, payment or delivery row, so the counters commit or
+roll back together with it. Statuses are matched case-insensitively, like
+MySQL compares them in the views.
+"""
+from datetime import datetime
+from typing import Dict, Optional
+
+PAYMENT_COUNTERS: Dict[str, str] = {"completed": "completed_payments", "pending": "pending_payments"}
+DELIVERY_COUNTERS: Dict[str, str] = {"delivered": "delivered_orders", "pending": "pending_deliveries"}
+_COUNTER_COLUMNS = [*PAYMENT_COUNTERS.values(), *DELIVERY_COUNTERS.values()]
+
+# Same columns as the customer_summary_statistics view
+CUSTOMER_STATS_SELECT = """
+    SELECT
+        u.user_id,
+        u.user_name,
+        u.email,
+        u.name AS full_name,
+        cs.total_orders,
+        cs.total_spent,
+        cs.total_spent / cs.total_orders AS average_order_value,
+        cs.first_order_date,
+        cs.last_order_date,
+        cs.completed_payments,
+        cs.pending_payments,
+        cs.delivered_orders,
+        cs.pending_deliveries
+    FROM customer_stats cs
+    JOIN user u ON cs.user_id = u.user_id
+    WHERE cs.total_orders > 0
+"""
+
+
+def _counter(counters: Dict[str, str], status: Optional[str]) -> Optional[str]:
+    return counters.get((status or '').strip().lower())
+
+
+def record_order(cursor, user_id: int, total_amount: float, order_date: datetime,
+                 payment_status: Optional[str], delivery_status: Optional[str]):
+    """Count a new order (checkout)"""
+    deltas = dict.fromkeys(_COUNTER_COLUMNS, 0)
+    for column in (_counter(PAYMENT_COUNTERS, payment_status), _counter(DELIVERY_COUNTERS, delivery_status)):
+        if column:
+            deltas[column] += 1
+    counts = [deltas[c] for c in _COUNTER_COLUMNS]
+
+    cursor.execute(
+        f"""INSERT INTO customer_stats
+               (user_id, total_orders, total_spent, first_order_date, last_order_date, {', '.join(_COUNTER_COLUMNS)})
+           VALUES (%s, 1, %s, %s, %s, {', '.join(['%s'] * len(_COUNTER_COLUMNS))})
+           ON DUPLICATE KEY UPDATE
+               total_orders = total_orders + 1,
+               total_spent = total_spent + %s,
+               first_order_date = COALESCE(LEAST(first_order_date, %s), %s),
+               last_order_date = COALESCE(GREATEST(last_order_date, %s), %s),
+               {', '.join(f'{c} = {c} + %s' for c in _COUNTER_COLUMNS)}""",
+        (user_id, total_amount, order_date, order_date, *counts,
+         total_amount, order_date, order_date, order_date, order_date, *counts)
+    )
+
+
+def _status_changed(cursor, user_id: int, counters: Dict[str, str], old: Optional[str], new: Optional[str]):
+    old_column, new_column = _counter(counters, old), _counter(counters, new)
+    if old_column == new_column:
+        return
+    assignments = []
+    if old_column:
+        assignments.append(f"{old_column} = GREATEST({old_column} - 1, 0)")
+    if new_column:
+        assignments.append(f"{new_column} = {new_column} + 1")
+    cursor.execute(f"UPDATE customer_stats SET {', '.join(assignments)} WHERE user_id = %s", (user_id,))
+
+
+def payment_status_changed(cursor, user_id: int, old: Optional[str], new: Optional[str]):
+    """Move one order between the payment status counters"""
+    _status_changed(cursor, user_id, PAYMENT_COUNTERS, old, new)
+
+
+def delivery_status_changed(cursor, user_id: int, old: Optional[str], new: Optional[str]):
+    """Move one order between the delivery status counters"""
+    _status_changed(cursor, user_id, DELIVERY_COUNTERS, old, new)
@@ -1,12 +1,23 @@
-import os
+"""
+Database export utility.
+
+    python -m app.services.db_export                  # full backup
+    python -m app.services.db_export --incremental    # only what changed since the latest backup
+    python -m app.services.db_export --mysqldump      # one compressed mysqldump file instead
+
+Backups are directories with a manifest under app/database/exports (see
+backup_engine.py for the layout).
+"""
+import argparse
+import shutil
 import subprocess
+import tempfile
 import logging
 from datetime import datetime
 from pathlib import Path
-import mysql.connector
 try:
     # Preferred: run as package (python -m app.services.db_export)
-    from app.database import DB_CONFIG
+    from app.db_config import DB_CONFIG
 except Exception:
     # Fall back when running the script directly (python db_export.py)
     # Add project root to sys.path so absolute import works
@@ -14,9 +25,12 @@ except Exception:
     repo_root = Path(__file__).resolve().parents[2]
     if str(repo_root) not in sys.path:
         sys.path.insert(0, str(repo_root))
-    from app.database import DB_CONFIG
+    from app.db_config import DB_CONFIG
+from app.services.backup_engine import (
+    BACKUP_COMPRESSION, COMPRESSION_SUFFIXES, MANIFEST_NAME, WRITE_BUFFER_BYTES,
+    BackupEngine, find_manifest, open_compressed
+)
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create database/exports directory
@@ -25,503 +39,100 @@ EXPORT_DIR = BASE_DIR / "database" / "exports"
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def export_using_mysqldump():
+def export_using_mysqldump(compression: str = BACKUP_COMPRESSION):
     """
-    Export database using mysqldump utility (recommended method)
-    Exports DDL, DML, procedures, functions, triggers, views separately
+    Full backup as one mysqldump run (DDL, data, routines, triggers, events)
+    streamed straight into a single compressed file
     """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    complete_file = EXPORT_DIR / f"complete_backup_{timestamp}.sql{COMPRESSION_SUFFIXES[compression]}"
+    command = [
+        'mysqldump',
+        f'--host={DB_CONFIG["host"]}',
+        f'--port={DB_CONFIG["port"]}',
+        f'--user={DB_CONFIG["user"]}',
+        f'--password={DB_CONFIG["password"]}',
+        '--routines',
+        '--triggers',
+        '--events',
+        '--single-transaction',
+        '--quick',
+        DB_CONFIG['database']
+    ]
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # File paths
-        schema_file = EXPORT_DIR / f"schema_ddl_{timestamp}.sql"
-        data_file = EXPORT_DIR / f"data_dml_{timestamp}.sql"
-        procedures_file = EXPORT_DIR / f"procedures_{timestamp}.sql"
-        functions_file = EXPORT_DIR / f"functions_{timestamp}.sql"
-        triggers_file = EXPORT_DIR / f"triggers_{timestamp}.sql"
-        views_file = EXPORT_DIR / f"views_{timestamp}.sql"
-        complete_file = EXPORT_DIR / f"complete_backup_{timestamp}.sql"
-        
-        host = DB_CONFIG['host']
-        port = DB_CONFIG['port']
-        user = DB_CONFIG['user']
-        password = DB_CONFIG['password']
-        database = DB_CONFIG['database']
-        
-        # 1. Export Schema (DDL) - Tables only, no routines/triggers
-        logger.info("[1/7] Exporting Schema (DDL - Tables only)...")
-        schema_command = [
-            'mysqldump',
-            f'--host={host}',
-            f'--port={port}',
-            f'--user={user}',
-            f'--password={password}',
-            '--no-data',
-            '--skip-routines',
-            '--skip-triggers',
-            '--skip-events',
-            '--single-transaction',
-            '--result-file=' + str(schema_file),
-            database
-        ]
-        subprocess.run(schema_command, check=True, capture_output=True, text=True)
-        logger.info(f"✅ Schema exported to: {schema_file.name}")
-        
-        # 2. Export Data (DML)
-        logger.info("[2/7] Exporting Data (DML)...")
-        data_command = [
-            'mysqldump',
-            f'--host={host}',
-            f'--port={port}',
-            f'--user={user}',
-            f'--password={password}',
-            '--no-create-info',
-            '--skip-triggers',
-            '--single-transaction',
-            '--result-file=' + str(data_file),
-            database
-        ]
-        subprocess.run(data_command, check=True, capture_output=True, text=True)
-        logger.info(f"✅ Data exported to: {data_file.name}")
-        
-        # 3. Export Procedures
-        logger.info("[3/7] Exporting Stored Procedures...")
-        procedures_command = [
-            'mysqldump',
-            f'--host={host}',
-            f'--port={port}',
-            f'--user={user}',
-            f'--password={password}',
-            '--no-create-info',
-            '--no-data',
-            '--routines',
-            '--skip-triggers',
-            '--skip-events',
-            '--result-file=' + str(procedures_file),
-            database
-        ]
-        subprocess.run(procedures_command, check=True, capture_output=True, text=True)
-        
-        # Filter only procedures (remove functions)
-        with open(procedures_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        with open(procedures_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- Brightbuy Stored Procedures Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            
-            lines = content.split('\n')
-            in_procedure = False
-            procedure_lines = []
-            
-            for line in lines:
-                if 'CREATE DEFINER' in line and 'PROCEDURE' in line:
-                    in_procedure = True
-                    procedure_lines = [line]
-                elif in_procedure:
-                    procedure_lines.append(line)
-                    if line.strip() == '$$':
-                        f.write('\n'.join(procedure_lines) + '\n\n')
-                        in_procedure = False
-                        procedure_lines = []
-        
-        logger.info(f"✅ Procedures exported to: {procedures_file.name}")
-        
-        # 4. Export Functions (from Python since mysqldump combines them)
-        logger.info("[4/7] Exporting Functions...")
-        export_functions_only(functions_file, timestamp)
-        logger.info(f"✅ Functions exported to: {functions_file.name}")
-        
-        # 5. Export Triggers
-        logger.info("[5/7] Exporting Triggers...")
-        triggers_command = [
-            'mysqldump',
-            f'--host={host}',
-            f'--port={port}',
-            f'--user={user}',
-            f'--password={password}',
-            '--no-create-info',
-            '--no-data',
-            '--triggers',
-            '--skip-routines',
-            '--skip-events',
-            '--result-file=' + str(triggers_file),
-            database
-        ]
-        subprocess.run(triggers_command, check=True, capture_output=True, text=True)
-        
-        # Clean up triggers file
-        with open(triggers_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        with open(triggers_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Triggers Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            f.write(content)
-        
-        logger.info(f"✅ Triggers exported to: {triggers_file.name}")
-        
-        # 6. Export Views
-        logger.info("[6/7] Exporting Views...")
-        export_views_only(views_file, timestamp)
-        logger.info(f"✅ Views exported to: {views_file.name}")
-        
-        # 7. Create Complete Backup
-        logger.info("[7/7] Creating Complete Backup...")
-        complete_command = [
-            'mysqldump',
-            f'--host={host}',
-            f'--port={port}',
-            f'--user={user}',
-            f'--password={password}',
-            '--routines',
-            '--triggers',
-            '--events',
-            '--single-transaction',
-            '--result-file=' + str(complete_file),
-            database
-        ]
-        subprocess.run(complete_command, check=True, capture_output=True, text=True)
-        
-        # Add header to complete backup
-        with open(complete_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        with open(complete_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Complete Database Backup\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(content)
+        logger.info("Running mysqldump...")
+        with tempfile.TemporaryFile() as stderr_file, open_compressed(complete_file, 'wb', compression) as out:
+            out.write((
+                f"-- ============================================\n"
+                f"-- Brightbuy Complete Database Backup\n"
+                f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"-- ============================================\n\n"
+            ).encode('utf-8'))
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+            shutil.copyfileobj(process.stdout, out, WRITE_BUFFER_BYTES)
+            process.stdout.close()
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(
+                    process.returncode, 'mysqldump', stderr=stderr_file.read().decode('utf-8', 'replace')
+                )
         
         logger.info(f"✅ Complete backup exported to: {complete_file.name}")
-        
         return {
             'success': True,
-            'files': {
-                'schema_ddl': str(schema_file),
-                'data_dml': str(data_file),
-                'procedures': str(procedures_file),
-                'functions': str(functions_file),
-                'triggers': str(triggers_file),
-                'views': str(views_file),
-                'complete_backup': str(complete_file)
-            }
+            'files': {'complete_backup': str(complete_file)}
         }
         
     except subprocess.CalledProcessError as e:
         logger.error(f"❌ mysqldump error: {e.stderr}")
-        logger.info("Falling back to Python-based export...")
-        return export_using_python()
+        complete_file.unlink(missing_ok=True)
+        return {'success': False, 'error': e.stderr}
     except FileNotFoundError:
-        logger.warning("⚠️ mysqldump not found in PATH. Using Python-based export...")
-        return export_using_python()
-    except Exception as e:
-        logger.error(f"❌ Export error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return export_using_python()
-
-
-def export_functions_only(output_file, timestamp):
-    """Export only functions using Python"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor(dictionary=True)
-        database = DB_CONFIG['database']
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Functions Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            f.write("DELIMITER $$\n\n")
-            
-            cursor.execute("SHOW FUNCTION STATUS WHERE Db = %s", (database,))
-            functions = cursor.fetchall()
-            
-            if functions:
-                for func in functions:
-                    func_name = func['Name'] # type: ignore
-                    cursor.execute(f"SHOW CREATE FUNCTION `{func_name}`")
-                    result = cursor.fetchone()
-                    if result and 'Create Function' in result:
-                        create_func = result['Create Function'] # type: ignore
-                        f.write(f"-- Function: {func_name}\n")
-                        f.write(f"DROP FUNCTION IF EXISTS `{func_name}`$$\n\n")
-                        f.write(f"{create_func}$$\n\n")
-            else:
-                f.write("-- No functions found\n\n")
-            
-            f.write("DELIMITER ;\n")
-        
-        cursor.close()
-        connection.close()
-        
-    except Exception as e:
-        logger.error(f"Error exporting functions: {str(e)}")
-
-
-def export_views_only(output_file, timestamp):
-    """Export only views using Python"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor(dictionary=True)
-        database = DB_CONFIG['database']
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Views Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            
-            cursor.execute("SHOW FULL TABLES WHERE Table_type = 'VIEW'")
-            views = cursor.fetchall()
-            
-            if views:
-                for view in views:
-                    view_name = list(view.values())[0] # type: ignore
-                    cursor.execute(f"SHOW CREATE VIEW `{view_name}`")
-                    result = cursor.fetchone()
-                    if result and 'Create View' in result:
-                        create_view = result['Create View'] # type: ignore
-                        f.write(f"-- View: {view_name}\n")
-                        f.write(f"DROP VIEW IF EXISTS `{view_name}`;\n\n")
-                        f.write(f"{create_view};\n\n")
-            else:
-                f.write("-- No views found\n\n")
-        
-        cursor.close()
-        connection.close()
-        
-    except Exception as e:
-        logger.error(f"Error exporting views: {str(e)}")
+        logger.error("❌ mysqldump not found in PATH")
+        complete_file.unlink(missing_ok=True)
+        return {'success': False, 'error': 'mysqldump not found in PATH'}
+    except ValueError as e:
+        logger.error(f"❌ {str(e)}")
+        return {'success': False, 'error': str(e)}
 
 
-def export_using_python():
+def export_backup(incremental: bool = False, base_id: str = None, compression: str = BACKUP_COMPRESSION):
     """
-    Export database using Python mysql.connector
-    Fallback method if mysqldump is not available
+    Backup directory with a manifest, written in a single pass by the backup
+    engine. incremental (or an explicit base_id) writes only the data that
+    changed since the latest (or the given) backup.
     """
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        schema_file = EXPORT_DIR / f"schema_ddl_{timestamp}.sql"
-        data_file = EXPORT_DIR / f"data_dml_{timestamp}.sql"
-        procedures_file = EXPORT_DIR / f"procedures_{timestamp}.sql"
-        functions_file = EXPORT_DIR / f"functions_{timestamp}.sql"
-        triggers_file = EXPORT_DIR / f"triggers_{timestamp}.sql"
-        views_file = EXPORT_DIR / f"views_{timestamp}.sql"
-        complete_file = EXPORT_DIR / f"complete_backup_{timestamp}.sql"
-        
-        logger.info("Connecting to database...")
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor(dictionary=True)
-        database = DB_CONFIG['database']
-        
-        # 1. Export Schema (DDL)
-        logger.info("[1/7] Exporting Schema (DDL)...")
-        with open(schema_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Schema (DDL) Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"CREATE DATABASE IF NOT EXISTS `{database}`;\n")
-            f.write(f"USE `{database}`;\n\n")
-            
-            cursor.execute("SHOW TABLES")
-            tables = [list(row.values())[0] for row in cursor.fetchall()] # type: ignore
-            
-            for table in tables:
-                cursor.execute(f"SHOW CREATE TABLE `{table}`")
-                result = cursor.fetchone()
-                create_statement = list(result.values())[1] # type: ignore
-                f.write(f"-- ============================================\n")
-                f.write(f"-- Table: {table}\n")
-                f.write(f"-- ============================================\n")
-                f.write(f"DROP TABLE IF EXISTS `{table}`;\n\n")
-                f.write(f"{create_statement};\n\n")
-        
-        logger.info(f"✅ Schema exported to: {schema_file.name}")
-        
-        # 2. Export Data (DML)
-        logger.info("[2/7] Exporting Data (DML)...")
-        with open(data_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Data (DML) Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            f.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
-            
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) as count FROM `{table}`")
-                count = cursor.fetchone()['count'] # type: ignore
-                
-                if count > 0: # type: ignore
-                    f.write(f"-- ============================================\n")
-                    f.write(f"-- Data for table: {table} ({count} rows)\n")
-                    f.write(f"-- ============================================\n\n")
-                    
-                    cursor.execute(f"SELECT * FROM `{table}`")
-                    rows = cursor.fetchall()
-                    
-                    if rows:
-                        columns = list(rows[0].keys()) # type: ignore
-                        column_list = ', '.join([f"`{col}`" for col in columns])
-                        
-                        batch_size = 100
-                        for i in range(0, len(rows), batch_size):
-                            batch = rows[i:i+batch_size]
-                            f.write(f"INSERT INTO `{table}` ({column_list}) VALUES\n")
-                            
-                            for idx, row in enumerate(batch):
-                                values = []
-                                for col in columns:
-                                    val = row[col] # type: ignore
-                                    if val is None:
-                                        values.append('NULL')
-                                    elif isinstance(val, (int, float)):
-                                        values.append(str(val))
-                                    elif isinstance(val, bytes):
-                                        values.append(f"X'{val.hex()}'")
-                                    else:
-                                        escaped = str(val).replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r')
-                                        values.append(f"'{escaped}'")
-                                
-                                values_str = '(' + ', '.join(values) + ')'
-                                
-                                if idx < len(batch) - 1:
-                                    f.write(f"  {values_str},\n")
-                                else:
-                                    f.write(f"  {values_str};\n")
-                            
-                            f.write("\n")
-            
-            f.write("SET FOREIGN_KEY_CHECKS=1;\n")
-        
-        logger.info(f"✅ Data exported to: {data_file.name}")
-        
-        # 3. Export Procedures
-        logger.info("[3/7] Exporting Stored Procedures...")
-        with open(procedures_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Stored Procedures Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            f.write("DELIMITER $$\n\n")
-            
-            cursor.execute("SHOW PROCEDURE STATUS WHERE Db = %s", (database,))
-            procedures = cursor.fetchall()
-            
-            if procedures:
-                for proc in procedures:
-                    proc_name = proc['Name'] # type: ignore
-                    cursor.execute(f"SHOW CREATE PROCEDURE `{proc_name}`")
-                    result = cursor.fetchone()
-                    if result and 'Create Procedure' in result:
-                        create_proc = result['Create Procedure'] # type: ignore
-                        f.write(f"-- Procedure: {proc_name}\n")
-                        f.write(f"DROP PROCEDURE IF EXISTS `{proc_name}`$$\n\n")
-                        f.write(f"{create_proc}$$\n\n")
-            else:
-                f.write("-- No stored procedures found\n\n")
-            
-            f.write("DELIMITER ;\n")
-        
-        logger.info(f"✅ Procedures exported to: {procedures_file.name}")
-        
-        # 4. Export Functions
-        logger.info("[4/7] Exporting Functions...")
-        export_functions_only(functions_file, timestamp)
-        logger.info(f"✅ Functions exported to: {functions_file.name}")
-        
-        # 5. Export Triggers
-        logger.info("[5/7] Exporting Triggers...")
-        with open(triggers_file, 'w', encoding='utf-8') as f:
-            f.write(f"-- ============================================\n")
-            f.write(f"-- MedSync Triggers Export\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"-- ============================================\n\n")
-            f.write(f"USE `{database}`;\n\n")
-            f.write("DELIMITER $$\n\n")
-            
-            cursor.execute("SHOW TRIGGERS")
-            triggers = cursor.fetchall()
-            
-            if triggers:
-                for trigger in triggers:
-                    trigger_name = trigger['Trigger'] # type: ignore
-                    cursor.execute(f"SHOW CREATE TRIGGER `{trigger_name}`")
-                    result = cursor.fetchone()
-                    if result and 'SQL Original Statement' in result:
-                        create_trigger = result['SQL Original Statement'] # type: ignore
-                        f.write(f"-- Trigger: {trigger_name}\n")
-                        f.write(f"DROP TRIGGER IF EXISTS `{trigger_name}`$$\n\n")
-                        f.write(f"{create_trigger}$$\n\n")
-            else:
-                f.write("-- No triggers found\n\n")
-            
-            f.write("DELIMITER ;\n")
-        
-        logger.info(f"✅ Triggers exported to: {triggers_file.name}")
-        
-        # 6. Export Views
-        logger.info("[6/7] Exporting Views...")
-        export_views_only(views_file, timestamp)
-        logger.info(f"✅ Views exported to: {views_file.name}")
-        
-        # 7. Create Complete Backup
-        logger.info("[7/7] Creating Complete Backup...")
-        with open(complete_file, 'w', encoding='utf-8') as complete:
-            complete.write(f"-- ============================================\n")
-            complete.write(f"-- MedSync Complete Database Backup\n")
-            complete.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            complete.write(f"-- ============================================\n\n")
-            
-            for file_path in [schema_file, procedures_file, functions_file, triggers_file, views_file, data_file]:
-                if file_path.exists():
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        complete.write(f.read())
-                        complete.write("\n\n")
-        
-        logger.info(f"✅ Complete backup exported to: {complete_file.name}")
-        
-        cursor.close()
-        connection.close()
-        
+        base = None
+        if incremental or base_id:
+            base = find_manifest(EXPORT_DIR, base_id)
+            if base is None:
+                if base_id:
+                    return {'success': False, 'error': f"Backup {base_id} not found"}
+                logger.info("No previous backup found, taking a full backup")
+        
+        manifest = BackupEngine(DB_CONFIG).backup(EXPORT_DIR, base, compression)
         return {
             'success': True,
-            'files': {
-                'schema_ddl': str(schema_file),
-                'data_dml': str(data_file),
-                'procedures': str(procedures_file),
-                'functions': str(functions_file),
-                'triggers': str(triggers_file),
-                'views': str(views_file),
-                'complete_backup': str(complete_file)
-            }
+            'backup_id': manifest['backup_id'],
+            'kind': manifest['kind'],
+            'base': manifest['base'],
+            'manifest': str(EXPORT_DIR / manifest['backup_id'] / MANIFEST_NAME),
+            'stats': manifest['stats']
         }
         
     except Exception as e:
-        logger.error(f"❌ Python export error: {str(e)}")
+        logger.error(f"❌ Backup error: {str(e)}")
         import traceback
         traceback.print_exc()
         return {'success': False, 'error': str(e)}
 
 
-def export_database():
+def export_database(incremental: bool = False, base_id: str = None,
+                    compression: str = BACKUP_COMPRESSION, use_mysqldump: bool = False):
     """
-    Main export function - tries mysqldump first, falls back to Python method
+    Main export function - a manifest backup by default, or a single
+    mysqldump file when use_mysqldump is set
     """
     logger.info("=" * 70)
     logger.info("MedSync Database Export Utility")
@@ -529,20 +140,24 @@ def export_database():
     logger.info(f"Export directory: {EXPORT_DIR}")
     logger.info("=" * 70)
     
-    result = export_using_mysqldump()
+    if use_mysqldump:
+        result = export_using_mysqldump(compression)
+    else:
+        result = export_backup(incremental, base_id, compression)
     
     if result['success']:
         logger.info("\n" + "=" * 70)
         logger.info("✅ Database export completed successfully!")
         logger.info("=" * 70)
-        logger.info("Files created:")
-        logger.info(f"  📄 Schema (DDL):      {Path(result['files']['schema_ddl']).name}")
-        logger.info(f"  📄 Data (DML):        {Path(result['files']['data_dml']).name}")
-        logger.info(f"  📄 Procedures:        {Path(result['files']['procedures']).name}")
-        logger.info(f"  📄 Functions:         {Path(result['files']['functions']).name}")
-        logger.info(f"  📄 Triggers:          {Path(result['files']['triggers']).name}")
-        logger.info(f"  📄 Views:             {Path(result['files']['views']).name}")
-        logger.info(f"  📦 Complete Backup:   {Path(result['files']['complete_backup']).name}")
+        if use_mysqldump:
+            logger.info(f"  📦 Complete Backup:   {Path(result['files']['complete_backup']).name}")
+        else:
+            stats = result['stats']
+            logger.info(f"  📦 Backup:            {result['backup_id']} ({result['kind']}"
+                        f"{', base ' + result['base'] if result['base'] else ''})")
+            logger.info(f"  📄 Files:             {stats['files_written']} written, {stats['files_reused']} reused")
+            logger.info(f"  💾 Size on disk:      {stats['bytes_written'] / 1e6:.1f} MB")
+            logger.info(f"  ⏱  Throughput:        {stats['mb_per_s']} MB/s")
         logger.info(f"\nLocation: {EXPORT_DIR}")
         logger.info("=" * 70)
     else:
@@ -556,5 +171,11 @@ def export_database():
 
 
 if __name__ == "__main__":
-    # Run the export
-    export_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export the database")
+    parser.add_argument("--incremental", action="store_true", help="only what changed since the latest backup")
+    parser.add_argument("--base", help="backup id to take the incremental backup against")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION_SUFFIXES), default=BACKUP_COMPRESSION)
+    parser.add_argument("--mysqldump", action="store_true", help="single mysqldump file (full backups only)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    export_database(args.incremental, args.base, args.compression, args.mysqldump)
@@ -0,0 +1,375 @@
+"""
+Database restore utility for the manifest backups written by db_export.py.
+
+    python -m app.services.db_restore                          # latest backup into DB_NAME
+    python -m app.services.db_restore --backup backup_20250101_020000 --database brightbuy_restore
+    python -m app.services.db_restore --force                  # replace a database that has tables
+
+Phases, each timed:
+  1. schema    - tables created with only their primary key (and the key an
+                 AUTO_INCREMENT column needs)
+  2. data      - RESTORE_WORKERS connections load the data files in
+                 parallel, largest first, with foreign_key_checks and
+                 unique_checks off. The dump's INSERTs are regrouped into
+                 multi-row statements of up to RESTORE_STATEMENT_BYTES
+                 (capped by the server's max_allowed_packet) and committed
+                 once per file. Every file is checked against its CRC32.
+  3. indexes   - secondary indexes added with one ALTER TABLE per table, in
+                 parallel, instead of being maintained row by row
+  4. keys      - foreign keys added (not re-validated, checks are off)
+  5. objects   - procedures, functions, triggers, then views (retried until
+                 views that depend on other views resolve)
+
+The CLI prints the restore summary (row counts, phase timings) as JSON on
+stdout; progress is logged to stderr.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import mysql.connector
+
+from app.db_config import DB_CONFIG
+from app.services.backup_engine import find_manifest, read_backup_file
+from app.services.db_export import EXPORT_DIR
+
+logger = logging.getLogger(__name__)
+
+RESTORE_WORKERS = int(os.getenv('RESTORE_WORKERS', 4))
+RESTORE_STATEMENT_BYTES = int(os.getenv('RESTORE_STATEMENT_BYTES', 4 * 1024 * 1024))
+
+_INDEX_PREFIXES = ('KEY ', 'UNIQUE KEY ', 'FULLTEXT KEY ', 'SPATIAL KEY ')
+_COLUMN_NAME = re.compile(r"^`([^`]+)`")
+_INDEX_COLUMNS = re.compile(r"\(`([^`]+)`")
+
+
+def split_statements(text: str) -> List[str]:
+    """Statements of a mysql client script, honouring DELIMITER lines"""
+    statements = []
+    delimiter = ';'
+    current: List[str] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith('--')):
+            continue
+        if stripped.upper().startswith('DELIMITER '):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        if stripped.endswith(delimiter):
+            current.append(line.rstrip()[:-len(delimiter)])
+            statement = '\n'.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(line)
+    if current and '\n'.join(current).strip():
+        statements.append('\n'.join(current).strip())
+    return statements
+
+
+def split_create_table(statement: str) -> Tuple[str, List[str], List[str]]:
+    """
+    CREATE TABLE without its secondary indexes and foreign keys, plus those
+    definitions to add after the load
+    """
+    lines = statement.split('\n')
+    header, body, footer = lines[0], lines[1:-1], lines[-1]
+    definitions = [line.strip().rstrip(',') for line in body]
+
+    auto_increment = None
+    primary_first = None
+    for definition in definitions:
+        if 'AUTO_INCREMENT' in definition and _COLUMN_NAME.match(definition):
+            auto_increment = _COLUMN_NAME.match(definition).group(1)
+        if definition.startswith('PRIMARY KEY'):
+            match = _INDEX_COLUMNS.search(definition)
+            primary_first = match.group(1) if match else None
+
+    kept, indexes, foreign_keys = [], [], []
+    for definition in definitions:
+        if definition.startswith(_INDEX_PREFIXES):
+            match = _INDEX_COLUMNS.search(definition)
+            # An AUTO_INCREMENT column must stay the first column of some key
+            if auto_increment and auto_increment != primary_first and match and match.group(1) == auto_increment:
+                kept.append(definition)
+                auto_increment = None
+            else:
+                indexes.append(definition)
+        elif definition.startswith('CONSTRAINT') and 'FOREIGN KEY' in definition:
+            foreign_keys.append(definition)
+        else:
+            kept.append(definition)
+    create = header + '\n  ' + ',\n  '.join(kept) + '\n' + footer
+    return create, indexes, foreign_keys
+
+
+def _create_table_name(statement: str) -> Optional[str]:
+    match = re.match(r"CREATE TABLE `([^`]+)`", statement)
+    return match.group(1) if match else None
+
+
+def regroup_inserts(text: str, max_bytes: int) -> List[str]:
+    """
+    Merge the dump's consecutive INSERTs into statements of up to max_bytes.
+    Values never contain a raw newline (they are escaped), so every line is
+    either a statement head or one row.
+    """
+    statements = []
+    head = None
+    rows: List[str] = []
+    size = 0
+    for line in text.split('\n'):
+        if not line or line.startswith('--'):
+            continue
+        if line.startswith('INSERT INTO '):
+            line += '\n'
+            if line != head and rows:
+                statements.append(head + ',\n'.join(rows))
+                rows, size = [], 0
+            head = line
+            continue
+        row = line[:-1]  # trailing ',' or ';'
+        if size and size + len(row) > max_bytes:
+            statements.append(head + ',\n'.join(rows))
+            rows, size = [], 0
+        rows.append(row)
+        size += len(row) + 2
+    if rows:
+        statements.append(head + ',\n'.join(rows))
+    return statements
+
+
+class RestoreEngine:
+    def __init__(self, export_dir: Path, database: str, workers: int = RESTORE_WORKERS,
+                 statement_bytes: int = RESTORE_STATEMENT_BYTES):
+        self.export_dir = Path(export_dir)
+        self.database = database
+        self.workers = max(1, workers)
+        self.statement_bytes = statement_bytes
+        # Notes such as "table does not exist" on DROP ... IF EXISTS are expected here
+        self.db_config = dict(DB_CONFIG, database=database, raise_on_warnings=False, autocommit=False)
+        self.timings: Dict[str, float] = {}
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.db_config)
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+        cursor.close()
+        return conn
+
+    def _phase(self, name: str, started: float):
+        self.timings[name] = round(time.perf_counter() - started, 3)
+        logger.info("Restore phase %s done in %ss", name, self.timings[name])
+
+    def _parallel(self, items: List, work) -> None:
+        """Run work(conn, item) over items on self.workers connections"""
+        pending: "queue.Queue" = queue.Queue()
+        for item in items:
+            pending.put(item)
+        errors: List[BaseException] = []
+
+        def run():
+            conn = self._connect()
+            try:
+                while not errors:
+                    try:
+                        item = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        work(conn, item)
+                    except BaseException as e:
+                        errors.append(e)
+                        return
+            finally:
+                conn.close()
+
+        threads = [threading.Thread(target=run, name=f"restore-{i}", daemon=True)
+                   for i in range(min(self.workers, len(items)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def prepare_database(self, force: bool):
+        server = dict(self.db_config)
+        server.pop('database')
+        conn = mysql.connector.connect(**server)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.database}`")
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.TABLES WHERE table_schema = %s", (self.database,)
+            )
+            existing = cursor.fetchone()[0]
+            if existing and not force:
+                raise ValueError(f"Database {self.database} already has {existing} tables; pass --force to replace them")
+            cursor.execute("SHOW VARIABLES LIKE 'max_allowed_packet'")
+            row = cursor.fetchone()
+            if row:
+                self.statement_bytes = min(self.statement_bytes, int(row[1]) // 2)
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _section(self, manifest: dict, name: str) -> str:
+        text = read_backup_file(self.export_dir, manifest['sections'][name]).decode('utf-8')
+        source = manifest['database']
+        if source != self.database:
+            # Views and routines name their tables with the source schema
+            text = text.replace(f"`{source}`.", f"`{self.database}`.")
+        return text
+
+    def restore(self, manifest: dict, force: bool = False) -> dict:
+        started = time.perf_counter()
+        missing = [
+            entry['file'] for entry in
+            list(manifest['sections'].values()) + [f for t in manifest['tables'].values() for f in t['files']]
+            if not (self.export_dir / entry['file']).exists()
+        ]
+        if missing:
+            raise ValueError(f"Backup {manifest['backup_id']} is missing {len(missing)} files, e.g. {missing[0]}")
+        self.prepare_database(force)
+
+        # 1. Tables with primary keys only
+        phase = time.perf_counter()
+        deferred_indexes: Dict[str, List[str]] = {}
+        deferred_foreign_keys: Dict[str, List[str]] = {}
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            for statement in split_statements(self._section(manifest, 'schema')):
+                table = _create_table_name(statement)
+                if table:
+                    statement, deferred_indexes[table], deferred_foreign_keys[table] = split_create_table(statement)
+                cursor.execute(statement)
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        self._phase('schema', phase)
+
+        # 2. Data, largest files first
+        phase = time.perf_counter()
+        files = sorted(
+            ((name, entry) for name, table in manifest['tables'].items() for entry in table['files']),
+            key=lambda item: item[1]['bytes'], reverse=True
+        )
+        loaded = {'rows': 0, 'bytes': 0}
+        lock = threading.Lock()
+
+        def load(conn, item):
+            name, entry = item
+            data = read_backup_file(self.export_dir, entry)
+            cursor = conn.cursor()
+            try:
+                for statement in regroup_inserts(data.decode('utf-8'), self.statement_bytes):
+                    cursor.execute(statement)
+                conn.commit()
+            finally:
+                cursor.close()
+            with lock:
+                loaded['rows'] += entry['rows']
+                loaded['bytes'] += len(data)
+
+        self._parallel(files, load)
+        self._phase('data', phase)
+
+        # 3. Secondary indexes, one ALTER per table
+        phase = time.perf_counter()
+
+        def add_indexes(conn, item):
+            table, definitions = item
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"ALTER TABLE `{table}` " + ', '.join(f"ADD {d}" for d in definitions))
+            finally:
+                cursor.close()
+
+        self._parallel([(t, d) for t, d in deferred_indexes.items() if d], add_indexes)
+        self._phase('indexes', phase)
+
+        # 4. Foreign keys, 5. routines, triggers and views
+        phase = time.perf_counter()
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            for table, definitions in deferred_foreign_keys.items():
+                if definitions:
+                    cursor.execute(f"ALTER TABLE `{table}` " + ', '.join(f"ADD {d}" for d in definitions))
+            self._phase('keys', phase)
+
+            phase = time.perf_counter()
+            for name in ('routines', 'triggers'):
+                for statement in split_statements(self._section(manifest, name)):
+                    cursor.execute(statement)
+            views = split_statements(self._section(manifest, 'views'))
+            while views:
+                failed = []
+                for statement in views:
+                    try:
+                        cursor.execute(statement)
+                    except mysql.connector.Error:
+                        failed.append(statement)
+                if len(failed) == len(views):
+                    raise ValueError(f"{len(failed)} views could not be created")
+                views = failed
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        self._phase('objects', phase)
+
+        seconds = time.perf_counter() - started
+        result = {
+            "backup_id": manifest['backup_id'],
+            "database": self.database,
+            "tables": len(manifest['tables']),
+            "files": len(files),
+            "rows": loaded['rows'],
+            "mb": round(loaded['bytes'] / 1e6, 2),
+            "seconds": round(seconds, 3),
+            "rows_per_s": round(loaded['rows'] / self.timings['data']) if self.timings['data'] else None,
+            "phases": self.timings,
+            "workers": self.workers,
+        }
+        logger.info(
+            "Restored %s into %s: %s rows in %.1fs (data %ss, indexes %ss)",
+            manifest['backup_id'], self.database, loaded['rows'], seconds,
+            self.timings['data'], self.timings['indexes']
+        )
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore a manifest backup")
+    parser.add_argument("--backup", help="backup id (default: the latest)")
+    parser.add_argument("--database", default=DB_CONFIG['database'], help="target database")
+    parser.add_argument("--workers", type=int, default=RESTORE_WORKERS)
+    parser.add_argument("--statement-bytes", type=int, default=RESTORE_STATEMENT_BYTES)
+    parser.add_argument("--force", action="store_true", help="replace the tables of a non-empty database")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    manifest = find_manifest(EXPORT_DIR, args.backup)
+    if manifest is None:
+        parser.error(f"No backup {'named ' + args.backup if args.backup else 'found'} in {EXPORT_DIR}")
+    result = RestoreEngine(EXPORT_DIR, args.database, args.workers, args.statement_bytes).restore(manifest, args.force)
+    # The restore summary on stdout is the CLI's documented output (logs go to stderr)
+    sys.stdout.write(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Delivery Estimation Service
+Single home for the delivery-time rules used by the cart estimate, checkout
+and the delivery-time-estimates report (mirrored by the CalculateDeliveryDays
+SQL function):
+
+    store pickup                  2 days
+    home delivery, main city      5 days
+    home delivery, other city     7 days
+    any cart variant low on stock +3 days (home delivery only)
+
+The location table rarely changes, so it is held in memory and refreshed on
+a long TTL; stock levels come from the stock service cache.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from app.services.stock import LOW_STOCK_THRESHOLD, stock_service
+
+PICKUP_DAYS = 2
+MAIN_CITY_DAYS = 5
+OTHER_CITY_DAYS = 7
+LOW_STOCK_EXTRA_DAYS = 3
+
+LOCATION_CACHE_TTL_SECONDS = int(os.getenv('LOCATION_CACHE_TTL_SECONDS', 3600))
+
+
+def estimate_days(delivery_method: str, is_main_city: Optional[bool] = None, has_low_stock: bool = False) -> int:
+    """Delivery days for one shipment; unknown cities count as non-main"""
+    if delivery_method == "store_pickup":
+        return PICKUP_DAYS
+    days = MAIN_CITY_DAYS if is_main_city else OTHER_CITY_DAYS
+    if has_low_stock:
+        days += LOW_STOCK_EXTRA_DAYS
+    return days
+
+
+def has_low_stock(quantities: Iterable[int]) -> bool:
+    return any((quantity or 0) < LOW_STOCK_THRESHOLD for quantity in quantities)
+
+
+class LocationCache:
+    """In-memory copy of the location table, indexed by city_id and city name"""
+
+    def __init__(self, ttl_seconds: int = LOCATION_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._rows: List[dict] = []
+        self._by_id: Dict[int, dict] = {}
+        self._by_name: Dict[str, dict] = {}
+        self._loaded_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _usable(self, accept_stale: bool) -> bool:
+        return self._is_fresh() or (accept_stale and self._loaded_at is not None)
+
+    def ensure_loaded(self, cursor):
+        # cursor=None: the caller's cursor is busy streaming rows, so use
+        # whatever is loaded, even if stale
+        accept_stale = cursor is None
+        if self._usable(accept_stale):
+            self.hits += 1
+            return
+        if cursor is None:
+            # Nothing loaded yet: load once with a pooled connection of our own
+            from app.database import get_connection
+
+            conn = get_connection()
+            try:
+                own_cursor = conn.cursor(dictionary=True)
+                try:
+                    self._load(own_cursor, accept_stale)
+                finally:
+                    own_cursor.close()
+            finally:
+                conn.close()
+            return
+        self._load(cursor, accept_stale)
+
+    def _load(self, cursor, accept_stale: bool):
+        with self._lock:
+            if self._usable(accept_stale):
+                self.hits += 1
+                return
+            self.misses += 1
+            cursor.execute("SELECT city_id, city, zip_code, Is_main_city FROM location ORDER BY city")
+            rows = cursor.fetchall()
+            self._rows = rows
+            self._by_id = {row['city_id']: row for row in rows}
+            # MySQL compares city names case-insensitively; match that here
+            self._by_name = {row['city'].lower(): row for row in rows if row['city']}
+            self._loaded_at = time.monotonic()
+
+    def all(self, cursor) -> List[dict]:
+        self.ensure_loaded(cursor)
+        return self._rows
+
+    def by_name(self, cursor, city: Optional[str]) -> Optional[dict]:
+        if not city:
+            return None
+        self.ensure_loaded(cursor)
+        return self._by_name.get(city.strip().lower())
+
+    def by_id(self, cursor, city_id: Optional[int]) -> Optional[dict]:
+        if city_id is None:
+            return None
+        self.ensure_loaded(cursor)
+        return self._by_id.get(city_id)
+
+
+class DeliveryEstimator:
+    def __init__(self, locations: LocationCache):
+        self.locations = locations
+
+    def is_main_city(self, cursor, city: Optional[str] = None, city_id: Optional[int] = None) -> Optional[bool]:
+        """True/False for a known city, None when the city is unknown"""
+        location = self.locations.by_id(cursor, city_id) if city_id is not None else self.locations.by_name(cursor, city)
+        if not location:
+            return None
+        return bool(location['Is_main_city'])
+
+    def estimate_cart(
+        self,
+        cursor,
+        cart_items: List[dict],
+        delivery_method: str,
+        city: Optional[str] = None,
+        city_id: Optional[int] = None,
+    ) -> dict:
+        """
+        Estimate for a cart's items (dicts with variant_id).
+        Items may carry 'stock_quantity' already; otherwise it comes from the
+        stock service. Without a city the main/other city range is returned.
+        """
+        if delivery_method == "store_pickup":
+            return {
+                "estimated_days": PICKUP_DAYS,
+                "delivery_method": delivery_method,
+                "has_low_stock": False,
+                "is_main_city": None
+            }
+
+        missing = [item['variant_id'] for item in cart_items if 'stock_quantity' not in item]
+        stock = stock_service.get_availability(cursor, missing) if missing else {}
+        low_stock = has_low_stock(
+            item['stock_quantity'] if 'stock_quantity' in item else stock.get(item['variant_id'], 0)
+            for item in cart_items
+        )
+
+        if city is None and city_id is None:
+            return {
+                "estimated_days": None,
+                "delivery_method": delivery_method,
+                "has_low_stock": low_stock,
+                "main_city_estimate": estimate_days(delivery_method, True, low_stock),
+                "other_city_estimate": estimate_days(delivery_method, False, low_stock),
+                "message": "Select city for exact estimate"
+            }
+
+        is_main_city = self.is_main_city(cursor, city, city_id)
+        return {
+            "estimated_days": estimate_days(delivery_method, is_main_city, low_stock),
+            "delivery_method": delivery_method,
+            "has_low_stock": low_stock,
+            "is_main_city": bool(is_main_city)
+        }
+
+    def estimate_orders(self, cursor, orders: List[dict]) -> List[dict]:
+        """
+        Batch mode for reports: sets 'is_main_city' and 'base_delivery_days'
+        on each order row (needs delivery_method and city_id or city).
+        Stock is not considered, since it is only known at checkout.
+        """
+        self.locations.ensure_loaded(cursor)
+        for row in orders:
+            if row.get('city_id') is not None:
+                location = self.locations.by_id(cursor, row['city_id'])
+            else:
+                location = self.locations.by_name(cursor, row.get('city'))
+            is_main_city = bool(location['Is_main_city']) if location else None
+            row['is_main_city'] = is_main_city
+            row['base_delivery_days'] = estimate_days(row.get('delivery_method'), is_main_city)
+        return orders
+
+    @staticmethod
+    def estimated_date(days: int, start: Optional[datetime] = None) -> date:
+        return ((start or datetime.utcnow()) + timedelta(days=days)).date()
+
+
+location_cache = LocationCache()
+delivery_estimator = DeliveryEstimator(location_cache)
@@ -0,0 +1,102 @@
+"""
+Email Outbox
+Emails written to the email_outbox table (database/inventory_alerts.sql)
+in the writer's transaction and delivered later by a background worker, so
+requests never wait on SMTP and a failed send is retried instead of lost.
+
+Each delivery claims one row with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of API processes can drain the same outbox without sending twice.
+"""
+import logging
+import os
+from typing import Optional
+
+from app.services.email_service import send_email
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_BATCH_SIZE = 50
+
+
+def enqueue(cursor, to_email: str, subject: str, text_body: str, html_body: str,
+            dedupe_key: Optional[str] = None) -> bool:
+    """Queue an email; returns False when dedupe_key was already queued"""
+    cursor.execute(
+        """INSERT IGNORE INTO email_outbox (to_email, subject, text_body, html_body, dedupe_key)
+           VALUES (%s, %s, %s, %s, %s)""",
+        (to_email, subject, text_body, html_body, dedupe_key)
+    )
+    return cursor.rowcount == 1
+
+
+class EmailOutbox:
+    def __init__(self, max_attempts: int = OUTBOX_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.sent = 0
+        self.failed = 0
+        self.pending = 0
+
+    def _deliver_one(self, conn, cursor) -> bool:
+        """Send the oldest pending email; False when there is none"""
+        conn.start_transaction()
+        cursor.execute(
+            """SELECT email_id, to_email, subject, text_body, html_body, attempts
+               FROM email_outbox
+               WHERE status = 'pending'
+               ORDER BY email_id
+               LIMIT 1
+               FOR UPDATE SKIP LOCKED"""
+        )
+        email = cursor.fetchone()
+        if not email:
+            conn.rollback()
+            return False
+
+        if send_email(email['to_email'], email['subject'], email['text_body'], email['html_body']):
+            cursor.execute(
+                "UPDATE email_outbox SET status = 'sent', attempts = attempts + 1, sent_at = NOW() WHERE email_id = %s",
+                (email['email_id'],)
+            )
+            self.sent += 1
+        else:
+            attempts = email['attempts'] + 1
+            status = 'failed' if attempts >= self.max_attempts else 'pending'
+            cursor.execute(
+                "UPDATE email_outbox SET status = %s, attempts = %s, last_error = %s WHERE email_id = %s",
+                (status, attempts, "SMTP send failed", email['email_id'])
+            )
+            self.failed += 1
+            conn.commit()
+            # Retry on the next pass rather than spinning on a broken SMTP server
+            return False
+        conn.commit()
+        return True
+
+    def deliver_pending(self, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+        """Send up to batch_size queued emails; returns how many were sent"""
+        from app.database import get_connection
+
+        conn = get_connection()
+        cursor = None
+        sent = 0
+        try:
+            cursor = conn.cursor(dictionary=True)
+            while sent < batch_size and self._deliver_one(conn, cursor):
+                sent += 1
+            cursor.execute("SELECT COUNT(*) AS pending FROM email_outbox WHERE status = 'pending'")
+            self.pending = cursor.fetchone()['pending']
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+        return sent
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "sent": self.sent, "failed_attempts": self.failed}
+
+
+email_outbox = EmailOutbox()
@@ -23,7 +23,7 @@ MAIL_STARTTLS = os.getenv('MAIL_STARTTLS', 'True').lower() == 'true'
 MAIL_SSL_TLS = os.getenv('MAIL_SSL_TLS', 'False').lower() == 'true'
 
 # Log configuration (without password) for debugging
-logger.info(f"Email config loaded - Server: {SMTP_HOST}:{SMTP_PORT}, User: {SMTP_USER}, STARTTLS: {MAIL_STARTTLS}")
+logger.info("Email config loaded - Server: %s:%s, User: %s, STARTTLS: %s", SMTP_HOST, SMTP_PORT, SMTP_USER, MAIL_STARTTLS)
 
 def send_verification_code(to_email: str, code: str, user_name: str) -> bool:
     """
@@ -161,19 +161,19 @@ def send_verification_code(to_email: str, code: str, user_name: str) -> bool:
             server.login(SMTP_USER, SMTP_PASSWORD)
             server.send_message(message)
         
-        logger.info(f"Verification code sent successfully to {to_email}")
+        logger.info("Verification code sent successfully to %s", to_email)
         return True
         
     except smtplib.SMTPAuthenticationError as e:
-        logger.error(f"SMTP Authentication failed for {to_email}: {str(e)}")
+        logger.error("SMTP Authentication failed for %s: %s", to_email, e)
         logger.error("Check MAIL_USERNAME and MAIL_PASSWORD in .env file")
         return False
     except smtplib.SMTPException as e:
-        logger.error(f"SMTP error sending to {to_email}: {str(e)}")
+        logger.error("SMTP error sending to %s: %s", to_email, e)
         return False
     except Exception as e:
-        logger.error(f"Failed to send verification code to {to_email}: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        logger.error("Failed to send verification code to %s: %s", to_email, e)
+        logger.error("Error type: %s", type(e).__name__)
         return False
 
 def send_order_confirmation(
@@ -316,12 +316,40 @@ def send_order_confirmation(
                         server.login(SMTP_USER, SMTP_PASSWORD)
                         server.send_message(message)
 
-                logger.info(f"Order confirmation sent to {to_email} for order #{order_id}")
+                logger.info("Order confirmation sent to %s for order #%s", to_email, order_id)
                 return True
         except Exception as e:
-                logger.error(f"Failed to send order confirmation to {to_email}: {str(e)}")
+                logger.error("Failed to send order confirmation to %s: %s", to_email, e)
                 return False
 
+def send_email(to_email: str, subject: str, text_content: str, html_content: str) -> bool:
+    """
+    Send a plain text + HTML email (used by the email outbox)
+    
+    Returns:
+        bool: True if email sent successfully, False otherwise
+    """
+    try:
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = f'{FROM_NAME} <{FROM_EMAIL}>'
+        message['To'] = to_email
+        message.attach(MIMEText(text_content, 'plain'))
+        message.attach(MIMEText(html_content, 'html'))
+        
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as server:
+            server.set_debuglevel(0)
+            if MAIL_STARTTLS:
+                server.starttls()
+            server.login(SMTP_USER, SMTP_PASSWORD)
+            server.send_message(message)
+        
+        logger.info("Email '%s' sent to %s", subject, to_email)
+        return True
+    except Exception as e:
+        logger.error("Failed to send '%s' to %s: %s", subject, to_email, e)
+        return False
+
 def test_email_configuration() -> bool:
     """
     Test if email configuration is valid
@@ -340,5 +368,5 @@ def test_email_configuration() -> bool:
         logger.info("Email configuration is valid")
         return True
     except Exception as e:
-        logger.error(f"Email configuration test failed: {str(e)}")
+        logger.error("Email configuration test failed: %s", e)
         return False
@@ -0,0 +1,77 @@
+"""
+Health Probes
+GET /healthz answers from memory: the process is up and serving. GET /readyz
+also needs the database reachable and the stock cache loaded by its first
+reconcile, since the read paths answer from it.
+
+The database check borrows a pooled connection for SELECT 1 and keeps the
+result for READY_CHECK_SECONDS, so probes from a load balancer or
+orchestrator cost at most one checkout per interval however often they run.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+READY_CHECK_SECONDS = float(os.getenv('READY_CHECK_SECONDS', 5))
+
+
+class ReadinessProbe:
+    def __init__(self, check_seconds: float = READY_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._database_error: Optional[str] = None
+        self.started_at = time.time()
+
+    def _check_database(self) -> Optional[str]:
+        from app.database import get_connection
+
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return None
+        except Exception as e:
+            return str(e)
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def database_error(self) -> Optional[str]:
+        """None when the database answered within the last check_seconds"""
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return self._database_error
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+                error = self._check_database()
+                if error and not self._database_error:
+                    logger.warning("Readiness: database check failed: %s", error)
+                self._database_error = error
+                self._checked_at = time.monotonic()
+            return self._database_error
+
+    def check(self) -> dict:
+        from app.services.stock import stock_service
+
+        database_error = self.database_error()
+        checks = {
+            "database": database_error or "ok",
+            "stock_cache": "ok" if stock_service.reconciled else "loading",
+        }
+        return {
+            "ready": database_error is None and stock_service.reconciled,
+            "checks": checks,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+
+
+readiness = ReadinessProbe()
@@ -0,0 +1,269 @@
+"""
+Inventory Alerts
+Push-based low-stock tracking. The low-stock index subscribes to the stock
+service, so every write-through (checkout, admin quantity updates, the
+periodic reconcile) re-evaluates that variant's alert level immediately
+instead of GetLowStockVariants scanning the variant table on each request.
+
+The index keeps the variants at or below LOW_STOCK_TRACK_LIMIT units as a
+sorted list of (quantity, variant_id), so the low-stock endpoint is a bisect
+plus one primary-key lookup for names and one read of the daily variant
+rollup for sales velocity.
+
+When a variant's level gets worse (LOW -> CRITICAL -> OUT OF STOCK at
+INVENTORY_ALERT_THRESHOLD) the alert worker queues an email to every admin
+subscribed at that level in the email outbox, then drains the outbox.
+"""
+import bisect
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services import sales_facts
+from app.services.email_outbox import email_outbox, enqueue
+from app.services.stock import LOW_STOCK_THRESHOLD, stock_service
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_TRACK_LIMIT = int(os.getenv('LOW_STOCK_TRACK_LIMIT', 100))
+INVENTORY_ALERT_THRESHOLD = int(os.getenv('INVENTORY_ALERT_THRESHOLD', LOW_STOCK_THRESHOLD))
+INVENTORY_ALERT_SECONDS = int(os.getenv('INVENTORY_ALERT_SECONDS', 30))
+SUBSCRIPTION_CACHE_SECONDS = 60
+
+# Least to most severe
+ALERT_LEVELS = ("LOW", "CRITICAL", "OUT OF STOCK")
+
+
+def alert_level(quantity: int, threshold: int) -> Optional[str]:
+    """
+    Same levels as GetLowStockVariants: below the threshold is LOW, below
+    half of it CRITICAL; None at or above the threshold
+    """
+    if quantity >= threshold:
+        return None
+    if quantity <= 0:
+        return "OUT OF STOCK"
+    if quantity < threshold / 2:
+        return "CRITICAL"
+    return "LOW"
+
+
+def severity(level: Optional[str]) -> int:
+    return ALERT_LEVELS.index(level) + 1 if level else 0
+
+
+def describe_variants(cursor, variant_ids: Iterable[int]) -> Dict[int, dict]:
+    """Variant, product and category details by variant id"""
+    variant_ids = list(dict.fromkeys(variant_ids))
+    if not variant_ids:
+        return {}
+    cursor.execute(
+        f"""SELECT v.variant_id, v.variant_name, v.price, v.SKU,
+                   p.product_id, p.product_name, c.category_id, c.category_name
+            FROM variant v
+            JOIN product p ON v.product_id = p.product_id
+            LEFT JOIN category c ON p.category_id = c.category_id
+            WHERE v.variant_id IN ({', '.join(['%s'] * len(variant_ids))})""",
+        tuple(variant_ids)
+    )
+    return {row['variant_id']: row for row in cursor.fetchall()}
+
+
+class LowStockIndex:
+    def __init__(self, limit: int = LOW_STOCK_TRACK_LIMIT, alert_threshold: int = INVENTORY_ALERT_THRESHOLD):
+        self.limit = limit
+        self.alert_threshold = alert_threshold
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[int, int]] = []
+        self._quantities: Dict[int, int] = {}
+        self._loaded = False
+        self.transitions: "queue.Queue[Tuple[int, str, int]]" = queue.Queue()
+        stock_service.subscribe(self.on_stock_change)
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        if not stock_service.reconciled:
+            stock_service.reconcile()
+        with self._lock:
+            if self._loaded:
+                return
+            tracked = {v: q for v, q in stock_service.snapshot().items() if q <= self.limit}
+            self._quantities = tracked
+            self._entries = sorted((q, v) for v, q in tracked.items())
+            self._loaded = True
+        logger.info("Low-stock index loaded with %s variants at or below %s", len(tracked), self.limit)
+
+    def on_stock_change(self, variant_id: int, quantity: Optional[int]):
+        """Stock service listener: move the variant in the index, queue worse alert levels"""
+        with self._lock:
+            if not self._loaded:
+                return
+            old = self._quantities.pop(variant_id, None)
+            if old is not None:
+                del self._entries[bisect.bisect_left(self._entries, (old, variant_id))]
+            if quantity is not None and quantity <= self.limit:
+                self._quantities[variant_id] = quantity
+                bisect.insort(self._entries, (quantity, variant_id))
+
+        if quantity is None:
+            return
+        # Untracked variants are above the limit, so above any alert threshold
+        previous_level = alert_level(old, self.alert_threshold) if old is not None else None
+        level = alert_level(quantity, self.alert_threshold)
+        if severity(level) > severity(previous_level):
+            self.transitions.put((variant_id, level, quantity))
+
+    def below(self, threshold: int) -> List[Tuple[int, int]]:
+        """(variant_id, quantity) below threshold, lowest quantity first"""
+        if threshold > self.limit:
+            raise ValueError(f"threshold is limited to {self.limit}")
+        self.ensure_loaded()
+        with self._lock:
+            end = bisect.bisect_left(self._entries, (threshold,))
+            return [(variant_id, quantity) for quantity, variant_id in self._entries[:end]]
+
+
+class InventoryAlertService:
+    def __init__(self, index: LowStockIndex):
+        self.index = index
+        self._subscriptions: List[dict] = []
+        self._subscriptions_loaded_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.alerts_queued = 0
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, cursor, user_id: int, email: str, min_level: str):
+        if min_level not in ALERT_LEVELS:
+            raise ValueError(f"Invalid min_level '{min_level}'. Must be one of: {', '.join(ALERT_LEVELS)}")
+        cursor.execute(
+            """INSERT INTO inventory_alert_subscriptions (user_id, email, min_level)
+               VALUES (%s, %s, %s)
+               ON DUPLICATE KEY UPDATE email = %s, min_level = %s""",
+            (user_id, email, min_level, email, min_level)
+        )
+        self._subscriptions_loaded_at = None
+
+    def unsubscribe(self, cursor, subscription_id: int) -> bool:
+        cursor.execute("DELETE FROM inventory_alert_subscriptions WHERE subscription_id = %s", (subscription_id,))
+        self._subscriptions_loaded_at = None
+        return cursor.rowcount > 0
+
+    def list_subscriptions(self, cursor) -> List[dict]:
+        cursor.execute(
+            """SELECT subscription_id, user_id, email, min_level, created_at
+               FROM inventory_alert_subscriptions ORDER BY subscription_id"""
+        )
+        return cursor.fetchall()
+
+    def _subscribers(self, cursor) -> List[dict]:
+        loaded_at = self._subscriptions_loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > SUBSCRIPTION_CACHE_SECONDS:
+            self._subscriptions = self.list_subscriptions(cursor)
+            self._subscriptions_loaded_at = time.monotonic()
+        return self._subscriptions
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def _drain(self) -> Dict[int, Tuple[str, int]]:
+        """Latest transition per variant"""
+        latest = {}
+        while True:
+            try:
+                variant_id, level, quantity = self.index.transitions.get_nowait()
+            except queue.Empty:
+                return latest
+            latest[variant_id] = (level, quantity)
+
+    def _queue_emails(self, cursor, transitions: Dict[int, Tuple[str, int]]) -> int:
+        subscribers = self._subscribers(cursor)
+        if not subscribers:
+            return 0
+        variants = describe_variants(cursor, transitions)
+        velocity = sales_facts.variant_velocity(cursor, transitions)
+        today = date.today().isoformat()
+        queued = 0
+        for variant_id, (level, quantity) in transitions.items():
+            variant = variants.get(variant_id)
+            if not variant:
+                continue
+            name = f"{variant['product_name']} - {variant['variant_name']}"
+            sold = velocity.get(variant_id, 0)
+            subject = f"[BrightBuy] {level}: {name}"
+            text = (
+                f"{name} (SKU {variant['SKU']}) is {level.lower()}: {quantity} left.\n"
+                f"Sold in the last 30 days: {sold}\n"
+            )
+            html = (
+                f"<p><strong>{name}</strong> (SKU {variant['SKU']}) is <strong>{level.lower()}</strong>: "
+                f"{quantity} left.</p><p>Sold in the last 30 days: {sold}</p>"
+            )
+            for subscriber in subscribers:
+                if severity(level) < severity(subscriber['min_level']):
+                    continue
+                dedupe_key = f"low-stock:{variant_id}:{level}:{today}:{subscriber['user_id']}"
+                if enqueue(cursor, subscriber['email'], subject, text, html, dedupe_key):
+                    queued += 1
+        return queued
+
+    def run_once(self) -> int:
+        """Queue emails for the pending level changes and send the outbox"""
+        self.index.ensure_loaded()
+        transitions = self._drain()
+        queued = 0
+        if transitions:
+            from app.database import get_connection
+
+            conn = get_connection()
+            cursor = None
+            try:
+                cursor = conn.cursor(dictionary=True)
+                queued = self._queue_emails(cursor, transitions)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                # Put them back for the next pass
+                for variant_id, (level, quantity) in transitions.items():
+                    self.index.transitions.put((variant_id, level, quantity))
+                raise
+            finally:
+                if cursor:
+                    cursor.close()
+                conn.close()
+            self.alerts_queued += queued
+            if queued:
+                logger.info("Queued %s low-stock alert emails for %s variants", queued, len(transitions))
+        email_outbox.deliver_pending()
+        return queued
+
+    def _run(self, interval: int):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Inventory alert pass failed: %s", e)
+            self._stop.wait(interval)
+
+    def start(self, interval: int = INVENTORY_ALERT_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="inventory-alerts", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+low_stock_index = LowStockIndex()
+inventory_alerts = InventoryAlertService(low_stock_index)
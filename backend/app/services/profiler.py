@@ -0,0 +1,273 @@
+"""
+Sampling Profiler
+On-demand stack sampling for diagnosing slow paths in a running API process.
+A session starts a sampler thread that reads every thread's stack with
+sys._current_frames() at a fixed interval and counts identical stacks; the
+result is exported in the collapsed format flamegraph.pl, speedscope and
+inferno read ("frame;frame;frame count" per line, root first).
+
+Two modes:
+
+  sample   every thread, for a number of seconds. By default only stacks
+           that pass through app/ code are kept, which drops idle pool
+           threads and the server's own loop.
+  route    the next N requests to one route. Only stacks inside that route's
+           endpoint function are kept, rooted at it, and the session ends
+           after N matching requests finish (or on its timeout).
+
+Nothing runs while no session is active: the sampler thread exists only for
+the session and ProfilerMiddleware reduces to one attribute check. Report
+PDFs render in worker processes, so report routes show the fetch and the
+wait for the render, not the layout itself.
+"""
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_INTERVAL_SECONDS = 0.01
+PROFILE_MAX_SECONDS = 300
+PROFILE_MAX_REQUESTS = 1000
+PROFILES_KEPT = 20
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_ROOT = os.path.dirname(APP_DIR)
+
+
+class ProfilerBusy(Exception):
+    """Raised when a session is started while another one is running"""
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(SOURCE_ROOT):
+        filename = os.path.relpath(filename, SOURCE_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # ';' separates frames and the last ' ' separates the count
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileSession:
+    def __init__(self, mode: str, target: str, seconds: float, interval: float,
+                 root_code=None, requests: Optional[int] = None, app_only: bool = True):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.target = target
+        self.seconds = seconds
+        self.interval = interval
+        self.root_code = root_code
+        self.requests_wanted = requests
+        self.requests_seen = 0
+        self.app_only = app_only
+        self.status = "running"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.ticks = 0
+        self.samples: Counter = Counter()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.stopped.is_set()
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            samples = sum(self.samples.values())
+            distinct = len(self.samples)
+        return {
+            "session_id": self.session_id,
+            "mode": self.mode,
+            "target": self.target,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": self.seconds,
+            "interval_ms": round(self.interval * 1000, 3),
+            "requests_wanted": self.requests_wanted,
+            "requests_seen": self.requests_seen,
+            "ticks": self.ticks,
+            "samples": samples,
+            "distinct_stacks": distinct,
+        }
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, heaviest first"""
+        with self.lock:
+            samples = self.samples.most_common()
+        labels: Dict[object, str] = {}
+        lines = []
+        for (root, codes), count in samples:
+            frames = [root]
+            for code in codes:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                frames.append(label)
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, ProfileSession] = {}
+        self._active: Optional[ProfileSession] = None
+        # The route session ProfilerMiddleware reports to; None when idle
+        self.route_session: Optional[ProfileSession] = None
+        self.route_path: Optional[str] = None
+        self.route_methods: Optional[set] = None
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def _start(self, session: ProfileSession, route=None):
+        with self._lock:
+            if self._active is not None and not self._active.done:
+                raise ProfilerBusy(f"Profiling session {self._active.session_id} is still running")
+            self._active = session
+            if route is not None:
+                # Set before the sampler starts, and the session last, since
+                # ProfilerMiddleware reads them as soon as route_session is set
+                self.route_path = route.path
+                self.route_methods = set(route.methods or [])
+                self.route_session = session
+            self._sessions[session.session_id] = session
+            if len(self._sessions) > PROFILES_KEPT:
+                finished = sorted((s for s in self._sessions.values() if s.done), key=lambda s: s.started_at)
+                for old in finished[:len(self._sessions) - PROFILES_KEPT]:
+                    self._sessions.pop(old.session_id, None)
+        threading.Thread(target=self._run, args=(session,), name="profiler-sampler", daemon=True).start()
+        logger.info("Profiling session %s started: %s %s", session.session_id, session.mode, session.target)
+        return session
+
+    def sample(self, seconds: float, interval: float = PROFILE_INTERVAL_SECONDS,
+               app_only: bool = True) -> ProfileSession:
+        """Sample every thread for the given number of seconds"""
+        if not 0 < seconds <= PROFILE_MAX_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {PROFILE_MAX_SECONDS}")
+        return self._start(ProfileSession("sample", "all threads", seconds, interval, app_only=app_only))
+
+    def profile_route(self, route, requests: int, timeout: float,
+                      interval: float = PROFILE_INTERVAL_SECONDS) -> ProfileSession:
+        """Sample the endpoint of an APIRoute until requests of it have finished"""
+        if not 0 < requests <= PROFILE_MAX_REQUESTS:
+            raise ValueError(f"requests must be between 1 and {PROFILE_MAX_REQUESTS}")
+        if not 0 < timeout <= PROFILE_MAX_SECONDS:
+            raise ValueError(f"timeout must be between 0 and {PROFILE_MAX_SECONDS}")
+        methods = sorted(route.methods or [])
+        session = ProfileSession(
+            "route", f"{','.join(methods)} {route.path}", timeout, interval,
+            root_code=inspect.unwrap(route.endpoint).__code__, requests=requests, app_only=False
+        )
+        return self._start(session, route)
+
+    def get(self, session_id: str) -> Optional[ProfileSession]:
+        return self._sessions.get(session_id)
+
+    def sessions(self) -> List[ProfileSession]:
+        return sorted(self._sessions.values(), key=lambda s: s.started_at, reverse=True)
+
+    def stop(self, session_id: str) -> Optional[ProfileSession]:
+        session = self._sessions.get(session_id)
+        if session is not None and not session.done:
+            session.status = "cancelled"
+            session.stopped.set()
+        return session
+
+    def request_finished(self, scope: dict):
+        """Called by ProfilerMiddleware for every request while a route session runs"""
+        route = scope.get("route")
+        if route is None:
+            return
+        with self._lock:
+            # Read together, under the lock the sampler thread clears them with
+            session = self.route_session
+            if (session is None or route.path != self.route_path
+                    or scope.get("method") not in self.route_methods):
+                return
+            session.requests_seen += 1
+            if session.requests_seen >= session.requests_wanted:
+                session.stopped.set()
+
+    # ------------------------------------------------------------------
+    # Sampler thread
+    # ------------------------------------------------------------------
+
+    def _tick(self, session: ProfileSession, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks: List[Tuple[str, tuple]] = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            if session.root_code is not None:
+                try:
+                    codes = codes[codes.index(session.root_code):]
+                except ValueError:
+                    continue
+                root = session.target
+            else:
+                if session.app_only and not any(code.co_filename.startswith(APP_DIR) for code in codes):
+                    continue
+                root = names.get(ident, f"thread-{ident}")
+            stacks.append((root, tuple(codes)))
+        with session.lock:
+            session.samples.update(stacks)
+
+    def _run(self, session: ProfileSession):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + session.seconds
+        try:
+            while not session.stopped.is_set() and time.monotonic() < deadline:
+                self._tick(session, own_ident)
+                session.ticks += 1
+                session.stopped.wait(session.interval)
+        except Exception as e:
+            logger.error("Profiling session %s failed: %s", session.session_id, e)
+            session.status = "failed"
+        finally:
+            with self._lock:
+                if self.route_session is session:
+                    self.route_session = None
+                    self.route_path = None
+                    self.route_methods = None
+            if session.status == "running":
+                session.status = "completed"
+            session.finished_at = time.time()
+            session.stopped.set()
+            logger.info("Profiling session %s %s: %s samples in %s ticks",
+                        session.session_id, session.status, session.to_dict()['samples'], session.ticks)
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware counting finished requests for a route profiling session"""
+
+    def __init__(self, app, sampler: SamplingProfiler = profiler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if self.sampler.route_session is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.sampler.request_finished(scope)
@@ -0,0 +1,259 @@
+"""
+Query Statistics
+Per-request SQL accounting. Connections from app.database hand out cursors
+that time every execute (and the fetches that follow it) and report here.
+QueryStatsMiddleware opens a RequestQueries for each HTTP request in a
+context variable, which Starlette carries into the threadpool that runs the
+sync endpoints, so every statement lands on the request that issued it.
+
+Statements are grouped by fingerprint: literals, placeholders and IN lists
+collapsed, whitespace normalised. Per fingerprint we keep calls and time;
+per route template, histograms of statements and database time per request
+plus the slowest statements of the slowest request seen. GET /metrics/queries
+returns both.
+
+Statements slower than SLOW_QUERY_MS are logged with their route. With
+DEBUG=true every response carries a Server-Timing header with the request's
+database time and statement count.
+"""
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+DEBUG = os.getenv('DEBUG', 'false').lower() in ('1', 'true', 'yes')
+REQUEST_SLOWEST = 5
+FINGERPRINT_LIMIT = 1000
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+DB_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"(?<![\w`.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\?")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LISTS = re.compile(r"\bVALUES\s*\(([?,\s]*)\)(?:\s*,\s*\([?,\s]*\))*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """SQL with literals and placeholders replaced by ?, IN and VALUES lists collapsed"""
+    text = _COMMENTS.sub(" ", sql)
+    text = _STRINGS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _IN_LISTS.sub("IN (...)", text)
+    text = _VALUES_LISTS.sub(lambda m: f"VALUES ({m.group(1).strip()})", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram(self.buckets)
+        histogram.counts = list(self.counts)
+        histogram.total = self.total
+        histogram.count = self.count
+        return histogram
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            running += count
+            result.append((str(bound), running))
+        return result
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": round(self.total, 6), "buckets": dict(self.cumulative())}
+
+
+class RequestQueries:
+    """Statements issued while serving one request"""
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # [seconds, fingerprint]; fetches add to the statement that produced the rows
+        self.statements: List[list] = []
+
+    def slowest(self, limit: int = REQUEST_SLOWEST) -> List[list]:
+        return sorted(self.statements, key=lambda entry: entry[0], reverse=True)[:limit]
+
+
+class RouteQueries:
+    def __init__(self):
+        self.requests = 0
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram(DB_SECONDS_BUCKETS)
+        # The request with the most database time so far, and its slowest statements
+        self.slowest_seconds = 0.0
+        self.slowest_statements: List[list] = []
+
+
+class QueryStats:
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS):
+        self.slow_seconds = slow_query_ms / 1000
+        self._lock = threading.Lock()
+        self._current: ContextVar[Optional[RequestQueries]] = ContextVar('request_queries', default=None)
+        # (method, route template) -> RouteQueries
+        self.routes: Dict[Tuple[str, str], RouteQueries] = {}
+        # fingerprint -> [calls, seconds, max_seconds]
+        self.fingerprints: Dict[str, list] = {}
+        self.untracked = 0
+
+    # ------------------------------------------------------------------
+    # Recording (called from the cursor wrappers)
+    # ------------------------------------------------------------------
+
+    def executed(self, sql, seconds: float) -> list:
+        """Record one statement; returns its entry for the fetch time to be added to"""
+        fp = fingerprint(sql if isinstance(sql, str) else str(sql))
+        entry = [seconds, fp]
+        request = self._current.get()
+        if request is not None:
+            request.count += 1
+            request.seconds += seconds
+            request.statements.append(entry)
+        with self._lock:
+            stats = self.fingerprints.get(fp)
+            if stats is None:
+                if len(self.fingerprints) >= FINGERPRINT_LIMIT:
+                    self.untracked += 1
+                    return entry
+                stats = self.fingerprints[fp] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        return entry
+
+    def fetched(self, entry: list, seconds: float):
+        entry[0] += seconds
+        request = self._current.get()
+        if request is not None:
+            request.seconds += seconds
+        with self._lock:
+            stats = self.fingerprints.get(entry[1])
+            if stats is not None:
+                stats[1] += seconds
+                stats[2] = max(stats[2], entry[0])
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def begin_request(self):
+        return self._current.set(RequestQueries())
+
+    def current(self) -> Optional[RequestQueries]:
+        return self._current.get()
+
+    def end_request(self, token, route: str, method: str) -> RequestQueries:
+        request = self._current.get()
+        self._current.reset(token)
+        with self._lock:
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[(method, route)] = RouteQueries()
+            stats.requests += 1
+            stats.queries.observe(request.count)
+            stats.db_seconds.observe(request.seconds)
+            if request.seconds > stats.slowest_seconds:
+                stats.slowest_seconds = request.seconds
+                stats.slowest_statements = request.slowest()
+        for seconds, fp in request.statements:
+            if seconds >= self.slow_seconds:
+                logger.warning("Slow query (%.0f ms) in %s %s: %s", seconds * 1000, method, route, fp[:500])
+        return request
+
+    def route_histograms(self) -> List[Tuple[str, str, Histogram, Histogram]]:
+        """(method, route, statements per request, DB seconds per request) for each route"""
+        with self._lock:
+            return [(method, route, stats.queries.copy(), stats.db_seconds.copy())
+                    for (method, route), stats in sorted(self.routes.items())]
+
+    def snapshot(self, top: int = 20) -> dict:
+        with self._lock:
+            fingerprints = sorted(self.fingerprints.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            return {
+                "routes": {
+                    f"{method} {route}": {
+                        "requests": stats.requests,
+                        "queries_per_request": stats.queries.to_dict(),
+                        "db_seconds_per_request": stats.db_seconds.to_dict(),
+                        "slowest_request": {
+                            "db_ms": round(stats.slowest_seconds * 1000, 2),
+                            "statements": [{"fingerprint": fp, "ms": round(seconds * 1000, 2)}
+                                           for seconds, fp in stats.slowest_statements],
+                        },
+                    }
+                    for (method, route), stats in sorted(self.routes.items())
+                },
+                "top_statements": [
+                    {"fingerprint": fp, "calls": calls, "total_ms": round(seconds * 1000, 2),
+                     "mean_ms": round(seconds * 1000 / calls, 3), "max_ms": round(max_seconds * 1000, 2)}
+                    for fp, (calls, seconds, max_seconds) in fingerprints
+                ],
+                "distinct_statements": len(self.fingerprints),
+                "untracked_statements": self.untracked,
+            }
+
+
+query_stats = QueryStats()
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: one RequestQueries per HTTP request, Server-Timing in debug"""
+
+    def __init__(self, app, stats: QueryStats = query_stats, debug: bool = DEBUG):
+        self.app = app
+        self.stats = stats
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        token = self.stats.begin_request()
+        request = self.stats.current()
+
+        async def send_with_timing(message):
+            if self.debug and message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                value = (f'db;dur={request.seconds * 1000:.2f};desc="{request.count} queries", '
+                         f'app;dur={total_ms:.2f}')
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (b"server-timing", value.encode("latin-1"))
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            self.stats.end_request(token, getattr(route, "path", None) or "unmatched", scope.get("method", ""))
@@ -0,0 +1,160 @@
+"""
+Report Export
+Writes a report's rows as CSV, NDJSON or an Arrow IPC file straight from the
+cursor, without building any ReportLab objects. Rows are fetched in chunks of
+REPORT_FETCH_CHUNK_ROWS and written as they arrive; for Arrow each chunk
+becomes one columnar record batch.
+
+Arrow needs pyarrow, which is optional: without it the format is rejected and
+CSV/NDJSON keep working.
+
+A report with no rows raises ReportNotFound, as the PDF path does, rather
+than producing an empty file.
+"""
+import csv
+import itertools
+import json
+import logging
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from app.services.report_rendering import REPORTS, REPORT_FETCH_CHUNK_ROWS, ReportNotFound
+
+logger = logging.getLogger(__name__)
+
+# format -> (file extension, media type)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("csv", "text/csv"),
+    "ndjson": ("ndjson", "application/x-ndjson"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+# Scale used for DECIMAL columns; covers every money/average column in the views
+ARROW_DECIMAL_SCALE = 10
+
+
+def export_filename(report_type: str, params: dict, fmt: str) -> str:
+    """The report's PDF filename with the export extension"""
+    base, _ = os.path.splitext(REPORTS[report_type].filename(params))
+    return f"{base}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def _chunks(cursor, enrich, chunk_rows: int) -> Iterator[List[dict]]:
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        yield enrich(rows) if enrich else rows
+
+
+def _write_csv(chunks: Iterator[List[dict]], f):
+    writer = None
+    for rows in chunks:
+        if writer is None:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def _write_ndjson(chunks: Iterator[List[dict]], f):
+    dumps = json.dumps
+    for rows in chunks:
+        f.write("\n".join(dumps(row, default=str) for row in rows))
+        f.write("\n")
+
+
+def _arrow_field(name: str, values: List[Any]):
+    """Column type from the first non-null value in the chunk"""
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, bool):
+        return pa.field(name, pa.bool_())
+    if isinstance(sample, int):
+        return pa.field(name, pa.int64())
+    if isinstance(sample, float):
+        return pa.field(name, pa.float64())
+    if isinstance(sample, Decimal):
+        return pa.field(name, pa.decimal128(38, ARROW_DECIMAL_SCALE))
+    if isinstance(sample, datetime):
+        return pa.field(name, pa.timestamp('us'))
+    if isinstance(sample, date):
+        return pa.field(name, pa.date32())
+    return pa.field(name, pa.string())
+
+
+def _arrow_column(field, values: List[Any]):
+    kind = field.type
+    if pa.types.is_string(kind):
+        values = [None if v is None else str(v) for v in values]
+    elif pa.types.is_decimal(kind):
+        quantum = Decimal(1).scaleb(-ARROW_DECIMAL_SCALE)
+        values = [None if v is None else Decimal(v).quantize(quantum) for v in values]
+    elif pa.types.is_floating(kind):
+        values = [None if v is None else float(v) for v in values]
+    return pa.array(values, type=kind)
+
+
+def _write_arrow(chunks: Iterator[List[dict]], f):
+    schema = None
+    writer = None
+    try:
+        for rows in chunks:
+            columns = {name: [row.get(name) for row in rows] for name in (schema.names if schema else rows[0].keys())}
+            if schema is None:
+                # Schema is fixed by the first chunk; later chunks are cast to it
+                schema = pa.schema([_arrow_field(name, values) for name, values in columns.items()])
+                writer = pa.ipc.new_file(f, schema)
+            arrays = [_arrow_column(field, columns[field.name]) for field in schema]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_WRITERS = {
+    "csv": (_write_csv, {"mode": "w", "newline": "", "encoding": "utf-8"}),
+    "ndjson": (_write_ndjson, {"mode": "w", "encoding": "utf-8"}),
+    "arrow": (_write_arrow, {"mode": "wb"}),
+}
+
+
+def export_report(cursor, report_type: str, params: dict, fmt: str,
+                  chunk_rows: int = REPORT_FETCH_CHUNK_ROWS) -> str:
+    """
+    Run the report's row query on cursor and write the rows in fmt to a temp
+    file, returning its path (the caller deletes it once sent).
+    params must already be normalized. Raises ValueError on an unsupported
+    format, KeyError on an unknown report, ReportNotFound when there are
+    no rows.
+    """
+    spec = REPORTS[report_type]
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    if fmt == "arrow" and pa is None:
+        raise ValueError("Arrow export needs pyarrow: pip install pyarrow")
+
+    write, open_args = _WRITERS[fmt]
+    spec.query(cursor, **params)
+    chunks = _chunks(cursor, spec.enrich, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        raise ReportNotFound(f"No data found for report '{report_type}'")
+    fd, path = tempfile.mkstemp(prefix=f"brightbuy_{report_type}_", suffix=f".{EXPORT_FORMATS[fmt][0]}")
+    try:
+        with os.fdopen(fd, **open_args) as f:
+            write(itertools.chain([first], chunks), f)
+        return path
+    except Exception:
+        logger.exception("Export of %s as %s failed", report_type, fmt)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,296 @@
+"""
+Report Jobs
+Renders PDF reports off the request thread in a process pool and keeps the
+results in an on-disk artifact cache.
+
+Jobs run in two phases: prepare() fetches plain rows with a pooled
+connection, the caller returns the connection, and dispatch() hands the rows
+to a worker, so no connection stays checked out while a PDF is laid out.
+
+Artifacts are keyed by report type, parameters and the order data watermark
+(MAX(order_id), MAX(order_date), and MAX(customer_stats.updated_at), which
+moves on every payment or delivery status change), so identical requests
+reuse the same file until the orders change, and identical in-flight
+requests share one render.
+
+Scheduled renders (app/services/report_scheduler.py) are keyed by the
+snapshot watermark instead: the same measures over the data from before
+today, which stays put while the day's orders come in. They are kept in
+scheduled/ for REPORT_SCHEDULED_RETENTION_SECONDS, and an on-demand request
+that misses the live cache is served the night's render of the same report.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.report_rendering import REPORTS, discard_spools, render_report
+
+logger = logging.getLogger(__name__)
+
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', 2))
+REPORT_ARTIFACT_DIR = os.getenv('REPORT_ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), 'brightbuy_reports'))
+# Upper bound on artifact age, for changes the watermark doesn't see
+# (e.g. renamed products or categories)
+REPORT_ARTIFACT_TTL_SECONDS = int(os.getenv('REPORT_ARTIFACT_TTL_SECONDS', 3600))
+# How long scheduled renders are kept: long enough for one night's render to
+# serve the business day until the next night's pass has run
+REPORT_SCHEDULED_RETENTION_SECONDS = int(os.getenv('REPORT_SCHEDULED_RETENTION_SECONDS', 2 * 86400))
+SCHEDULED_ARTIFACT_SUBDIR = 'scheduled'
+REPORT_JOBS_KEPT = 500
+
+
+def connections_held_by_current_request() -> int:
+    # app.database opens the pool on import, so only ask it if it is loaded;
+    # without it this process cannot hold a pooled connection
+    database = sys.modules.get('app.database')
+    return database.connections_held_by_current_request() if database else 0
+
+
+def data_watermark(cursor) -> str:
+    cursor.execute(
+        """SELECT MAX(order_id) AS max_order_id, MAX(order_date) AS max_order_date,
+                  (SELECT MAX(updated_at) FROM customer_stats) AS max_status_update
+           FROM orders"""
+    )
+    row = cursor.fetchone() or {}
+    return f"{row.get('max_order_id')}|{row.get('max_order_date')}|{row.get('max_status_update')}"
+
+
+def snapshot_watermark(cursor, as_of: Optional[date] = None) -> str:
+    """
+    data_watermark over the data from before as_of (default today): moves
+    once a day, when the scheduler's next pass takes in yesterday's orders
+    """
+    as_of = as_of or date.today()
+    cursor.execute(
+        """SELECT MAX(order_id) AS max_order_id, MAX(order_date) AS max_order_date,
+                  (SELECT MAX(updated_at) FROM customer_stats WHERE updated_at < %s) AS max_status_update
+           FROM orders WHERE order_date < %s""",
+        (as_of, as_of)
+    )
+    row = cursor.fetchone() or {}
+    return f"snapshot|{row.get('max_order_id')}|{row.get('max_order_date')}|{row.get('max_status_update')}"
+
+
+def artifact_key(report_type: str, params: Dict[str, Any], watermark: str) -> str:
+    payload = json.dumps({"type": report_type, "params": params, "watermark": watermark}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportJob:
+    def __init__(self, report_type: str, params: Dict[str, Any], key: str, filename: str, scheduled: bool = False):
+        self.job_id = uuid.uuid4().hex
+        self.report_type = report_type
+        self.params = params
+        self.key = key
+        self.filename = filename
+        self.scheduled = scheduled
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.connections_held = 0
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "report_type": self.report_type,
+            "params": self.params,
+            "status": self.status,
+            "error": self.error,
+            "filename": self.filename,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "connections_held_during_render": self.connections_held
+        }
+
+
+class ReportJobManager:
+    def __init__(self, artifact_dir: str = REPORT_ARTIFACT_DIR, workers: int = REPORT_WORKERS,
+                 artifact_ttl_seconds: int = REPORT_ARTIFACT_TTL_SECONDS,
+                 scheduled_retention_seconds: int = REPORT_SCHEDULED_RETENTION_SECONDS):
+        self.artifact_dir = artifact_dir
+        self.workers = workers
+        self.artifact_ttl_seconds = artifact_ttl_seconds
+        self.scheduled_retention_seconds = scheduled_retention_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ReportJob] = {}
+        self._inflight: Dict[str, ReportJob] = {}
+        self.artifact_hits = 0
+        self.artifact_misses = 0
+
+    # ------------------------------------------------------------------
+    # Artifact cache
+    # ------------------------------------------------------------------
+
+    def _artifact_dir(self, scheduled: bool = False) -> str:
+        return os.path.join(self.artifact_dir, SCHEDULED_ARTIFACT_SUBDIR) if scheduled else self.artifact_dir
+
+    def _artifact_path(self, key: str, scheduled: bool = False) -> str:
+        return os.path.join(self._artifact_dir(scheduled), f"{key}.pdf")
+
+    def _max_age(self, scheduled: bool) -> int:
+        return self.scheduled_retention_seconds if scheduled else self.artifact_ttl_seconds
+
+    def cached_artifact(self, key: str, scheduled: bool = False) -> Optional[str]:
+        path = self._artifact_path(key, scheduled)
+        try:
+            if time.time() - os.path.getmtime(path) < self._max_age(scheduled):
+                return path
+        except OSError:
+            pass
+        return None
+
+    def prune(self):
+        """Delete expired artifacts and forget old finished jobs"""
+        now = time.time()
+        for scheduled in (False, True):
+            directory = self._artifact_dir(scheduled)
+            max_age = self._max_age(scheduled)
+            try:
+                for name in os.listdir(directory):
+                    path = os.path.join(directory, name)
+                    try:
+                        if os.path.isfile(path) and now - os.path.getmtime(path) > max_age:
+                            os.remove(path)
+                    except OSError:
+                        pass
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.done.is_set()]
+            if len(self._jobs) > REPORT_JOBS_KEPT:
+                finished.sort(key=lambda j: j.created_at)
+                for job in finished[:len(self._jobs) - REPORT_JOBS_KEPT]:
+                    self._jobs.pop(job.job_id, None)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: the API process runs background threads, which fork doesn't mix with
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def _existing(self, report_type: str, params: Dict[str, Any], filename: str,
+                  key: str, scheduled: bool) -> Optional[ReportJob]:
+        """The in-flight render or a finished job for a cached artifact of key"""
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                return inflight
+        path = self.cached_artifact(key, scheduled)
+        if path is None:
+            return None
+        job = ReportJob(report_type, params, key, filename, scheduled)
+        self._finish(job, path=path)
+        self._register(job)
+        return job
+
+    def prepare(self, cursor, report_type: str, params: Optional[Dict[str, Any]] = None,
+                scheduled_watermark: Optional[str] = None) -> Tuple[ReportJob, Optional[dict]]:
+        """
+        Fetch phase: everything that needs the database.
+        Returns (job, data). data is None when the job needs no render (a
+        matching artifact exists or an identical request is in flight);
+        otherwise pass both to dispatch() once the connection is released.
+        With scheduled_watermark (the scheduler's snapshot_watermark) the job
+        is a scheduled render, keyed by it. Otherwise the live cache is tried
+        first, then the scheduled render for the current snapshot.
+        Raises KeyError for unknown report types, ValueError for bad params
+        and ReportNotFound when the report has no data.
+        """
+        spec = REPORTS[report_type]
+        params = spec.normalize_params(params)
+        filename = spec.filename(params)
+
+        if scheduled_watermark is not None:
+            candidates = [(artifact_key(report_type, params, scheduled_watermark), True)]
+        else:
+            candidates = [(artifact_key(report_type, params, data_watermark(cursor)), False),
+                          (artifact_key(report_type, params, snapshot_watermark(cursor)), True)]
+        for key, scheduled in candidates:
+            job = self._existing(report_type, params, filename, key, scheduled)
+            if job is not None:
+                if job.done.is_set():
+                    self.artifact_hits += 1
+                return job, None
+
+        self.artifact_misses += 1
+        key, scheduled = candidates[0]
+        return ReportJob(report_type, params, key, filename, scheduled), spec.fetch(cursor, **params)
+
+    def dispatch(self, job: ReportJob, data: dict) -> ReportJob:
+        """Render phase: hand the fetched rows to a worker process"""
+        with self._lock:
+            inflight = self._inflight.get(job.key)
+            if inflight is not None:
+                discard_spools(data)
+                return inflight
+            self._inflight[job.key] = job
+            self._jobs[job.job_id] = job
+        job.connections_held = connections_held_by_current_request()
+        if job.connections_held:
+            logger.warning("Report job %s dispatched while holding %s pooled connection(s)", job.job_id, job.connections_held)
+        os.makedirs(self._artifact_dir(job.scheduled), exist_ok=True)
+        # The worker writes the PDF straight into the artifact cache
+        future = self._pool().submit(render_report, job.report_type, data, self._artifact_path(job.key, job.scheduled))
+        future.add_done_callback(lambda f, job=job: self._on_rendered(job, f))
+        return job
+
+    def _register(self, job: ReportJob):
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+    def _on_rendered(self, job: ReportJob, future: Future):
+        try:
+            self._finish(job, path=future.result())
+        except Exception as e:
+            logger.error("Report job %s (%s) failed: %s", job.job_id, job.report_type, e)
+            self._finish(job, error=str(e))
+        with self._lock:
+            self._inflight.pop(job.key, None)
+        self.prune()
+
+    def _finish(self, job: ReportJob, path: Optional[str] = None, error: Optional[str] = None):
+        job.path = path
+        job.error = error
+        job.status = "failed" if error else "completed"
+        job.finished_at = time.time()
+        job.done.set()
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Renders submitted to the worker pool and not finished yet"""
+        with self._lock:
+            return len(self._inflight)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+report_jobs = ReportJobManager()
@@ -0,0 +1,706 @@
+"""
+Report Rendering
+Data fetching and PDF rendering for the admin reports, split so rendering can
+run anywhere (request thread, report worker process, scheduler) from plain
+rows. Render functions never touch the database and only take picklable data.
+
+Large row sets are pulled from the cursor in chunks and spooled to a temp
+file (RowSpool), then laid out one page of rows at a time (ChunkedTable), so
+memory stays bounded by a page of rows however long the report is.
+"""
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Import ReportLab for PDF generation
+try:
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, Paragraph, Spacer, Flowable, TableStyle
+except ImportError:
+    raise ImportError("Please install reportlab: pip install reportlab")
+
+from app.services.customer_stats import CUSTOMER_STATS_SELECT
+from app.services.delivery import (
+    delivery_estimator, PICKUP_DAYS, MAIN_CITY_DAYS, OTHER_CITY_DAYS, LOW_STOCK_EXTRA_DAYS
+)
+from app.services.report_theme import (
+    INFO_STYLE, LEGEND_STYLE, SUMMARY_STYLE, TABLE_THEMES, TableTheme, build_document, header_flowables
+)
+
+REPORT_FETCH_CHUNK_ROWS = int(os.getenv('REPORT_FETCH_CHUNK_ROWS', 1000))
+
+
+class ReportNotFound(Exception):
+    """The report has no data for the requested parameters"""
+
+
+class RowSpool:
+    """
+    Query rows spooled to a temp file as pickled chunks.
+    Only the path travels to the render worker; iterating reads one chunk
+    at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    @classmethod
+    def from_cursor(cls, cursor, on_row: Optional[Callable[[dict], None]] = None,
+                    chunk_rows: int = REPORT_FETCH_CHUNK_ROWS) -> 'RowSpool':
+        fd, path = tempfile.mkstemp(prefix='report_rows_', suffix='.spool')
+        spool = cls(path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    rows = cursor.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    if on_row:
+                        for row in rows:
+                            on_row(row)
+                    pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    spool.count += len(rows)
+        except Exception:
+            spool.discard()
+            raise
+        return spool
+
+    def __iter__(self) -> Iterator[dict]:
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    rows = pickle.load(f)
+                except EOFError:
+                    return
+                yield from rows
+
+    def __len__(self) -> int:
+        return self.count
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def discard_spools(data: dict):
+    """Delete the temp files behind any spooled rows in a report's data"""
+    for value in data.values():
+        if isinstance(value, RowSpool):
+            value.discard()
+
+
+class ChunkedTable(Flowable):
+    """
+    A table fed from an iterator of formatted rows (plain cell tuples).
+
+    Every row has a fixed height, so on each split the table pulls exactly
+    the rows that fit the space left on the page and emits them as a regular
+    Table (with the header repeated); the remaining rows stay unread in the
+    iterator. Layout cost and memory are per page, not per report.
+    """
+
+    def __init__(self, header: List[str], rows: Iterator[list], col_widths: List[float], style: TableStyle,
+                 header_height: float, row_height: float, _buffer: Optional[List[list]] = None):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.style = style
+        self.header_height = header_height
+        self.row_height = row_height
+        self._buffer = _buffer if _buffer is not None else []
+        self._exhausted = False
+        self._table: Optional[Table] = None
+
+    def _fill(self, count: int):
+        while len(self._buffer) < count and not self._exhausted:
+            try:
+                self._buffer.append(next(self.rows))
+            except StopIteration:
+                self._exhausted = True
+
+    def _rows_fitting(self, avail_height: float) -> int:
+        return int((avail_height - self.header_height) // self.row_height)
+
+    def _make_table(self, rows: List[list]) -> Table:
+        table = Table(
+            [self.header] + rows,
+            colWidths=self.col_widths,
+            rowHeights=[self.header_height] + [self.row_height] * len(rows)
+        )
+        table.setStyle(self.style)
+        return table
+
+    def wrap(self, avail_width, avail_height):
+        fitting = max(self._rows_fitting(avail_height), 0)
+        self._fill(fitting + 1)
+        self.width = sum(self.col_widths)
+        if len(self._buffer) <= fitting:
+            # Everything left fits here: draw it as one table
+            self._table = self._make_table(self._buffer)
+            self.height = self.header_height + self.row_height * len(self._buffer)
+        else:
+            # Too tall; forces the frame to split us
+            self._table = None
+            self.height = avail_height + self.row_height
+        return self.width, self.height
+
+    def split(self, avail_width, avail_height):
+        fitting = self._rows_fitting(avail_height)
+        if fitting < 1:
+            return []
+        self._fill(fitting + 1)
+        if len(self._buffer) <= fitting:
+            return [self._make_table(self._buffer)]
+        rest = ChunkedTable(self.header, self.rows, self.col_widths, self.style,
+                            self.header_height, self.row_height, _buffer=self._buffer[fitting:])
+        return [self._make_table(self._buffer[:fitting]), rest]
+
+    def draw(self):
+        self._table.wrapOn(self.canv, self.width, self.height)
+        self._table.drawOn(self.canv, 0, 0)
+
+
+def _data_table(header, rows: Iterable[tuple], col_widths, theme: TableTheme) -> ChunkedTable:
+    return ChunkedTable(header, iter(rows), col_widths, theme.style, theme.header_height, theme.row_height)
+
+
+# ----------------------------------------------------------------------
+# Quarterly sales
+# ----------------------------------------------------------------------
+
+def query_quarterly_sales(cursor, year: int):
+    cursor.execute("""
+        SELECT * FROM quarterly_sales_report
+        WHERE year = %s
+        ORDER BY quarter ASC
+    """, (year,))
+
+
+def fetch_quarterly_sales(cursor, year: int) -> dict:
+    query_quarterly_sales(cursor, year)
+    rows = cursor.fetchall()
+    if not rows:
+        raise ReportNotFound(f"No sales data found for year {year}")
+    return {"year": year, "rows": rows}
+
+
+def render_quarterly_sales(data: dict, out):
+    year, rows = data['year'], data['rows']
+    elements = header_flowables(
+        f"Quarterly Sales Report - {year}",
+        f"Complete sales analysis for all quarters in {year}"
+    )
+
+    # Summary statistics
+    total_revenue = sum(row['total_revenue'] for row in rows)
+    total_orders = sum(row['total_orders'] for row in rows)
+    summary_text = f"""
+    <b>Annual Summary:</b><br/>
+    Total Revenue: <b>${total_revenue:,.2f}</b> |
+    Total Orders: <b>{total_orders:,}</b> |
+    Average Order Value: <b>${total_revenue/total_orders if total_orders > 0 else 0:,.2f}</b>
+    """
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_rows = (
+        (
+            row['quarter_label'],
+            f"{row['total_orders']:,}",
+            f"{row['unique_customers']:,}",
+            f"${row['total_revenue']:,.2f}",
+            f"${row['average_order_value']:,.2f}",
+            f"{row['total_items_sold']:,}"
+        )
+        for row in rows
+    )
+    elements.append(_data_table(
+        ['Quarter', 'Total Orders', 'Customers', 'Revenue', 'Avg Order', 'Items Sold'], table_rows,
+        [1.2*inch, 1.2*inch, 1.2*inch, 1.3*inch, 1.2*inch, 1.2*inch],
+        TABLE_THEMES["quarterly-sales"]
+    ))
+    build_document(elements, out)
+
+
+# ----------------------------------------------------------------------
+# Top selling products
+# ----------------------------------------------------------------------
+
+def query_top_selling_products(cursor, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 20) -> str:
+    """Runs the query and returns the period label"""
+    if start_date and end_date:
+        cursor.execute("""
+            SELECT p.product_id, p.product_name, c.category_name,
+                   v.variant_name, v.SKU,
+                   SUM(oi.quantity) as total_quantity_sold,
+                   SUM(oi.quantity * oi.price) as total_revenue,
+                   AVG(oi.price) as average_price,
+                   COUNT(DISTINCT oi.order_id) as number_of_orders
+            FROM order_item oi
+            JOIN variant v ON oi.variant_id = v.variant_id
+            JOIN product p ON v.product_id = p.product_id
+            LEFT JOIN category c ON p.category_id = c.category_id
+            JOIN orders o ON oi.order_id = o.order_id
+            WHERE DATE(o.order_date) BETWEEN %s AND %s
+            GROUP BY p.product_id, p.product_name, c.category_name, v.variant_name, v.SKU
+            ORDER BY total_quantity_sold DESC
+            LIMIT %s
+        """, (start_date, end_date, limit))
+        return f"Period: {start_date} to {end_date}"
+    cursor.execute("SELECT * FROM top_selling_products LIMIT %s", (limit,))
+    return "All Time"
+
+
+def fetch_top_selling_products(cursor, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 20) -> dict:
+    period_text = query_top_selling_products(cursor, start_date, end_date, limit)
+    totals = {"revenue": 0, "quantity": 0}
+
+    def add(row):
+        totals['revenue'] += row['total_revenue'] or 0
+        totals['quantity'] += row['total_quantity_sold'] or 0
+
+    rows = RowSpool.from_cursor(cursor, on_row=add)
+    if not rows.count:
+        rows.discard()
+        raise ReportNotFound("No sales data found for the specified period")
+    return {"period_text": period_text, "rows": rows, "totals": totals}
+
+
+def render_top_selling_products(data: dict, out):
+    rows, totals = data['rows'], data['totals']
+    elements = header_flowables("Top Selling Products Report", data['period_text'])
+
+    summary_text = f"""
+    <b>Summary:</b><br/>
+    Top {len(rows)} Products |
+    Total Units Sold: <b>{totals['quantity']:,}</b> |
+    Total Revenue: <b>${totals['revenue']:,.2f}</b>
+    """
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_rows = (
+        (
+            str(idx),
+            row['product_name'][:20],
+            (row['category_name'] or 'N/A')[:15],
+            row['variant_name'][:15],
+            f"{row['total_quantity_sold']:,}",
+            f"${row['total_revenue']:,.2f}",
+            f"${row['average_price']:,.2f}"
+        )
+        for idx, row in enumerate(rows, 1)
+    )
+    elements.append(_data_table(
+        ['Rank', 'Product', 'Category', 'Variant', 'Units Sold', 'Revenue', 'Avg Price'], table_rows,
+        [0.5*inch, 1.8*inch, 1.2*inch, 1.2*inch, 0.9*inch, 1.1*inch, 0.9*inch],
+        TABLE_THEMES["top-selling-products"]
+    ))
+    build_document(elements, out)
+
+
+# ----------------------------------------------------------------------
+# Category orders
+# ----------------------------------------------------------------------
+
+def query_category_orders(cursor):
+    cursor.execute("SELECT * FROM category_order_summary ORDER BY total_revenue DESC")
+
+
+def fetch_category_orders(cursor) -> dict:
+    query_category_orders(cursor)
+    rows = cursor.fetchall()
+    if not rows:
+        raise ReportNotFound("No category data found")
+    return {"rows": rows}
+
+
+def render_category_orders(data: dict, out):
+    rows = data['rows']
+    elements = header_flowables(
+        "Category-wise Order Summary",
+        "Complete analysis of orders and revenue by product category"
+    )
+
+    total_orders = sum(row['total_orders'] for row in rows)
+    total_revenue = sum(row['total_revenue'] for row in rows)
+    summary_text = f"""
+    <b>Overall Summary:</b><br/>
+    Total Categories: <b>{len(rows)}</b> |
+    Total Orders: <b>{total_orders:,}</b> |
+    Total Revenue: <b>${total_revenue:,.2f}</b>
+    """
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_rows = (
+        (
+            row['category_name'][:25],
+            f"{row['total_orders']:,}",
+            f"{row['total_items_sold']:,}",
+            f"${row['total_revenue']:,.2f}",
+            f"${row['average_order_value']:,.2f}",
+            f"{row['unique_products']}"
+        )
+        for row in rows
+    )
+    elements.append(_data_table(
+        ['Category', 'Orders', 'Items Sold', 'Revenue', 'Avg Order', 'Products'], table_rows,
+        [2*inch, 1*inch, 1*inch, 1.3*inch, 1.2*inch, 0.8*inch],
+        TABLE_THEMES["category-orders"]
+    ))
+    build_document(elements, out)
+
+
+# ----------------------------------------------------------------------
+# Customer orders
+# ----------------------------------------------------------------------
+
+def query_customer_orders(cursor, user_id: int):
+    # Same columns as the customer_order_payment_summary view, but filtered on
+    # orders.user_id before anything is joined or counted
+    cursor.execute("""
+        SELECT
+            u.user_id, u.user_name, u.email, u.name AS full_name,
+            o.order_id, o.order_date, o.total_amount,
+            p.payment_method, p.payment_status, p.payment_date,
+            d.delivery_status, d.delivery_method, d.estimated_delivery_date,
+            (SELECT COUNT(*) FROM order_item oi WHERE oi.order_id = o.order_id) AS items_in_order,
+            (SELECT SUM(oi.quantity) FROM order_item oi WHERE oi.order_id = o.order_id) AS total_quantity
+        FROM orders o
+        JOIN user u ON o.user_id = u.user_id
+        LEFT JOIN payment p ON o.order_id = p.order_id
+        LEFT JOIN delivery d ON o.order_id = d.order_id
+        WHERE o.user_id = %s
+        ORDER BY o.order_date DESC
+    """, (user_id,))
+
+
+def fetch_customer_orders(cursor, user_id: int) -> dict:
+    cursor.execute(CUSTOMER_STATS_SELECT + " AND cs.user_id = %s", (user_id,))
+    customer = cursor.fetchone()
+    if not customer:
+        raise ReportNotFound(f"No orders found for customer ID {user_id}")
+
+    query_customer_orders(cursor, user_id)
+    return {"customer": customer, "orders": RowSpool.from_cursor(cursor)}
+
+
+def render_customer_orders(data: dict, out):
+    customer, orders = data['customer'], data['orders']
+    elements = header_flowables(
+        "Customer Order & Payment Report",
+        f"Complete order history for {customer['full_name']} ({customer['user_name']})"
+    )
+
+    customer_info = f"""
+    <b>Customer Information:</b><br/>
+    Name: <b>{customer['full_name']}</b> |
+    Email: <b>{customer['email']}</b> |
+    User ID: <b>{customer['user_id']}</b>
+    """
+    elements.append(Paragraph(customer_info, INFO_STYLE))
+
+    summary_text = f"""
+    <b>Order Statistics:</b><br/>
+    Total Orders: <b>{customer['total_orders']}</b> |
+    Total Spent: <b>${customer['total_spent']:,.2f}</b> |
+    Avg Order: <b>${customer['average_order_value']:,.2f}</b><br/>
+    Completed Payments: <b>{customer['completed_payments']}</b> |
+    Pending Payments: <b>{customer['pending_payments']}</b> |
+    Delivered: <b>{customer['delivered_orders']}</b>
+    """
+    elements.append(Paragraph(summary_text, INFO_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_rows = (
+        (
+            str(order['order_id']),
+            order['order_date'].strftime('%Y-%m-%d') if order['order_date'] else 'N/A',
+            f"${order['total_amount']:,.2f}",
+            (order['payment_method'] or 'N/A').upper(),
+            (order['payment_status'] or 'N/A').upper()[:8],
+            (order['delivery_status'] or 'N/A').upper()[:8],
+            str(order['items_in_order'])
+        )
+        for order in orders
+    )
+    elements.append(_data_table(
+        ['Order ID', 'Date', 'Amount', 'Payment', 'Status', 'Delivery', 'Items'], table_rows,
+        [0.7*inch, 1*inch, 0.9*inch, 0.9*inch, 0.9*inch, 0.9*inch, 0.6*inch],
+        TABLE_THEMES["customer-orders"]
+    ))
+    build_document(elements, out)
+
+
+# ----------------------------------------------------------------------
+# All customers summary
+# ----------------------------------------------------------------------
+
+def query_all_customers_summary(cursor, limit: int = 50):
+    cursor.execute(CUSTOMER_STATS_SELECT + " ORDER BY cs.total_spent DESC LIMIT %s", (limit,))
+
+
+def fetch_all_customers_summary(cursor, limit: int = 50) -> dict:
+    query_all_customers_summary(cursor, limit)
+
+    totals = {"revenue": 0, "orders": 0}
+
+    def add(row):
+        totals['revenue'] += row['total_spent'] or 0
+        totals['orders'] += row['total_orders'] or 0
+
+    rows = RowSpool.from_cursor(cursor, on_row=add)
+    if not rows.count:
+        rows.discard()
+        raise ReportNotFound("No customer data found")
+    return {"rows": rows, "totals": totals}
+
+
+def render_all_customers_summary(data: dict, out):
+    rows, totals = data['rows'], data['totals']
+    elements = header_flowables(
+        "All Customers Summary Report",
+        f"Top {len(rows)} customers by total spending"
+    )
+
+    summary_text = f"""
+    <b>Overview:</b><br/>
+    Total Customers: <b>{len(rows)}</b> |
+    Total Orders: <b>{totals['orders']:,}</b> |
+    Total Revenue: <b>${totals['revenue']:,.2f}</b>
+    """
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_rows = (
+        (
+            row['user_name'][:15],
+            row['email'][:25],
+            str(row['total_orders']),
+            f"${row['total_spent']:,.2f}",
+            f"${row['average_order_value']:,.2f}",
+            str(row['completed_payments']),
+            str(row['pending_payments'])
+        )
+        for row in rows
+    )
+    elements.append(_data_table(
+        ['Name', 'Email', 'Orders', 'Total Spent', 'Avg Order', 'Completed', 'Pending'], table_rows,
+        [1.1*inch, 1.8*inch, 0.7*inch, 1*inch, 0.9*inch, 0.8*inch, 0.7*inch],
+        TABLE_THEMES["all-customers-summary"]
+    ))
+    build_document(elements, out)
+
+
+# ----------------------------------------------------------------------
+# Delivery time estimates
+# ----------------------------------------------------------------------
+
+def query_delivery_time_estimates(cursor):
+    # Load the location cache first: the row query leaves the cursor busy
+    delivery_estimator.locations.ensure_loaded(cursor)
+    cursor.execute("""
+        SELECT
+            o.order_id,
+            o.order_date,
+            o.total_amount,
+            u.user_name,
+            u.email,
+            u.name as full_name,
+            d.delivery_method,
+            d.delivery_status,
+            d.estimated_delivery_date,
+            a.city,
+            a.state,
+            a.city_id,
+            DATEDIFF(d.estimated_delivery_date, o.order_date) as estimated_days,
+            COUNT(oi.order_item_id) as total_items
+        FROM orders o
+        JOIN user u ON o.user_id = u.user_id
+        LEFT JOIN delivery d ON o.order_id = d.order_id
+        LEFT JOIN address a ON d.address_id = a.address_id
+        LEFT JOIN order_item oi ON o.order_id = oi.order_id
+        WHERE d.delivery_status IN ('pending', 'processing', 'shipped')
+           OR d.delivery_status IS NULL
+        GROUP BY o.order_id, o.order_date, o.total_amount, u.user_name, u.email,
+                 u.name, d.delivery_method, d.delivery_status, d.estimated_delivery_date,
+                 a.city, a.state, a.city_id
+        ORDER BY o.order_date DESC
+        LIMIT 100
+    """)
+
+
+def enrich_delivery_time_estimates(rows: List[dict]) -> List[dict]:
+    """Base delivery days from the shared delivery rules"""
+    return delivery_estimator.estimate_orders(None, rows)
+
+
+def fetch_delivery_time_estimates(cursor) -> dict:
+    query_delivery_time_estimates(cursor)
+    rows = cursor.fetchall()
+    if not rows:
+        raise ReportNotFound("No upcoming orders found")
+
+    return {"rows": enrich_delivery_time_estimates(rows)}
+
+
+def render_delivery_time_estimates(data: dict, out):
+    rows = data['rows']
+    elements = header_flowables(
+        "Delivery Time Estimates Report",
+        f"Upcoming orders with estimated delivery times ({len(rows)} orders)"
+    )
+
+    home_delivery_count = sum(1 for row in rows if row['delivery_method'] == 'home_delivery')
+    store_pickup_count = sum(1 for row in rows if row['delivery_method'] == 'store_pickup')
+    total_value = sum(row['total_amount'] for row in rows)
+    summary_text = f"""
+    <b>Summary:</b><br/>
+    Total Upcoming Orders: <b>{len(rows)}</b> |
+    Home Delivery: <b>{home_delivery_count}</b> |
+    Store Pickup: <b>{store_pickup_count}</b> |
+    Total Value: <b>${total_value:,.2f}</b>
+    """
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_rows = (
+        (
+            str(row['order_id']),
+            (row['user_name'] or 'N/A')[:12],
+            row['order_date'].strftime('%Y-%m-%d') if row['order_date'] else 'N/A',
+            f"${row['total_amount']:,.2f}",
+            (row['delivery_method'] or 'N/A').replace('_', ' ').title()[:12],
+            (row['city'] or 'N/A')[:15],
+            f"{row['estimated_days'] if row['estimated_days'] else row['base_delivery_days']} days",
+            (row['delivery_status'] or 'Pending').upper()[:8]
+        )
+        for row in rows
+    )
+    elements.append(_data_table(
+        ['Order ID', 'Customer', 'Order Date', 'Amount', 'Method', 'City', 'Est. Days', 'Status'], table_rows,
+        [0.7*inch, 1*inch, 0.9*inch, 0.9*inch, 1.1*inch, 1*inch, 0.8*inch, 0.8*inch],
+        TABLE_THEMES["delivery-time-estimates"]
+    ))
+    elements.append(Spacer(1, 0.3*inch))
+
+    legend_text = f"""
+    <b>Delivery Time Guidelines:</b><br/>
+    • Store Pickup: {PICKUP_DAYS} business days<br/>
+    • Home Delivery (Main Cities): {MAIN_CITY_DAYS} days<br/>
+    • Home Delivery (Other Cities): {OTHER_CITY_DAYS} days<br/>
+    • Additional {LOW_STOCK_EXTRA_DAYS} days may apply for low stock items
+    """
+    elements.append(Paragraph(legend_text, LEGEND_STYLE))
+    build_document(elements, out)
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+
+class ReportSpec:
+    """
+    fetch(cursor, **params) -> data, render(data, out) writes the PDF to out.
+    query(cursor, **params) only executes the report's row query, leaving the
+    rows on the cursor for the streaming exports; enrich(rows) adds computed
+    columns to each chunk of them.
+    params maps each accepted parameter to (type, default); parameters
+    without a default are required.
+    """
+
+    def __init__(self, fetch: Callable, render: Callable, filename: Callable[[dict], str],
+                 params: Optional[Dict[str, tuple]] = None, query: Optional[Callable] = None,
+                 enrich: Optional[Callable[[List[dict]], List[dict]]] = None):
+        self.fetch = fetch
+        self.render = render
+        self.filename = filename
+        self.params = params or {}
+        self.query = query
+        self.enrich = enrich
+
+    def normalize_params(self, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Coerce and default the parameters; raises ValueError on bad input"""
+        params = dict(params or {})
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown report parameters: {', '.join(sorted(unknown))}")
+        normalized = {}
+        for name, (kind, *default) in self.params.items():
+            value = params.get(name)
+            if value is None:
+                if not default:
+                    raise ValueError(f"Missing report parameter: {name}")
+                normalized[name] = default[0]
+                continue
+            try:
+                normalized[name] = kind(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for report parameter {name}: {value!r}")
+        return normalized
+
+
+REPORTS: Dict[str, ReportSpec] = {
+    "quarterly-sales": ReportSpec(
+        fetch_quarterly_sales, render_quarterly_sales,
+        lambda p: f"quarterly_sales_{p['year']}.pdf",
+        {"year": (int,)},
+        query=query_quarterly_sales
+    ),
+    "top-selling-products": ReportSpec(
+        fetch_top_selling_products, render_top_selling_products,
+        lambda p: f"top_selling_products_{p['start_date'] or 'all_time'}_to_{p['end_date'] or 'now'}.pdf",
+        {"start_date": (str, None), "end_date": (str, None), "limit": (int, 20)},
+        query=query_top_selling_products
+    ),
+    "category-orders": ReportSpec(
+        fetch_category_orders, render_category_orders,
+        lambda p: "category_orders_summary.pdf",
+        query=query_category_orders
+    ),
+    "customer-orders": ReportSpec(
+        fetch_customer_orders, render_customer_orders,
+        lambda p: f"customer_orders_{p['user_id']}.pdf",
+        {"user_id": (int,)},
+        query=query_customer_orders
+    ),
+    "all-customers-summary": ReportSpec(
+        fetch_all_customers_summary, render_all_customers_summary,
+        lambda p: "all_customers_summary.pdf",
+        {"limit": (int, 50)},
+        query=query_all_customers_summary
+    ),
+    "delivery-time-estimates": ReportSpec(
+        fetch_delivery_time_estimates, render_delivery_time_estimates,
+        lambda p: "delivery_time_estimates.pdf",
+        query=query_delivery_time_estimates,
+        enrich=enrich_delivery_time_estimates
+    ),
+}
+
+
+def render_report(report_type: str, data: dict, out_path: str) -> str:
+    """
+    Entry point for report worker processes: writes the PDF to out_path
+    (atomically, via a temp file next to it) and returns the path.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path) or None, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            REPORTS[report_type].render(data, f)
+        os.replace(tmp_path, out_path)
+        return out_path
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        discard_spools(data)
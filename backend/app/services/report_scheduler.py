@@ -0,0 +1,170 @@
+"""
+Report Scheduler
+Pre-generates the reports admins request all day (quarterly sales, category
+orders, all-customers summary) at off-peak hours into the report artifact
+cache, so business-hours requests are served from disk.
+
+Every tick computes the snapshot watermark once: the order data watermark
+over everything before today, which does not move while the day's orders
+come in. A scheduled report is rendered during the off-peak hours only when
+there is no render for that watermark yet, so each night's pass renders it
+once (and not at all when nothing changed since the last one). The renders
+are kept for REPORT_SCHEDULED_RETENTION_SECONDS, independent of the on-demand
+REPORT_ARTIFACT_TTL_SECONDS, and on-demand requests during the day are
+served from them. Renders go through report_jobs, so an on-demand request
+for the same report shares a scheduled render in flight.
+
+Runs in-process when REPORT_SCHEDULER_ENABLED=1 (started from the app
+lifespan), or as a separate worker sharing REPORT_ARTIFACT_DIR:
+    python -m app.services.report_scheduler [--once]
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.report_jobs import ReportJobManager, artifact_key, report_jobs, snapshot_watermark
+from app.services.report_rendering import REPORTS, ReportNotFound, discard_spools
+
+logger = logging.getLogger(__name__)
+
+REPORT_SCHEDULER_ENABLED = os.getenv('REPORT_SCHEDULER_ENABLED', '0') == '1'
+# Local hours in which scheduled reports may be rendered, e.g. "1,2,3"
+REPORT_SCHEDULE_HOURS = [int(h) for h in os.getenv('REPORT_SCHEDULE_HOURS', '2,3,4').split(',') if h.strip()]
+REPORT_SCHEDULE_TICK_SECONDS = int(os.getenv('REPORT_SCHEDULE_TICK_SECONDS', 300))
+
+
+class ScheduledReport:
+    """A report type plus a callable returning its parameters at run time"""
+
+    def __init__(self, report_type: str, params: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.report_type = report_type
+        self.params = params or dict
+        self.last_key: Optional[str] = None
+        self.last_rendered_at: Optional[float] = None
+
+
+SCHEDULED_REPORTS: List[ScheduledReport] = [
+    ScheduledReport("quarterly-sales", lambda: {"year": datetime.now().year}),
+    ScheduledReport("category-orders"),
+    ScheduledReport("all-customers-summary"),
+]
+
+
+class ReportScheduler:
+    def __init__(self, jobs: ReportJobManager, reports: List[ScheduledReport],
+                 hours: List[int] = REPORT_SCHEDULE_HOURS, tick_seconds: int = REPORT_SCHEDULE_TICK_SECONDS):
+        self.jobs = jobs
+        self.reports = reports
+        self.hours = set(hours)
+        self.tick_seconds = tick_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rendered = 0
+        self.up_to_date = 0
+
+    def is_off_peak(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.now()).hour in self.hours
+
+    def run_once(self, force: bool = False) -> List[str]:
+        """
+        One scheduling pass. Renders the reports that have no render for
+        the current snapshot watermark when off-peak (or force). Returns the
+        job ids of the renders started.
+        """
+        from app.database import get_connection
+
+        render = force or self.is_off_peak()
+        started = []
+        pending = []
+        conn = get_connection()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            watermark = snapshot_watermark(cursor)
+            for entry in self.reports:
+                spec = REPORTS[entry.report_type]
+                params = spec.normalize_params(entry.params())
+                key = artifact_key(entry.report_type, params, watermark)
+                if self.jobs.cached_artifact(key, scheduled=True):
+                    self.up_to_date += 1
+                    entry.last_key = key
+                    continue
+                if not render:
+                    continue
+                try:
+                    job, data = self.jobs.prepare(cursor, entry.report_type, params, scheduled_watermark=watermark)
+                except ReportNotFound:
+                    logger.info("Scheduled report %s has no data, skipped", entry.report_type)
+                    continue
+                entry.last_key = key
+                if data is not None:
+                    pending.append((entry, job, data))
+        except BaseException:
+            # The reports fetched before the failure will not be rendered
+            for _, _, data in pending:
+                discard_spools(data)
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+        # Rendered after the connection is back in the pool
+        for entry, job, data in pending:
+            job = self.jobs.dispatch(job, data)
+            entry.last_rendered_at = time.time()
+            self.rendered += 1
+            started.append(job.job_id)
+            logger.info("Scheduled report %s %s queued as job %s", entry.report_type, job.params, job.job_id)
+        return started
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Report scheduler pass failed: %s", e)
+            self._stop.wait(self.tick_seconds)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="report-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+report_scheduler = ReportScheduler(report_jobs, SCHEDULED_REPORTS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate scheduled reports into the artifact cache")
+    parser.add_argument("--once", action="store_true",
+                        help="run one pass now, rendering outside off-peak hours too, and wait for the renders")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        if args.once:
+            for job_id in report_scheduler.run_once(force=True):
+                job = report_jobs.get(job_id)
+                job.done.wait()
+                logger.info("Job %s %s%s", job_id, job.status, ': ' + job.error if job.error else '')
+            return
+        logger.info("Report scheduler running, off-peak hours %s", sorted(report_scheduler.hours))
+        report_scheduler._run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Report Theme
+ReportLab paragraph styles, table styles and the page template shared by the
+PDF reports. Everything is built once at import; reports only reference these
+objects, so no request pays for getSampleStyleSheet() or TableStyle
+construction, and no report can mutate a style another report uses.
+"""
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+_base = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'ReportTitle',
+    parent=_base['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#2C3E50'),
+    spaceAfter=12,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+SUBTITLE_STYLE = ParagraphStyle(
+    'ReportSubtitle',
+    parent=_base['Normal'],
+    fontSize=12,
+    textColor=colors.HexColor('#7F8C8D'),
+    spaceAfter=20,
+    alignment=TA_CENTER
+)
+SUMMARY_STYLE = ParagraphStyle('ReportSummary', parent=_base['Normal'], fontSize=11, spaceAfter=15)
+INFO_STYLE = ParagraphStyle('ReportInfo', parent=_base['Normal'], fontSize=10, spaceAfter=10)
+LEGEND_STYLE = ParagraphStyle(
+    'ReportLegend',
+    parent=_base['Normal'],
+    fontSize=9,
+    textColor=colors.HexColor('#555555'),
+    spaceAfter=10
+)
+
+FOOTER_FONT = ('Helvetica', 8)
+PAGE_MARGIN = 0.5*inch
+
+
+class TableTheme:
+    """Precompiled TableStyle plus the fixed row heights it implies"""
+
+    def __init__(self, header_color: str, stripe_color: str, header_size: int, body_size: int,
+                 header_padding: int, body_padding: int):
+        self.style = TableStyle([
+            # Header
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), header_size),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), header_padding),
+            ('TOPPADDING', (0, 0), (-1, 0), header_padding),
+
+            # Data
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), body_size),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor(stripe_color)]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 1), (-1, -1), body_padding),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), body_padding),
+        ])
+        # Same heights Table would compute: leading (1.2 x font size) plus padding
+        self.header_height = header_size * 1.2 + 2 * header_padding
+        self.row_height = body_size * 1.2 + 2 * body_padding
+
+
+TABLE_THEMES = {
+    "quarterly-sales": TableTheme('#3498DB', '#ECF0F1', 11, 10, 12, 8),
+    "top-selling-products": TableTheme('#27AE60', '#E8F8F5', 10, 9, 12, 6),
+    "category-orders": TableTheme('#E74C3C', '#FADBD8', 11, 10, 12, 8),
+    "customer-orders": TableTheme('#9B59B6', '#F4ECF7', 10, 9, 12, 6),
+    "all-customers-summary": TableTheme('#34495E', '#ECF0F1', 9, 8, 10, 5),
+    "delivery-time-estimates": TableTheme('#16A085', '#D5F4E6', 9, 8, 10, 6),
+}
+
+
+def header_flowables(title: str, subtitle: str = None) -> list:
+    """Title, optional subtitle and divider spacing for the top of a report"""
+    elements = [Paragraph(title, TITLE_STYLE)]
+    if subtitle:
+        elements.append(Paragraph(subtitle, SUBTITLE_STYLE))
+    elements.append(Spacer(1, 0.2*inch))
+    return elements
+
+
+def footer_text(generated_at: datetime) -> str:
+    return f"Generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')} | BrightBuy Sales System"
+
+
+def _draw_page_footer(canvas, doc):
+    # Drawn directly on the canvas: no Paragraph layout per page
+    canvas.saveState()
+    canvas.setFont(*FOOTER_FONT)
+    canvas.setFillColor(colors.grey)
+    canvas.drawCentredString(doc.pagesize[0] / 2, PAGE_MARGIN / 2,
+                             f"{doc.footer_text} | Page {canvas.getPageNumber()}")
+    canvas.restoreState()
+
+
+def build_document(elements: list, out):
+    """Lay out a report into out (a path or binary file) with the shared page template"""
+    doc = SimpleDocTemplate(out, pagesize=letter, topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN)
+    doc.footer_text = footer_text(datetime.now())
+    doc.build(elements, onFirstPage=_draw_page_footer, onLaterPages=_draw_page_footer)
@@ -0,0 +1,227 @@
+"""
+Request Metrics
+Prometheus text exposition for GET /metrics. RequestMetricsMiddleware counts
+requests and observes their latency per route template (scope["route"].path,
+so /products/12 and /products/13 share one series; unrouted paths are
+"unmatched"). Everything else is read from the services' own counters when
+scraped, so a scrape never touches the database:
+
+  brightbuy_http_*              requests, latency, in flight
+  brightbuy_db_queries_*        statements and DB time per request (query_stats)
+  brightbuy_db_pool_*           pool size, checked out, waiting, exhausted
+  brightbuy_cache_*             hits, misses and hit ratio of the in-memory caches
+  brightbuy_email_outbox_*      pending (as of the worker's last pass), sent, failed
+  brightbuy_report_jobs_*       renders queued or running in the worker pool
+
+Counters are per process; with several uvicorn workers, scrape each one or
+sum in Prometheus.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.query_stats import Histogram, query_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class MetricFamilies:
+    """Collects samples by metric name and renders them with one HELP/TYPE header each"""
+
+    def __init__(self, prefix: str = "brightbuy_"):
+        self.prefix = prefix
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def _family(self, name: str, metric_type: str, help_text: str) -> List[str]:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (metric_type, help_text, [])
+        return family[2]
+
+    def add(self, name: str, metric_type: str, help_text: str, value, labels: Optional[Dict[str, str]] = None):
+        name = self.prefix + name
+        self._family(name, metric_type, help_text).append(f"{name}{_format_labels(labels or {})} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, value, labels: Optional[Dict[str, str]] = None):
+        self.add(name, "gauge", help_text, value, labels)
+
+    def counter(self, name: str, help_text: str, value, labels: Optional[Dict[str, str]] = None):
+        self.add(name, "counter", help_text, value, labels)
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram, labels: Optional[Dict[str, str]] = None):
+        name = self.prefix + name
+        labels = labels or {}
+        samples = self._family(name, "histogram", help_text)
+        for bound, count in histogram.cumulative():
+            samples.append(f"{name}_bucket{_format_labels(dict(labels, le=bound))} {count}")
+        samples.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(histogram.total))}")
+        samples.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        lines = []
+        for name, (metric_type, help_text, samples) in self._families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (method, route, status) -> count
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        # (method, route) -> latency histogram
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        # Scopes of the requests being served; the route is read at scrape
+        # time since it is only known once the router has matched
+        self._active: Dict[int, dict] = {}
+
+    def started(self, scope: dict):
+        with self._lock:
+            self._active[id(scope)] = scope
+
+    def finished(self, scope: dict, status: int, seconds: float):
+        route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+        method = scope.get("method", "")
+        with self._lock:
+            self._active.pop(id(scope), None)
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((method, route))
+            if histogram is None:
+                histogram = self.latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def collect(self, families: MetricFamilies):
+        with self._lock:
+            requests = sorted(self.requests.items())
+            latency = [(key, histogram.copy()) for key, histogram in sorted(self.latency.items())]
+            in_flight: Dict[Tuple[str, str], int] = {}
+            for scope in self._active.values():
+                key = (scope.get("method", ""), getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE)
+                in_flight[key] = in_flight.get(key, 0) + 1
+
+        for (method, route, status), count in requests:
+            families.counter("http_requests_total", "HTTP requests served",
+                             count, {"method": method, "route": route, "status": status})
+        for (method, route), histogram in latency:
+            families.histogram("http_request_duration_seconds", "HTTP request latency",
+                               histogram, {"method": method, "route": route})
+        for (method, route), count in sorted(in_flight.items()):
+            families.gauge("http_requests_in_flight", "HTTP requests being served",
+                           count, {"method": method, "route": route})
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware feeding request_metrics"""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.started(scope)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.finished(scope, status, time.perf_counter() - started)
+
+
+def _collect_queries(families: MetricFamilies):
+    for method, route, queries, db_seconds in query_stats.route_histograms():
+        labels = {"method": method, "route": route}
+        families.histogram("db_queries_per_request", "SQL statements issued per request", queries, labels)
+        families.histogram("db_query_seconds_per_request", "Time spent in SQL statements per request",
+                           db_seconds, labels)
+
+
+def _collect_pool(families: MetricFamilies):
+    from app.database import pool_stats
+
+    pool = pool_stats.snapshot()
+    families.gauge("db_pool_size", "Connections in the pool", pool["pool_size"])
+    families.gauge("db_pool_checked_out", "Pooled connections checked out", pool["in_use"])
+    families.gauge("db_pool_checked_out_peak", "Most pooled connections checked out at once", pool["peak_in_use"])
+    families.gauge("db_pool_waiting", "Threads waiting in get_connection() for a free pooled connection", pool["waiting"])
+    families.counter("db_pool_checkouts_total", "Pooled connection checkouts", pool["checkouts"])
+    families.counter("db_pool_exhausted_total", "Checkouts that timed out waiting for a pooled connection", pool["exhausted"])
+    families.counter("db_pool_held_seconds_total", "Time pooled connections were held", pool["held_seconds_total"])
+
+
+def _collect_caches(families: MetricFamilies):
+    from app.services.catalog_facets import catalog_facets
+    from app.services.delivery import location_cache
+    from app.services.report_jobs import report_jobs
+    from app.services.stock import stock_service
+    from app.services.variant_attributes import attribute_index
+
+    caches = [
+        ("stock", stock_service.hits, stock_service.misses),
+        ("location", location_cache.hits, location_cache.misses),
+        ("catalog_facets", catalog_facets.hits, catalog_facets.misses),
+        ("attribute_index", attribute_index.hits, attribute_index.misses),
+        ("report_artifacts", report_jobs.artifact_hits, report_jobs.artifact_misses),
+    ]
+    for cache, hits, misses in caches:
+        labels = {"cache": cache}
+        families.counter("cache_hits_total", "Lookups served from the in-memory cache", hits, labels)
+        families.counter("cache_misses_total", "Lookups that had to load from the database", misses, labels)
+        families.gauge("cache_hit_ratio", "Hits over lookups since startup",
+                       hits / (hits + misses) if hits + misses else 0.0, labels)
+
+
+def _collect_queues(families: MetricFamilies):
+    from app.services.email_outbox import email_outbox
+    from app.services.report_jobs import report_jobs
+
+    families.gauge("email_outbox_pending", "Queued emails as of the outbox worker's last pass", email_outbox.pending)
+    families.counter("email_outbox_sent_total", "Emails delivered by this process", email_outbox.sent)
+    families.counter("email_outbox_failed_total", "Failed delivery attempts in this process", email_outbox.failed)
+    families.gauge("report_jobs_queued", "Report renders queued or running", report_jobs.queue_depth())
+    families.gauge("report_workers", "Report render worker processes", report_jobs.workers)
+
+
+def render_metrics() -> str:
+    families = MetricFamilies()
+    request_metrics.collect(families)
+    _collect_queries(families)
+    _collect_pool(families)
+    _collect_caches(families)
+    _collect_queues(families)
+    return families.render()
@@ -0,0 +1,248 @@
+"""
+Sales Analytics
+Query engine over the daily sales rollups (database/sales_facts.sql). One
+SQL range scan loads the fact rows; bucketing into day/week/month/quarter,
+grouping by dimensions and period-over-period comparison are done with
+vectorized NumPy aggregation, so new questions don't need new procedures.
+
+Groupings that include category read sales_daily_categories, where an order
+counts once per category it contains; everything else reads
+sales_daily_orders.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services import customer_sketches
+from app.services.delivery import location_cache
+
+GRAINS = ("day", "week", "month", "quarter")
+DIMENSIONS = {"category": "category_id", "payment_method": "payment_method", "city": "city_id"}
+BASE_METRICS = ("orders", "revenue", "items_sold", "first_orders")
+DERIVED_METRICS = ("average_order_value", "repeat_order_rate")
+# Approximate, from the daily customer sketches; per bucket only (no group_by)
+SKETCH_METRICS = ("unique_customers",)
+METRICS = BASE_METRICS + DERIVED_METRICS + SKETCH_METRICS
+COUNT_METRICS = ("orders", "items_sold", "first_orders", "unique_customers")
+# compare -> lag in buckets, per grain. Year over year uses 364 days for the
+# day grain so weekdays line up.
+COMPARE_LAGS = {
+    "previous": {"day": 1, "week": 1, "month": 1, "quarter": 1},
+    "year": {"day": 364, "week": 52, "month": 12, "quarter": 4},
+}
+MAX_RANGE_DAYS = 3 * 366
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+# 1970-01-01 was a Thursday; weeks start on Monday
+_EPOCH_WEEKDAY = 3
+
+
+def _bucket_ordinals(days: np.ndarray, grain: str) -> np.ndarray:
+    """Days since the epoch -> bucket number of the grain"""
+    if grain == "day":
+        return days
+    if grain == "week":
+        return (days + _EPOCH_WEEKDAY) // 7
+    months = (_EPOCH + days).astype('datetime64[M]').astype(np.int64)
+    return months if grain == "month" else months // 3
+
+
+def _bucket_start(ordinal: int, grain: str) -> date:
+    if grain == "day":
+        start = _EPOCH + ordinal
+    elif grain == "week":
+        start = _EPOCH + (ordinal * 7 - _EPOCH_WEEKDAY)
+    elif grain == "month":
+        start = np.datetime64(int(ordinal), 'M').astype('datetime64[D]')
+    else:
+        start = np.datetime64(int(ordinal) * 3, 'M').astype('datetime64[D]')
+    return start.astype(date)
+
+
+def _bucket_label(start: date, grain: str) -> str:
+    if grain == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if grain == "month":
+        return start.strftime("%Y-%m")
+    if grain == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return start.isoformat()
+
+
+def _derive(values: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    orders = values["orders"]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values["average_order_value"] = np.where(orders > 0, values["revenue"] / orders, 0.0)
+        if "first_orders" in values:
+            values["repeat_order_rate"] = np.where(orders > 0, 1 - values["first_orders"] / orders, 0.0)
+    return values
+
+
+def _value(metric: str, value) -> float:
+    return int(round(value)) if metric in COUNT_METRICS else round(float(value), 4)
+
+
+class SalesQueryEngine:
+    def _validate(self, start_date: date, end_date: date, grain: str, group_by: Sequence[str],
+                  metrics: Sequence[str], compare: Optional[str]):
+        if grain not in GRAINS:
+            raise ValueError(f"Invalid grain '{grain}'. Must be one of: {', '.join(GRAINS)}")
+        unknown = [d for d in group_by if d not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Invalid group_by {', '.join(unknown)}. Must be among: {', '.join(DIMENSIONS)}")
+        unknown = [m for m in metrics if m not in METRICS]
+        if unknown:
+            raise ValueError(f"Invalid metrics {', '.join(unknown)}. Must be among: {', '.join(METRICS)}")
+        if "category" in group_by and {"first_orders", "repeat_order_rate"} & set(metrics):
+            raise ValueError("first_orders and repeat_order_rate are not available per category")
+        if group_by and "unique_customers" in metrics:
+            raise ValueError("unique_customers is only available without group_by")
+        if compare is not None and compare not in COMPARE_LAGS:
+            raise ValueError(f"Invalid compare '{compare}'. Must be one of: {', '.join(COMPARE_LAGS)}")
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        if (end_date - start_date).days > MAX_RANGE_DAYS:
+            raise ValueError(f"Date range is limited to {MAX_RANGE_DAYS} days")
+
+    def _load(self, cursor, table: str, columns: List[str], start: date, end: date) -> List[tuple]:
+        cursor.execute(
+            f"SELECT sale_date, {', '.join(columns)} FROM {table} WHERE sale_date BETWEEN %s AND %s",
+            (start, end)
+        )
+        # Dictionary cursors keep the select order
+        return [tuple(row.values()) if isinstance(row, dict) else row for row in cursor.fetchall()]
+
+    def _dimension_names(self, cursor, dimension: str, codes: np.ndarray) -> List:
+        if dimension == "category":
+            cursor.execute("SELECT category_id, category_name FROM category")
+            names = {row['category_id']: row['category_name'] for row in cursor.fetchall()}
+            return [names.get(int(c), "Uncategorized") for c in codes]
+        if dimension == "city":
+            names = []
+            for c in codes:
+                location = location_cache.by_id(cursor, int(c)) if c else None
+                names.append(location['city'] if location else "Store Pickup")
+            return names
+        return [str(c) for c in codes]
+
+    def _unique_customers(self, cursor, keys: np.ndarray, base_bucket: int, grain: str,
+                          start: date, end: date) -> np.ndarray:
+        """Merge the day sketches of each bucket (keys are bucket offsets here)"""
+        sketches = customer_sketches.load(cursor, start, end)
+        counts = np.zeros(len(keys))
+        if not sketches:
+            return counts
+        sale_days = sorted(sketches)
+        days = (np.array(sale_days, dtype='datetime64[D]') - _EPOCH).astype(np.int64)
+        offsets = _bucket_ordinals(days, grain) - base_bucket
+        registers = np.stack([sketches[d] for d in sale_days])
+        # Days are sorted, so each bucket's sketches are one contiguous run
+        bucket_offsets, run_starts = np.unique(offsets, return_index=True)
+        estimates = customer_sketches.estimate(np.maximum.reduceat(registers, run_starts, axis=0))
+        position = np.clip(np.searchsorted(bucket_offsets, keys), 0, len(bucket_offsets) - 1)
+        return np.where(bucket_offsets[position] == keys, estimates, 0)
+
+    def query(self, cursor, start_date: date, end_date: date, grain: str = "day",
+              group_by: Sequence[str] = (), metrics: Sequence[str] = ("orders", "revenue"),
+              compare: Optional[str] = None) -> dict:
+        """
+        Aggregate the rollups between start_date and end_date (inclusive).
+        compare='previous' adds each bucket's preceding bucket, 'year' the
+        same bucket a year earlier, as previous_<metric> and <metric>_change_pct.
+        Raises ValueError on invalid arguments.
+        """
+        group_by = list(dict.fromkeys(group_by))
+        metrics = list(dict.fromkeys(metrics))
+        self._validate(start_date, end_date, grain, group_by, metrics, compare)
+
+        by_category = "category" in group_by
+        table = "sales_daily_categories" if by_category else "sales_daily_orders"
+        measures = [m for m in BASE_METRICS if not (by_category and m == "first_orders")]
+        dim_columns = [DIMENSIONS[d] for d in group_by]
+
+        start_day = (np.datetime64(start_date, 'D') - _EPOCH).astype(np.int64)
+        first_bucket = int(_bucket_ordinals(np.array([start_day]), grain)[0])
+        lag = COMPARE_LAGS[compare][grain] if compare else 0
+        # Whole buckets are reported, so load from the start of the first one
+        # (and of its comparison bucket)
+        load_start = _bucket_start(first_bucket - lag, grain)
+
+        rows = self._load(cursor, table, dim_columns + measures, load_start, end_date)
+
+        result = {
+            "grain": grain,
+            "group_by": group_by,
+            "metrics": metrics,
+            "compare": compare,
+            "start_date": _bucket_start(first_bucket, grain),
+            "end_date": end_date,
+            "source": table,
+            "rows": []
+        }
+        if not rows:
+            return result
+
+        columns = list(zip(*rows))
+        days = (np.array(columns[0], dtype='datetime64[D]') - _EPOCH).astype(np.int64)
+        buckets = _bucket_ordinals(days, grain)
+
+        # Encode every dimension to dense integer codes, then one composite
+        # int64 key per row: ((bucket * n1 + c1) * n2 + c2) ...
+        dim_values = []
+        key = buckets - (first_bucket - lag)
+        for i, _ in enumerate(group_by):
+            values, codes = np.unique(np.array(columns[1 + i], dtype=object), return_inverse=True)
+            dim_values.append(values)
+            key = key * len(values) + codes
+        sizes = [len(v) for v in dim_values]
+
+        keys, inverse = np.unique(key, return_inverse=True)
+        totals = {}
+        for j, measure in enumerate(measures):
+            weights = np.array(columns[1 + len(group_by) + j], dtype=np.float64)
+            totals[measure] = np.bincount(inverse, weights=weights, minlength=len(keys))
+        totals = _derive(totals)
+        if "unique_customers" in metrics:
+            totals["unique_customers"] = self._unique_customers(cursor, keys, first_bucket - lag, grain, load_start, end_date)
+
+        # Decode the composite keys back into bucket + dimension codes
+        remainder = keys.copy()
+        codes = []
+        for size in reversed(sizes):
+            codes.append(remainder % size)
+            remainder //= size
+        codes.reverse()
+        key_buckets = remainder + (first_bucket - lag)
+
+        in_range = key_buckets >= first_bucket
+        previous_index = None
+        if compare:
+            previous_key = keys - lag * int(np.prod(sizes, dtype=np.int64))
+            position = np.searchsorted(keys, previous_key)
+            position = np.clip(position, 0, len(keys) - 1)
+            found = keys[position] == previous_key
+            previous_index = np.where(found, position, -1)
+
+        names = [self._dimension_names(cursor, d, dim_values[i]) for i, d in enumerate(group_by)]
+        for index in np.nonzero(in_range)[0]:
+            start = _bucket_start(int(key_buckets[index]), grain)
+            row = {"period": _bucket_label(start, grain), "period_start": start}
+            for i, dimension in enumerate(group_by):
+                row[dimension] = names[i][codes[i][index]]
+            for metric in metrics:
+                row[metric] = _value(metric, totals[metric][index])
+            if compare:
+                prev = previous_index[index]
+                for metric in metrics:
+                    previous = _value(metric, totals[metric][prev] if prev >= 0 else 0)
+                    row[f"previous_{metric}"] = previous
+                    row[f"{metric}_change_pct"] = (
+                        round((row[metric] - previous) / previous * 100, 2) if previous else None
+                    )
+            result["rows"].append(row)
+        return result
+
+
+sales_query_engine = SalesQueryEngine()
@@ -0,0 +1,101 @@
+"""
+Sales Facts
+Upserts the daily sales rollups (database/sales_facts.sql) at checkout, in
+the checkout transaction, so the analytics query engine never aggregates
+raw orders.
+
+Every checkout of a day would otherwise upsert the same few rows, and the
+row locks are held until commit. Each order goes to one of
+SALES_FACT_SHARDS rows per key instead (by order id), and readers sum over
+the shards.
+"""
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+SALES_FACT_SHARDS = int(os.getenv('SALES_FACT_SHARDS', 16))
+
+NO_CITY = 0
+NO_CATEGORY = 0
+
+
+def is_first_order(cursor, user_id: int, order_id: int) -> bool:
+    cursor.execute("SELECT 1 FROM orders WHERE user_id = %s AND order_id < %s LIMIT 1", (user_id, order_id))
+    return cursor.fetchone() is None
+
+
+def record_order(cursor, order_id: int, order_date: datetime, payment_method: str, city_id: Optional[int],
+                 lines: Iterable[Tuple[int, Optional[int], int, float]], first_order: bool):
+    """
+    Add one order to the day's rollups, in the order's shard.
+    lines are (variant_id, category_id, quantity, unit price) per order item.
+    Issue it last before the commit, so the rollup rows are locked briefly.
+    """
+    sale_date = order_date.date()
+    city_id = city_id or NO_CITY
+    shard = order_id % SALES_FACT_SHARDS
+
+    by_category: Dict[int, list] = {}
+    by_variant: Dict[int, list] = {}
+    for variant_id, category_id, quantity, price in lines:
+        for totals in (by_category.setdefault(category_id or NO_CATEGORY, [0.0, 0]),
+                       by_variant.setdefault(variant_id, [0.0, 0])):
+            totals[0] += quantity * price
+            totals[1] += quantity
+    revenue = sum(t[0] for t in by_category.values())
+    items_sold = sum(t[1] for t in by_category.values())
+
+    cursor.execute(
+        """INSERT INTO sales_daily_orders
+               (sale_date, payment_method, city_id, shard, orders, first_orders, revenue, items_sold)
+           VALUES (%s, %s, %s, %s, 1, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE
+               orders = orders + 1,
+               first_orders = first_orders + %s,
+               revenue = revenue + %s,
+               items_sold = items_sold + %s""",
+        (sale_date, payment_method, city_id, shard, int(first_order), revenue, items_sold,
+         int(first_order), revenue, items_sold)
+    )
+    # Sorted so concurrent checkouts lock the category rows in the same order
+    for category_id in sorted(by_category):
+        category_revenue, category_items = by_category[category_id]
+        cursor.execute(
+            """INSERT INTO sales_daily_categories
+                   (sale_date, category_id, payment_method, city_id, shard, orders, revenue, items_sold)
+               VALUES (%s, %s, %s, %s, %s, 1, %s, %s)
+               ON DUPLICATE KEY UPDATE
+                   orders = orders + 1,
+                   revenue = revenue + %s,
+                   items_sold = items_sold + %s""",
+            (sale_date, category_id, payment_method, city_id, shard, category_revenue, category_items,
+             category_revenue, category_items)
+        )
+    for variant_id in sorted(by_variant):
+        variant_revenue, variant_quantity = by_variant[variant_id]
+        cursor.execute(
+            """INSERT INTO sales_daily_variants (variant_id, sale_date, shard, quantity, revenue)
+               VALUES (%s, %s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE
+                   quantity = quantity + %s,
+                   revenue = revenue + %s""",
+            (variant_id, sale_date, shard, variant_quantity, variant_revenue, variant_quantity, variant_revenue)
+        )
+
+
+def variant_velocity(cursor, variant_ids: Iterable[int], days: int = 30) -> Dict[int, int]:
+    """Units sold per variant over the last days, from the daily rollup"""
+    variant_ids = list(dict.fromkeys(variant_ids))
+    if not variant_ids:
+        return {}
+    cursor.execute(
+        f"""SELECT variant_id, SUM(quantity) AS sold FROM sales_daily_variants
+            WHERE variant_id IN ({', '.join(['%s'] * len(variant_ids))})
+              AND sale_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+            GROUP BY variant_id""",
+        (*variant_ids, days)
+    )
+    rows = cursor.fetchall()
+    if rows and isinstance(rows[0], dict):
+        return {row['variant_id']: int(row['sold'] or 0) for row in rows}
+    return {variant_id: int(sold or 0) for variant_id, sold in rows}
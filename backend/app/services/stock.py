@@ -0,0 +1,226 @@
+"""
+Stock Availability Service
+Holds variant quantities in memory so read paths (product pages, delivery
+estimates, availability checks) don't query MySQL for every stock lookup.
+
+The database stays the source of truth: writers update it first and then
+write through to this cache, and a background reconciler reloads all
+quantities periodically so other worker processes' writes are picked up.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_THRESHOLD = 10
+STOCK_RECONCILE_SECONDS = int(os.getenv('STOCK_RECONCILE_SECONDS', 60))
+
+
+class StockService:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._quantities: Dict[int, int] = {}
+        # Write sequence number, and the sequence of each variant's last write,
+        # so a reconcile doesn't overwrite write-throughs made during its read
+        self._version = 0
+        self._written: Dict[int, int] = {}
+        self._reconciled_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[int, Optional[int]], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def subscribe(self, listener: Callable[[int, Optional[int]], None]):
+        """
+        Register a callback invoked as listener(variant_id, quantity) whenever
+        a cached quantity changes (quantity is None when the variant is removed)
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, changes: Dict[int, Optional[int]]):
+        for listener in self._listeners:
+            for variant_id, quantity in changes.items():
+                try:
+                    listener(variant_id, quantity)
+                except Exception as e:
+                    logger.warning("Stock listener failed for variant %s: %s", variant_id, e)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_availability(self, cursor, variant_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Batch lookup of current quantities.
+        Variants not cached yet are loaded with a single query; unknown
+        variants are omitted from the result.
+        """
+        variant_ids = list(dict.fromkeys(variant_ids))
+        result = {}
+        missing = []
+        quantities = self._quantities
+        for variant_id in variant_ids:
+            quantity = quantities.get(variant_id)
+            if quantity is None:
+                missing.append(variant_id)
+            else:
+                result[variant_id] = quantity
+        self.hits += len(result)
+        self.misses += len(missing)
+
+        if missing:
+            cursor.execute(
+                f"SELECT variant_id, quantity FROM variant WHERE variant_id IN ({', '.join(['%s'] * len(missing))})",
+                tuple(missing)
+            )
+            rows = cursor.fetchall()
+            self.prime(rows)
+            for row in rows:
+                result[row['variant_id']] = row['quantity'] or 0
+        return result
+
+    def refresh(self, cursor, variant_ids: Iterable[int]):
+        """Re-read the given variants from the database into the cache"""
+        variant_ids = list(dict.fromkeys(variant_ids))
+        if not variant_ids:
+            return
+        cursor.execute(
+            f"SELECT variant_id, quantity FROM variant WHERE variant_id IN ({', '.join(['%s'] * len(variant_ids))})",
+            tuple(variant_ids)
+        )
+        self.prime(cursor.fetchall())
+
+    def snapshot(self) -> Dict[int, int]:
+        """Copy of every cached quantity"""
+        with self._lock:
+            return dict(self._quantities)
+
+    @property
+    def reconciled(self) -> bool:
+        return self._reconciled_at is not None
+
+    def describe(self, quantities: Dict[int, int]) -> Dict[int, dict]:
+        """Availability payload for the read paths"""
+        return {
+            variant_id: {
+                "quantity": quantity,
+                "in_stock": quantity > 0,
+                "low_stock": quantity < LOW_STOCK_THRESHOLD
+            }
+            for variant_id, quantity in quantities.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Write-through (call after the database commit succeeded)
+    # ------------------------------------------------------------------
+
+    def prime(self, rows):
+        """Cache quantities from rows that were just read from the variant table"""
+        changed = {}
+        with self._lock:
+            for row in rows:
+                quantity = row['quantity'] or 0
+                self._mark_written(row['variant_id'])
+                if self._quantities.get(row['variant_id']) != quantity:
+                    self._quantities[row['variant_id']] = quantity
+                    changed[row['variant_id']] = quantity
+        if changed:
+            self._notify(changed)
+
+    def _mark_written(self, variant_id: int):
+        # Caller holds self._lock
+        self._version += 1
+        self._written[variant_id] = self._version
+
+    def set_quantity(self, variant_id: int, quantity: int):
+        with self._lock:
+            self._mark_written(variant_id)
+            self._quantities[variant_id] = quantity
+        self._notify({variant_id: quantity})
+
+    def adjust(self, variant_id: int, delta: int):
+        with self._lock:
+            if variant_id not in self._quantities:
+                return
+            self._mark_written(variant_id)
+            self._quantities[variant_id] += delta
+            quantity = self._quantities[variant_id]
+        self._notify({variant_id: quantity})
+
+    def remove(self, variant_id: int):
+        with self._lock:
+            self._mark_written(variant_id)
+            self._quantities.pop(variant_id, None)
+        self._notify({variant_id: None})
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    def reconcile(self):
+        """
+        Reload every variant quantity from the database.
+        Variants written through while the SELECT was running keep their
+        cached value: the write happened after (or during) the read, so the
+        row we got for them may already be stale.
+        """
+        from app.database import get_connection
+
+        conn = get_connection()
+        cursor = None
+        try:
+            with self._lock:
+                read_version = self._version
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT variant_id, quantity FROM variant")
+            fresh = {row['variant_id']: row['quantity'] or 0 for row in cursor.fetchall()}
+            changed = {}
+            with self._lock:
+                written_since = {k for k, v in self._written.items() if v > read_version}
+                merged = {k: v for k, v in fresh.items() if k not in written_since}
+                for variant_id in written_since:
+                    if variant_id in self._quantities:
+                        merged[variant_id] = self._quantities[variant_id]
+                for variant_id, quantity in merged.items():
+                    current = self._quantities.get(variant_id)
+                    if current == quantity:
+                        continue
+                    # Variants created by other workers since the last reconcile are changes too
+                    if current is not None or self._reconciled_at is not None:
+                        changed[variant_id] = quantity
+                changed.update({k: None for k in self._quantities if k not in merged})
+                self._quantities = merged
+                self._written = {k: v for k, v in self._written.items() if v > read_version}
+            self._reconciled_at = time.monotonic()
+            if changed:
+                logger.info("Stock reconcile corrected %s cached quantities", len(changed))
+                self._notify(changed)
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def _run(self, interval: int):
+        while not self._stop.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.warning("Stock reconcile failed: %s", e)
+            self._stop.wait(interval)
+
+    def start(self, interval: int = STOCK_RECONCILE_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="stock-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+stock_service = StockService()
@@ -0,0 +1,269 @@
+"""
+Soft Stock Reservations
+Checkout reserves cart quantities against the stock service before touching
+the database, holds them for a TTL, and confirms them once the order commits
+(or releases them on failure/timeout).
+
+Each variant's free units are split across N independently locked buckets,
+so concurrent checkouts of one popular SKU take units from different buckets
+instead of serializing on a single lock; a reservation only walks into other
+buckets when its home bucket runs dry. The database row is only touched by
+the final conditional decrement at commit time.
+
+An owner holds at most one live reservation: reserving again replaces the
+previous one, and one reservation may hold at most RESERVATION_MAX_UNITS
+units, so a client looping on POST /orders/reserve cannot drain stock.
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from app.services.stock import StockService, stock_service
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_TTL_SECONDS = int(os.getenv('RESERVATION_TTL_SECONDS', 600))
+RESERVATION_SHARDS = int(os.getenv('RESERVATION_SHARDS', 8))
+RESERVATION_MAX_UNITS = int(os.getenv('RESERVATION_MAX_UNITS', 50))
+
+
+class InsufficientStock(Exception):
+    def __init__(self, variant_id: int, available: int, requested: int):
+        self.variant_id = variant_id
+        self.available = available
+        self.requested = requested
+        super().__init__(f"Insufficient stock for variant {variant_id}. Available: {available}, Requested: {requested}")
+
+
+class ReservationLimitExceeded(Exception):
+    def __init__(self, requested: int, limit: int):
+        self.requested = requested
+        self.limit = limit
+        super().__init__(f"A reservation may hold at most {limit} units, requested {requested}")
+
+
+class _VariantCounter:
+    """
+    Free units of one variant split across independently locked buckets.
+    held[i] counts units reserved out of bucket i; both lists are only
+    changed under that bucket's lock (or all locks, for resync).
+    """
+
+    def __init__(self, shards: int):
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.free = [0] * shards
+        self.held = [0] * shards
+
+    def resync(self, stock: int):
+        """Redistribute free units after the underlying stock changed"""
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            available = max(stock - sum(self.held), 0)
+            shards = len(self.free)
+            for i in range(shards):
+                self.free[i] = available // shards + (1 if i < available % shards else 0)
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
+
+    def available(self) -> int:
+        return sum(self.free)
+
+    def take(self, quantity: int, home: int) -> Optional[List[Tuple[int, int]]]:
+        """Take units starting at the home bucket; returns the parts taken or None"""
+        shards = len(self.free)
+        parts = []
+        needed = quantity
+        for step in range(shards):
+            i = (home + step) % shards
+            with self.locks[i]:
+                n = min(self.free[i], needed)
+                if n:
+                    self.free[i] -= n
+                    self.held[i] += n
+                    parts.append((i, n))
+                    needed -= n
+            if not needed:
+                return parts
+        self.settle(parts, consumed=False)
+        return None
+
+    def settle(self, parts: List[Tuple[int, int]], consumed: bool):
+        """Finish a reservation: return its units unless the order consumed them"""
+        for i, n in parts:
+            with self.locks[i]:
+                self.held[i] -= n
+                if not consumed:
+                    self.free[i] += n
+
+
+class Reservation:
+    def __init__(self, reservation_id: str, owner: Optional[int], expires_at: float):
+        self.reservation_id = reservation_id
+        self.owner = owner
+        self.expires_at = expires_at
+        self.items: Dict[int, int] = {}
+        self.parts: Dict[int, List[Tuple[int, int]]] = {}
+
+
+class ReservationManager:
+    def __init__(self, stock: StockService, shards: int = RESERVATION_SHARDS, ttl_seconds: int = RESERVATION_TTL_SECONDS,
+                 max_units: int = RESERVATION_MAX_UNITS):
+        self.stock = stock
+        self.shards = shards
+        self.ttl_seconds = ttl_seconds
+        self.max_units = max_units
+        self._counters: Dict[int, _VariantCounter] = {}
+        self._counters_lock = threading.Lock()
+        self._reservations: Dict[str, Reservation] = {}
+        # owner -> id of the owner's live reservation
+        self._by_owner: Dict[int, str] = {}
+        self._registry_lock = threading.Lock()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._home = itertools.count()
+        stock.subscribe(self._on_stock_change)
+
+    def _on_stock_change(self, variant_id: int, quantity: Optional[int]):
+        counter = self._counters.get(variant_id)
+        if counter is not None:
+            counter.resync(quantity or 0)
+
+    def _counter(self, variant_id: int, stock_quantity: int) -> _VariantCounter:
+        counter = self._counters.get(variant_id)
+        if counter is None:
+            with self._counters_lock:
+                counter = self._counters.get(variant_id)
+                if counter is None:
+                    counter = _VariantCounter(self.shards)
+                    counter.resync(stock_quantity)
+                    self._counters[variant_id] = counter
+        return counter
+
+    def reserve(self, cursor, items: Dict[int, int], owner: Optional[int] = None, ttl_seconds: Optional[int] = None) -> Reservation:
+        """
+        Reserve all items (variant_id -> quantity) or none of them.
+        Raises InsufficientStock for the first item that cannot be covered.
+        A shortfall is re-checked once against the database, since the cached
+        stock may predate a restock made by another worker process.
+
+        With an owner, the owner's previous reservation is released first
+        (its units count towards the new one) and the total is capped at
+        max_units (ReservationLimitExceeded).
+        """
+        if owner is not None:
+            total = sum(items.values())
+            if total > self.max_units:
+                raise ReservationLimitExceeded(total, self.max_units)
+            previous = self._by_owner.get(owner)
+            if previous is not None:
+                self.release(previous)
+        self.expire()
+        try:
+            return self._reserve(cursor, items, owner, ttl_seconds)
+        except InsufficientStock as e:
+            if cursor is None:
+                raise
+            self.stock.refresh(cursor, [e.variant_id])
+            return self._reserve(cursor, items, owner, ttl_seconds)
+
+    def _reserve(self, cursor, items: Dict[int, int], owner: Optional[int], ttl_seconds: Optional[int]) -> Reservation:
+        stock = self.stock.get_availability(cursor, items.keys())
+        reservation = Reservation(
+            uuid.uuid4().hex,
+            owner,
+            time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        )
+        home = next(self._home) % self.shards
+        try:
+            # Fixed variant order keeps multi-item reservations from livelocking
+            for variant_id in sorted(items):
+                quantity = items[variant_id]
+                counter = self._counter(variant_id, stock.get(variant_id, 0))
+                parts = counter.take(quantity, home)
+                if parts is None:
+                    raise InsufficientStock(variant_id, counter.available(), quantity)
+                reservation.items[variant_id] = quantity
+                reservation.parts[variant_id] = parts
+        except InsufficientStock:
+            self._settle(reservation, consumed=False)
+            raise
+
+        replaced = None
+        with self._registry_lock:
+            self._reservations[reservation.reservation_id] = reservation
+            heapq.heappush(self._expiry_heap, (reservation.expires_at, reservation.reservation_id))
+            if owner is not None:
+                # A concurrent reserve by the same owner may have registered first
+                previous = self._by_owner.get(owner)
+                if previous is not None:
+                    replaced = self._reservations.pop(previous, None)
+                self._by_owner[owner] = reservation.reservation_id
+        if replaced is not None:
+            self._settle(replaced, consumed=False)
+        return reservation
+
+    def get(self, reservation_id: str) -> Optional[Reservation]:
+        reservation = self._reservations.get(reservation_id)
+        if reservation and reservation.expires_at <= time.monotonic():
+            self.release(reservation_id)
+            return None
+        return reservation
+
+    def _pop(self, reservation_id: str) -> Optional[Reservation]:
+        with self._registry_lock:
+            reservation = self._reservations.pop(reservation_id, None)
+            if reservation is not None and self._by_owner.get(reservation.owner) == reservation_id:
+                del self._by_owner[reservation.owner]
+            return reservation
+
+    def _settle(self, reservation: Reservation, consumed: bool):
+        for variant_id, quantity in reservation.items.items():
+            self._counters[variant_id].settle(reservation.parts[variant_id], consumed)
+
+    def confirm(self, reservation_id: str):
+        """
+        The order committed: the reserved units are now gone from stock.
+        Call right before writing the decrement through to the stock service;
+        the resync it triggers then recomputes free units from the new stock.
+        """
+        reservation = self._pop(reservation_id)
+        if reservation:
+            self._settle(reservation, consumed=True)
+
+    def release(self, reservation_id: str, owner: Optional[int] = None) -> bool:
+        """
+        Checkout failed or was abandoned: return the units. With an owner,
+        only a reservation of that owner is released. Returns whether one was.
+        """
+        if owner is not None:
+            with self._registry_lock:
+                reservation = self._reservations.get(reservation_id)
+                if reservation is None or reservation.owner != owner:
+                    return False
+        reservation = self._pop(reservation_id)
+        if reservation:
+            self._settle(reservation, consumed=False)
+        return reservation is not None
+
+    def expire(self):
+        """Release every reservation whose TTL has passed"""
+        now = time.monotonic()
+        expired = []
+        with self._registry_lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, reservation_id = heapq.heappop(self._expiry_heap)
+                if reservation_id in self._reservations:
+                    expired.append(reservation_id)
+        for reservation_id in expired:
+            self.release(reservation_id)
+        if expired:
+            logger.info("Released %s expired stock reservations", len(expired))
+
+
+reservation_manager = ReservationManager(stock_service)
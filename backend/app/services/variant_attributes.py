@@ -0,0 +1,185 @@
+"""
+Variant attribute loading and attribute-value filtering
+Loads attributes (colour, model, warranty, ...) for many variants with a single
+grouped query, and keeps an (attribute_name, value) -> variant_id index used by
+the product listing filters.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+ATTRIBUTE_INDEX_TTL_SECONDS = int(os.getenv('ATTRIBUTE_INDEX_TTL_SECONDS', 300))
+
+
+def _placeholders(values) -> str:
+    return ', '.join(['%s'] * len(values))
+
+
+def load_variant_attributes(cursor, variant_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """
+    Load attributes for a set of variants with one query.
+
+    Returns {variant_id: [{"attribute_name": ..., "value": ...}, ...]}
+    """
+    variant_ids = list(dict.fromkeys(variant_ids))
+    if not variant_ids:
+        return {}
+
+    cursor.execute(f"""
+        SELECT vav.variant_id, va.attribute_name, vav.value
+        FROM variant_attribute_value vav
+        JOIN variant_attribute va ON vav.attribute_id = va.attribute_id
+        WHERE vav.variant_id IN ({_placeholders(variant_ids)})
+        ORDER BY vav.variant_id, va.attribute_id
+    """, tuple(variant_ids))
+
+    attributes = defaultdict(list)
+    for row in cursor.fetchall():
+        attributes[row['variant_id']].append({
+            "attribute_name": row['attribute_name'],
+            "value": row['value']
+        })
+    return dict(attributes)
+
+
+def load_product_attributes(cursor, product_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, List[str]]]:
+    """
+    Load the distinct attribute values of every variant of the given products
+    with one grouped query (all products when product_ids is None).
+
+    Returns {product_id: {"Colour": ["Black", "Silver"], ...}}
+    """
+    query = """
+        SELECT v.product_id, va.attribute_name, vav.value
+        FROM variant v
+        JOIN variant_attribute_value vav ON vav.variant_id = v.variant_id
+        JOIN variant_attribute va ON vav.attribute_id = va.attribute_id
+    """
+    params: Tuple = ()
+    if product_ids is not None:
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids:
+            return {}
+        query += f" WHERE v.product_id IN ({_placeholders(product_ids)})"
+        params = tuple(product_ids)
+    query += """
+        GROUP BY v.product_id, va.attribute_id, va.attribute_name, vav.value
+        ORDER BY v.product_id, va.attribute_id, vav.value
+    """
+    cursor.execute(query, params)
+
+    attributes: Dict[int, Dict[str, List[str]]] = defaultdict(dict)
+    for row in cursor.fetchall():
+        if row['value'] is None:
+            continue
+        attributes[row['product_id']].setdefault(row['attribute_name'], []).append(row['value'])
+    return dict(attributes)
+
+
+def parse_attribute_filters(raw_filters: Optional[List[str]]) -> Dict[str, Set[str]]:
+    """
+    Parse "name:value" query parameters into {name: {values}}.
+    Repeating a name ORs its values; different names are ANDed.
+    Raises ValueError on malformed filters.
+    """
+    filters: Dict[str, Set[str]] = defaultdict(set)
+    for raw in raw_filters or []:
+        name, sep, value = raw.partition(':')
+        if not sep or not name.strip() or not value.strip():
+            raise ValueError(f"Invalid attribute filter '{raw}'. Use name:value, e.g. Colour:Black")
+        filters[name.strip().lower()].add(value.strip().lower())
+    return dict(filters)
+
+
+class AttributeIndex:
+    """
+    In-memory inverted index (attribute_name, value) -> {variant_id}.
+
+    Built from one scan of variant_attribute_value and swapped in atomically,
+    so lookups never touch the database and cost only set intersections,
+    independent of how large the attribute table grows.
+    """
+
+    def __init__(self, ttl_seconds: int = ATTRIBUTE_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        # _lock guards the state below and is held only briefly; _build_lock
+        # keeps to one rebuild at a time
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # (postings, variant -> product), replaced as one tuple so readers
+        # always see a matching pair
+        self._index: Tuple[Dict[Tuple[str, str], Set[int]], Dict[int, int]] = ({}, {})
+        self._built_at: Optional[float] = None
+        # Bumped by invalidate(); a rebuild that started before the bump
+        # publishes its index but leaves it stale
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """Force a rebuild on next use (call after catalog mutations)"""
+        with self._lock:
+            self._generation += 1
+            self._built_at = None
+
+    def _is_fresh(self) -> bool:
+        built_at = self._built_at
+        return built_at is not None and time.monotonic() - built_at < self.ttl_seconds
+
+    def ensure_loaded(self, cursor):
+        if self._is_fresh():
+            self.hits += 1
+            return
+        with self._build_lock:
+            if self._is_fresh():
+                self.hits += 1
+                return
+            self.misses += 1
+            with self._lock:
+                generation = self._generation
+            cursor.execute("""
+                SELECT vav.variant_id, v.product_id, va.attribute_name, vav.value
+                FROM variant_attribute_value vav
+                JOIN variant_attribute va ON vav.attribute_id = va.attribute_id
+                JOIN variant v ON vav.variant_id = v.variant_id
+                WHERE vav.value IS NOT NULL
+            """)
+            postings: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+            variant_product: Dict[int, int] = {}
+            for row in cursor.fetchall():
+                key = (row['attribute_name'].lower(), row['value'].lower())
+                postings[key].add(row['variant_id'])
+                variant_product[row['variant_id']] = row['product_id']
+            with self._lock:
+                self._index = (dict(postings), variant_product)
+                if self._generation == generation:
+                    self._built_at = time.monotonic()
+
+    def match_variants(self, filters: Dict[str, Set[str]], index: Optional[tuple] = None) -> Set[int]:
+        """Variants that satisfy every attribute filter"""
+        matched: Optional[Set[int]] = None
+        postings = (index or self._index)[0]
+        # Intersect the smallest candidate sets first
+        per_attribute = []
+        for name, values in filters.items():
+            candidates = set()
+            for value in values:
+                candidates |= postings.get((name, value), set())
+            per_attribute.append(candidates)
+        for candidates in sorted(per_attribute, key=len):
+            matched = candidates if matched is None else matched & candidates
+            if not matched:
+                return set()
+        return matched or set()
+
+    def match_products(self, cursor, filters: Dict[str, Set[str]]) -> Set[int]:
+        """Products with at least one variant satisfying every attribute filter"""
+        self.ensure_loaded(cursor)
+        index = self._index
+        variant_product = index[1]
+        return {variant_product[v] for v in self.match_variants(filters, index) if v in variant_product}
+
+
+attribute_index = AttributeIndex()
@@ -0,0 +1,295 @@
+"""
+Storefront Load Test
+Drives a running API with scripted journeys over the data from
+bench/seed_data.py and reports latency percentiles and throughput per
+endpoint.
+
+  customer  browse /products/, open a product's variants, add one to the
+            cart, view the cart and its delivery estimate, sometimes check
+            out (cash on delivery, store pickup), then list the orders
+  admin     the /analytics/* dashboards and CSV /reports/* with an admin
+            token minted from SECRET_KEY for the seeded admin
+
+Each worker thread owns its own slice of the seeded customers, so no two
+workers touch the same cart. Results (p50/p95/p99/mean/max in ms, requests
+per second, errors) are written as JSON for comparing runs:
+
+    python bench/seed_data.py --users 2000 --reset
+    uvicorn app.main:app --port 8020 --workers 4
+    python bench/load_test.py run --users 2000 --concurrency 16 --duration 60 --out bench/results/before.json
+    python bench/load_test.py compare bench/results/before.json bench/results/after.json
+"""
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'bench')
+
+from seed_data import SEED_ID_BASE, admin_user_id, user_ids
+
+RESULTS_DIR = Path("bench/results")
+
+
+class Recorder:
+    """Latencies and errors per endpoint, one instance per worker"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.journeys: Dict[str, int] = {}
+
+    def call(self, client: httpx.Client, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        self.latencies.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        return response
+
+    def merge(self, other: "Recorder"):
+        for name, values in other.latencies.items():
+            self.latencies.setdefault(name, []).extend(values)
+        for name, count in other.errors.items():
+            self.errors[name] = self.errors.get(name, 0) + count
+        for name, count in other.journeys.items():
+            self.journeys[name] = self.journeys.get(name, 0) + count
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, dict]:
+    endpoints = {}
+    for name in sorted(set(recorder.latencies) | set(recorder.errors)):
+        ordered = sorted(recorder.latencies.get(name, []))
+        endpoints[name] = {
+            "requests": len(ordered),
+            "errors": recorder.errors.get(name, 0),
+            "rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+    return endpoints
+
+
+# ----------------------------------------------------------------------
+# Journeys
+# ----------------------------------------------------------------------
+
+class Catalog:
+    """Seeded product ids, fetched once from /products/"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.product_ids: List[int] = []
+        self.cities: List[str] = []
+
+    def load(self, client: httpx.Client):
+        with self._lock:
+            if self.product_ids:
+                return
+            products = client.get("/products/").raise_for_status().json()
+            ids = [p["product_id"] for p in products]
+            self.product_ids = [i for i in ids if i >= SEED_ID_BASE] or ids
+            self.cities = [c["city"] for c in client.get("/locations/cities").raise_for_status().json()]
+        if not self.product_ids:
+            raise RuntimeError("No products to browse; run bench/seed_data.py first")
+
+
+def customer_journey(client: httpx.Client, rng: random.Random, user_id: int, catalog: Catalog,
+                     recorder: Recorder, checkout_ratio: float):
+    recorder.call(client, "GET /products/", "GET", "/products/")
+    product_id = rng.choice(catalog.product_ids)
+    response = recorder.call(client, "GET /products/{id}/variants/", "GET", f"/products/{product_id}/variants/")
+    variants = response.json().get("variants", []) if response else []
+    if variants:
+        variant_id = rng.choice(variants)["variant_id"]
+        recorder.call(client, "POST /cart/add", "POST", "/cart/add", params={"user_id": user_id},
+                      json={"variant_id": variant_id, "quantity": 1})
+    recorder.call(client, "GET /cart/{user_id}", "GET", f"/cart/{user_id}")
+    recorder.call(client, "GET /cart/delivery-estimate/{user_id}", "GET", f"/cart/delivery-estimate/{user_id}",
+                  params={"delivery_method": "home_delivery", "city": rng.choice(catalog.cities)})
+    if variants and rng.random() < checkout_ratio:
+        recorder.call(client, "POST /orders/checkout", "POST", "/orders/checkout",
+                      json={"user_id": user_id, "payment_method": "cod", "delivery_method": "store_pickup"})
+    recorder.call(client, "GET /orders/user/{user_id}", "GET", f"/orders/user/{user_id}")
+    recorder.journeys["customer"] = recorder.journeys.get("customer", 0) + 1
+
+
+def admin_journey(client: httpx.Client, rng: random.Random, user_id: int, headers: dict, recorder: Recorder):
+    today = date.today()
+    steps = [
+        ("GET /analytics/sales/report", "/analytics/sales/report", {}),
+        ("GET /analytics/sales/query", "/analytics/sales/query",
+         {"start_date": (today - timedelta(days=365)).isoformat(), "grain": "month", "group_by": "category",
+          "metrics": "orders,revenue,unique_customers"}),
+        ("GET /analytics/products/top-selling", "/analytics/products/top-selling", {"days": 90}),
+        ("GET /analytics/inventory/low-stock", "/analytics/inventory/low-stock", {"threshold": 50}),
+        ("GET /analytics/customers/{user_id}/order-history", f"/analytics/customers/{user_id}/order-history", {}),
+        ("GET /reports/top-selling-products", "/reports/top-selling-products", {"format": "csv"}),
+        ("GET /reports/all-customers-summary", "/reports/all-customers-summary", {"format": "csv", "limit": 100}),
+        ("GET /reports/quarterly-sales/{year}", f"/reports/quarterly-sales/{today.year - rng.randrange(0, 2)}",
+         {"format": "csv"}),
+    ]
+    for name, url, params in steps:
+        recorder.call(client, name, "GET", url, params=params, headers=headers)
+    recorder.journeys["admin"] = recorder.journeys.get("admin", 0) + 1
+
+
+def admin_headers(users: int, duration: float) -> dict:
+    from app.security import create_access_token
+
+    token = create_access_token(
+        {"sub": str(admin_user_id(users)), "user_name": "bench_admin", "email": "bench_admin@example.com",
+         "user_type": "admin"},
+        expires_delta=timedelta(seconds=duration + 600)
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    headers = admin_headers(args.users, args.duration)
+    catalog = Catalog()
+    customers = list(user_ids(args.users))
+    recorders = [Recorder() for _ in range(args.concurrency)]
+    deadline = time.perf_counter() + args.warmup + args.duration
+    measure_from = time.perf_counter() + args.warmup
+
+    def worker(index: int):
+        rng = random.Random(args.seed + index)
+        own = customers[index::args.concurrency]
+        warmup = Recorder()
+        with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+            catalog.load(client)
+            while time.perf_counter() < deadline:
+                recorder = recorders[index] if time.perf_counter() >= measure_from else warmup
+                if rng.random() < args.admin_ratio:
+                    admin_journey(client, rng, rng.choice(customers), headers, recorder)
+                else:
+                    customer_journey(client, rng, rng.choice(own), catalog, recorder, args.checkout_ratio)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"load-{i}") for i in range(args.concurrency)]
+    started_at = datetime.now().isoformat(timespec="seconds")
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = Recorder()
+    for recorder in recorders:
+        total.merge(recorder)
+    endpoints = summarize(total, args.duration)
+    requests = sum(e["requests"] for e in endpoints.values())
+    return {
+        "meta": {
+            "started_at": started_at,
+            "commit": git_commit(),
+            "base_url": args.base_url,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "admin_ratio": args.admin_ratio,
+            "checkout_ratio": args.checkout_ratio,
+            "seed": args.seed,
+        },
+        "journeys": total.journeys,
+        "total": {
+            "requests": requests,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "rps": round(requests / args.duration, 2),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_results(results: dict):
+    print(f"{'endpoint':<50} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, e in results["endpoints"].items():
+        print(f"{name:<50} {e['requests']:>7} {e['errors']:>5} {e['rps']:>8.1f} "
+              f"{e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} {e['p99_ms']:>8.1f}")
+    total = results["total"]
+    print(f"\n{total['requests']} requests, {total['errors']} errors, {total['rps']} req/s; journeys {results['journeys']}")
+
+
+def compare(before_path: Path, after_path: Path):
+    before = json.loads(before_path.read_text())["endpoints"]
+    after = json.loads(after_path.read_text())["endpoints"]
+    print(f"{'endpoint':<50} {'p50 before':>10} {'after':>8} {'p95 before':>10} {'after':>8} {'p95 change':>10}")
+    for name in sorted(set(before) | set(after)):
+        b, a = before.get(name), after.get(name)
+        if not b or not a:
+            print(f"{name:<50} {'only in ' + ('after' if a else 'before'):>48}")
+            continue
+        change = (a["p95_ms"] - b["p95_ms"]) / b["p95_ms"] * 100 if b["p95_ms"] else 0.0
+        print(f"{name:<50} {b['p50_ms']:>10.1f} {a['p50_ms']:>8.1f} {b['p95_ms']:>10.1f} {a['p95_ms']:>8.1f} {change:>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storefront API load test")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    run_parser = sub.add_parser("run", help="drive the API and write the results")
+    run_parser.add_argument("--base-url", default="http://localhost:8020")
+    run_parser.add_argument("--users", type=int, default=2000, help="--users given to seed_data.py")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds first")
+    run_parser.add_argument("--admin-ratio", type=float, default=0.05, help="share of admin journeys")
+    run_parser.add_argument("--checkout-ratio", type=float, default=0.3, help="share of customer journeys that check out")
+    run_parser.add_argument("--timeout", type=float, default=30)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--out", type=Path, help="results file (default bench/results/load_<time>.json)")
+    compare_parser = sub.add_parser("compare", help="p50/p95 per endpoint between two result files")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+
+    if args.mode == "compare":
+        compare(args.before, args.after)
+        return
+
+    results = run(args)
+    out = args.out or RESULTS_DIR / f"load_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print_results(results)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
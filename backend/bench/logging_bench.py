@@ -0,0 +1,191 @@
+"""
+Logging Overhead Benchmark
+Times get_current_user (app/security.py), which runs on every authenticated
+request, under each way it can log:
+
+  none     token decode only, no logging at all (the floor)
+  print    the previous code path: five print() calls per request, including
+           the credentials and the decoded payload
+  direct   the current code with app.security at DEBUG and a plain
+           StreamHandler + JsonFormatter on the root logger: formatting and
+           the write happen on the request thread
+  queued   the same with the app's setup (app/logging_config.py): the record
+           is queued and formatted and written by the listener thread
+  gated    the production default: app.security at INFO, so the debug call
+           costs one level check
+
+Output goes into a pipe drained by a reader thread, as stdout is under a
+container runtime (--sink file or devnull for the other cases). With
+--threads > 1 the request threads contend for the stream, which is where
+synchronous writes hurt most. The listener thread still shares the GIL, so
+"queued" moves the write off the request thread but not all of its CPU;
+"gated" is what a request pays in production.
+
+Runs without a database:
+    python bench/logging_bench.py --requests 20000 --threads 1 8
+"""
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import timedelta
+
+sys.path.insert(0, '.')
+os.environ.setdefault('SECRET_KEY', 'logging-benchmark-secret')
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.logging_config import JsonFormatter, setup_logging, shutdown_logging
+from app.security import create_access_token, decode_token, get_current_user
+
+MODES = ["none", "print", "direct", "queued", "gated"]
+
+
+def legacy_get_current_user(credentials):
+    """get_current_user as it was, prints included"""
+    print(f"DEBUG: Received credentials: {credentials}")
+    token = credentials.credentials
+    print(f"DEBUG: Token (first 20 chars): {token[:20]}...")
+    payload = decode_token(token)
+    print(f"DEBUG: Decoded payload: {payload}")
+    if not payload.get("sub"):
+        raise ValueError("missing subject")
+    print(f"DEBUG: User type: {payload.get('user_type')}")
+    return payload
+
+
+def bare_get_current_user(credentials):
+    payload = decode_token(credentials.credentials)
+    if not payload.get("sub"):
+        raise ValueError("missing subject")
+    return payload
+
+
+@contextlib.contextmanager
+def open_sink(kind: str):
+    if kind == "devnull":
+        with open(os.devnull, "w") as sink:
+            yield sink
+        return
+    if kind == "file":
+        with open("bench_logging.out", "w") as sink:
+            yield sink
+        os.remove("bench_logging.out")
+        return
+
+    read_fd, write_fd = os.pipe()
+    drained = [0]
+
+    def drain():
+        with os.fdopen(read_fd, "rb", buffering=0) as reader:
+            while True:
+                chunk = reader.read(65536)
+                if not chunk:
+                    return
+                drained[0] += len(chunk)
+
+    reader_thread = threading.Thread(target=drain, daemon=True)
+    reader_thread.start()
+    sink = os.fdopen(write_fd, "w", buffering=1)
+    try:
+        yield sink
+    finally:
+        sink.close()
+        reader_thread.join()
+
+
+@contextlib.contextmanager
+def logging_mode(mode: str, sink):
+    root = logging.getLogger()
+    security_logger = logging.getLogger("app.security")
+    saved_stdout = sys.stdout
+    handler = None
+    if mode == "print":
+        sys.stdout = sink
+    elif mode == "direct":
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(JsonFormatter())
+        root.addHandler(handler)
+        security_logger.setLevel(logging.DEBUG)
+    elif mode in ("queued", "gated"):
+        setup_logging(level="INFO", levels="app.security=DEBUG" if mode == "queued" else "",
+                      log_format="json", stream=sink)
+    try:
+        yield
+    finally:
+        sys.stdout = saved_stdout
+        if mode in ("queued", "gated"):
+            # Drains whatever the listener has not written yet
+            shutdown_logging()
+            for queue_handler in list(root.handlers):
+                root.removeHandler(queue_handler)
+        if handler is not None:
+            root.removeHandler(handler)
+        security_logger.setLevel(logging.NOTSET)
+
+
+def run_mode(mode: str, credentials, requests: int, threads: int, sink_kind: str) -> dict:
+    target = {"none": bare_get_current_user, "print": legacy_get_current_user}.get(mode, get_current_user)
+    per_thread = requests // threads
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(samples):
+        barrier.wait()
+        perf_counter = time.perf_counter
+        for _ in range(per_thread):
+            started = perf_counter()
+            target(credentials)
+            samples.append(perf_counter() - started)
+
+    with open_sink(sink_kind) as sink, logging_mode(mode, sink):
+        workers = [threading.Thread(target=worker, args=(latencies[i],)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    samples = sorted(s for thread_samples in latencies for s in thread_samples)
+    return {
+        "mode": mode,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99) - 1] * 1e6,
+        "per_second": len(samples) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request logging overhead of the auth dependency")
+    parser.add_argument("--requests", type=int, default=20000, help="calls per mode")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--sink", choices=["pipe", "file", "devnull"], default="pipe")
+    args = parser.parse_args()
+
+    token = create_access_token(
+        {"sub": "42", "user_name": "bench", "email": "bench@example.com", "user_type": "customer"},
+        timedelta(hours=1)
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    for threads in args.threads:
+        print(f"\n{args.requests} requests, {threads} thread(s), sink={args.sink}")
+        print(f"  {'mode':<8} {'mean µs':>9} {'p99 µs':>9} {'overhead µs':>12} {'req/s':>10}")
+        floor = None
+        for mode in args.modes:
+            result = run_mode(mode, credentials, args.requests, threads, args.sink)
+            if mode == "none":
+                floor = result["mean_us"]
+            overhead = f"{result['mean_us'] - floor:12.1f}" if floor is not None else f"{'-':>12}"
+            print(f"  {mode:<8} {result['mean_us']:9.1f} {result['p99_us']:9.1f} {overhead} {result['per_second']:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Report Rendering Benchmark
+Times PDF generation per 1,000 rows for the all-customers summary layout:
+
+  legacy  - the previous per-request code path: getSampleStyleSheet() and
+            ParagraphStyle/TableStyle construction on every call, one Table
+            holding every row, built into a BytesIO
+  themed  - the current renderer: styles from app/services/report_theme.py
+            built once at import, rows as cell tuples laid out per page
+
+Runs without a database:
+    python bench/report_render.py --rows 1000 5000 --repeat 3
+"""
+import argparse
+import sys
+import time
+from decimal import Decimal
+from io import BytesIO
+
+sys.path.insert(0, '.')
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.services.report_rendering import render_all_customers_summary
+
+
+def make_rows(count: int) -> list:
+    return [
+        {
+            "user_name": f"customer{i}",
+            "email": f"customer{i}@example.com",
+            "total_orders": i % 40,
+            "total_spent": Decimal(i * 13) / 10,
+            "average_order_value": Decimal(i % 500) / 3,
+            "completed_payments": i % 30,
+            "pending_payments": i % 4
+        }
+        for i in range(count)
+    ]
+
+
+def render_legacy(rows: list) -> bytes:
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    styles = getSampleStyleSheet()
+    elements = [
+        Paragraph("All Customers Summary Report", ParagraphStyle(
+            'CustomTitle', parent=styles['Heading1'], fontSize=24, textColor=colors.HexColor('#2C3E50'),
+            spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold')),
+        Paragraph(f"Top {len(rows)} customers by total spending", ParagraphStyle(
+            'CustomSubtitle', parent=styles['Normal'], fontSize=12, textColor=colors.HexColor('#7F8C8D'),
+            spaceAfter=20, alignment=TA_CENTER)),
+        Spacer(1, 0.2*inch),
+    ]
+    summary_style = getSampleStyleSheet()['Normal']
+    summary_style.fontSize = 11
+    summary_style.spaceAfter = 15
+    elements.append(Paragraph(f"<b>Overview:</b><br/>Total Customers: <b>{len(rows)}</b>", summary_style))
+    elements.append(Spacer(1, 0.3*inch))
+
+    table_data = [['Name', 'Email', 'Orders', 'Total Spent', 'Avg Order', 'Completed', 'Pending']]
+    for row in rows:
+        table_data.append([
+            row['user_name'][:15],
+            row['email'][:25],
+            str(row['total_orders']),
+            f"${row['total_spent']:,.2f}",
+            f"${row['average_order_value']:,.2f}",
+            str(row['completed_payments']),
+            str(row['pending_payments'])
+        ])
+    table = Table(table_data, colWidths=[1.1*inch, 1.8*inch, 0.7*inch, 1*inch, 0.9*inch, 0.8*inch, 0.7*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495E')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 0), (-1, 0), 10),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ECF0F1')]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 1), (-1, -1), 5),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
+    ]))
+    elements.append(table)
+    elements.append(Spacer(1, 0.5*inch))
+    footer_style = ParagraphStyle('Footer', parent=getSampleStyleSheet()['Normal'],
+                                  fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
+    elements.append(Paragraph("Generated | BrightBuy Sales System", footer_style))
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_themed(rows: list) -> bytes:
+    data = {
+        "rows": rows,
+        "totals": {
+            "revenue": sum(row['total_spent'] for row in rows),
+            "orders": sum(row['total_orders'] for row in rows)
+        }
+    }
+    buffer = BytesIO()
+    render_all_customers_summary(data, buffer)
+    return buffer.getvalue()
+
+
+def best_of(fn, rows, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF report rendering benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy ms/1k':>14} {'themed ms/1k':>14} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        legacy = best_of(render_legacy, rows, args.repeat)
+        themed = best_of(render_themed, rows, args.repeat)
+        per_k = 1000 / count * 1000
+        print(f"{count:>8} {legacy * per_k:>14.1f} {themed * per_k:>14.1f} {legacy / themed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
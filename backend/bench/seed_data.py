@@ -0,0 +1,251 @@
+"""
+Benchmark Data Generator
+Seeds the configured database (DB_* from .env) with a deterministic store:
+users with addresses and carts, a two-level category tree, products and
+variants, and years of orders with items, payments and deliveries. The same
+--seed and scale always produce the same rows.
+
+Seeded rows use ids from SEED_ID_BASE up, next to the sample data, and
+orders the load test places for seeded users land above them too, so
+--reset removes every trace of a previous run. Afterwards the rollup tables
+(customer_stats, sales_daily_*, customer sketches) are rebuilt.
+
+Against the local MySQL container (docker compose up -d mysql, DB_PORT=3307):
+    python bench/seed_data.py --users 2000 --products 400 --orders 60000 --years 3 --reset
+
+Seed with the API stopped: the stock and catalog caches load at startup.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import bcrypt
+import mysql.connector
+
+sys.path.insert(0, '.')
+
+from app.database import DB_CONFIG
+
+SEED_ID_BASE = 1_000_000
+BENCH_PASSWORD = "bench-password"
+# Fixed salt so the password hashes are reproducible too
+BENCH_SALT = b"$2b$04$BrightBuyBenchmarkSeeu"
+BATCH_ROWS = 5000
+
+ROOT_CATEGORIES = ["Phones", "Laptops", "Audio", "Wearables", "Cameras", "Gaming", "Home", "Accessories"]
+VARIANT_NAMES = ["64GB Black", "128GB Silver", "256GB Blue", "Small", "Medium", "Large", "Standard", "Pro"]
+PAYMENT_METHODS = ["card", "cod"]
+
+
+def admin_user_id(users: int) -> int:
+    return SEED_ID_BASE + users
+
+
+def user_ids(users: int) -> range:
+    return range(SEED_ID_BASE, SEED_ID_BASE + users)
+
+
+def insert_rows(cursor, conn, table: str, columns: list, rows: list) -> int:
+    if not rows:
+        return 0
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    for start in range(0, len(rows), BATCH_ROWS):
+        cursor.executemany(sql, rows[start:start + BATCH_ROWS])
+        conn.commit()
+    return len(rows)
+
+
+def reset(cursor, conn):
+    """Delete the rows of a previous seed, children first"""
+    base = SEED_ID_BASE
+    statements = [
+        ("order_item", "order_id >= %s"),
+        ("payment", "order_id >= %s"),
+        ("delivery", "order_id >= %s"),
+        ("card", "order_id >= %s"),
+        ("orders", "order_id >= %s OR user_id >= %s"),
+        ("cart_item", "cart_id >= %s"),
+        ("cart", "cart_id >= %s OR user_id >= %s"),
+        ("favorite_product", "user_id >= %s"),
+        ("customer_stats", "user_id >= %s"),
+        ("user", "user_id >= %s"),
+        ("address", "address_id >= %s"),
+        ("variant", "variant_id >= %s"),
+        ("product", "product_id >= %s"),
+        ("category", "parent_category_id >= %s"),
+        ("category", "category_id >= %s"),
+    ]
+    for table, where in statements:
+        cursor.execute(f"DELETE FROM {table} WHERE {where}", (base,) * where.count("%s"))
+        if cursor.rowcount:
+            print(f"  removed {cursor.rowcount} rows from {table}")
+    conn.commit()
+
+
+def generate(args) -> dict:
+    """Every seeded row, by table, in insert order"""
+    rng = random.Random(args.seed)
+    base = SEED_ID_BASE
+    end = datetime.combine(args.end_date, datetime.min.time())
+    start = end - timedelta(days=365 * args.years)
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), BENCH_SALT).decode('utf-8')
+
+    tables = {}
+
+    categories = []
+    leaves = []
+    for i, name in enumerate(ROOT_CATEGORIES[:args.categories]):
+        root_id = base + i * 100
+        categories.append((root_id, f"Bench {name}", None))
+        for j in range(args.subcategories):
+            leaf_id = root_id + j + 1
+            categories.append((leaf_id, f"Bench {name} {j + 1}", root_id))
+            leaves.append(leaf_id)
+    tables["category"] = (["category_id", "category_name", "parent_category_id"], categories)
+
+    products, variants = [], []
+    variant_prices = {}
+    for i in range(args.products):
+        product_id = base + i
+        products.append((product_id, f"Bench product {i}", rng.choice(leaves), f"Benchmark product number {i}"))
+        for j in range(args.variants):
+            variant_id = base + i * args.variants + j
+            price = Decimal(rng.randrange(500, 250000)) / 100
+            variant_prices[variant_id] = price
+            variants.append((variant_id, VARIANT_NAMES[j % len(VARIANT_NAMES)], product_id, price,
+                             rng.randrange(200, 5000), f"BENCH-{variant_id}"))
+    tables["product"] = (["product_id", "product_name", "category_id", "description"], products)
+    tables["variant"] = (["variant_id", "variant_name", "product_id", "price", "quantity", "SKU"], variants)
+    variant_ids = list(variant_prices)
+
+    addresses, users, carts, cart_items = [], [], [], []
+    for i, user_id in enumerate(list(user_ids(args.users)) + [admin_user_id(args.users)]):
+        city_id, city = rng.choice(args.cities)
+        addresses.append((user_id, city_id, rng.randrange(1, 999), f"{rng.randrange(1, 300)} Bench Street", city, "TX"))
+        is_admin = user_id == admin_user_id(args.users)
+        name = "bench_admin" if is_admin else f"bench_user{i}"
+        users.append((user_id, name, f"{name}@example.com", f"Bench User {i}", password_hash,
+                      "admin" if is_admin else "customer", user_id))
+        carts.append((user_id, user_id, start, Decimal("0.00")))
+    tables["address"] = (["address_id", "city_id", "house_number", "street", "city", "state"], addresses)
+    tables["user"] = (["user_id", "user_name", "email", "name", "password_hash", "user_type", "address_id"], users)
+    tables["cart"] = (["cart_id", "user_id", "created_date", "total_amount"], carts)
+
+    # A quarter of the customers have something in their cart
+    cart_item_id = base
+    for user_id in user_ids(args.users):
+        if rng.random() < 0.25:
+            for variant_id in rng.sample(variant_ids, rng.randrange(1, 4)):
+                cart_items.append((cart_item_id, user_id, variant_id, rng.randrange(1, 3)))
+                cart_item_id += 1
+    tables["cart_item"] = (["cart_item_id", "cart_id", "variant_id", "quantity"], cart_items)
+
+    orders, order_items, payments, deliveries = [], [], [], []
+    span = int((end - start).total_seconds())
+    # Skewed towards recent days
+    order_dates = sorted(start + timedelta(seconds=int(span * rng.random() ** 0.7)) for _ in range(args.orders))
+    order_item_id = base
+    for n, order_date in enumerate(order_dates):
+        order_id = base + n
+        if rng.random() < 0.4:
+            # Repeat customers: the lowest ids order far more often
+            user_id = base + min(int(rng.paretovariate(1.2)) - 1, args.users - 1)
+        else:
+            user_id = rng.choice(user_ids(args.users))
+        total = Decimal("0.00")
+        for variant_id in rng.sample(variant_ids, rng.randrange(1, 5)):
+            quantity = rng.randrange(1, 4)
+            price = variant_prices[variant_id]
+            order_items.append((order_item_id, order_id, variant_id, quantity, price))
+            order_item_id += 1
+            total += price * quantity
+        orders.append((order_id, user_id, user_id, order_date, total))
+
+        method = rng.choice(PAYMENT_METHODS)
+        age = end - order_date
+        payments.append((order_id, order_id, method, "completed" if method == "card" or age.days > 7 else "pending",
+                         order_date))
+        home = rng.random() < 0.7
+        status = "Delivered" if age.days > 10 else rng.choice(["Pending", "Shipped"])
+        deliveries.append((order_id, order_id, "home_delivery" if home else "store_pickup", user_id if home else None,
+                           (order_date + timedelta(days=rng.randrange(2, 10))).date(), status))
+    tables["orders"] = (["order_id", "cart_id", "user_id", "order_date", "total_amount"], orders)
+    tables["order_item"] = (["order_item_id", "order_id", "variant_id", "quantity", "price"], order_items)
+    tables["payment"] = (["payment_id", "order_id", "payment_method", "payment_status", "payment_date"], payments)
+    tables["delivery"] = (["delivery_id", "order_id", "delivery_method", "address_id", "estimated_delivery_date",
+                           "delivery_status"], deliveries)
+    return tables
+
+
+def rebuild_rollups(cursor, conn):
+    """Re-run the rollup backfills over the seeded orders"""
+    sys.path.insert(0, 'database')
+    from install_objects import DATABASE_DIR, parse_file
+    from app.services import customer_sketches
+
+    for name in ("customer_stats.sql", "sales_facts.sql"):
+        for obj in parse_file(DATABASE_DIR / name):
+            for statement in obj.statements:
+                if not statement.upper().startswith("CREATE TABLE"):
+                    cursor.execute(statement)
+        conn.commit()
+        print(f"  rebuilt {name}")
+    sketch_cursor = conn.cursor(dictionary=True)
+    days = customer_sketches.rebuild(sketch_cursor)
+    sketch_cursor.close()
+    conn.commit()
+    print(f"  rebuilt {days} daily customer sketches")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a deterministic benchmark dataset")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=6, help=f"root categories (max {len(ROOT_CATEGORIES)})")
+    parser.add_argument("--subcategories", type=int, default=4, help="children per root category")
+    parser.add_argument("--products", type=int, default=400)
+    parser.add_argument("--variants", type=int, default=3, help="variants per product")
+    parser.add_argument("--orders", type=int, default=60000)
+    parser.add_argument("--years", type=int, default=3, help="order history length")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="last order day (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="remove a previous seed first")
+    parser.add_argument("--skip-rollups", action="store_true", help="do not rebuild the rollup tables")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**dict(DB_CONFIG, raise_on_warnings=False))
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT city_id, city FROM location ORDER BY city_id")
+        args.cities = cursor.fetchall()
+        if not args.cities:
+            print("❌ The location table is empty; load docker-entrypoint/01-init.sql first")
+            sys.exit(1)
+        if args.reset:
+            print("Removing the previous seed...")
+            reset(cursor, conn)
+
+        started = time.perf_counter()
+        tables = generate(args)
+        print(f"Generated in {time.perf_counter() - started:.1f}s, inserting...")
+        for table, (columns, rows) in tables.items():
+            table_started = time.perf_counter()
+            count = insert_rows(cursor, conn, f"`{table}`", columns, rows)
+            print(f"  {table:<12} {count:>9} rows  {time.perf_counter() - table_started:6.1f}s")
+        if not args.skip_rollups:
+            rebuild_rollups(cursor, conn)
+        print(f"✅ Seeded in {time.perf_counter() - started:.1f}s: users {SEED_ID_BASE}..{SEED_ID_BASE + args.users - 1}, "
+              f"admin {admin_user_id(args.users)} ({BENCH_PASSWORD!r})")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print(f"❌ Database error: {err}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+-- ============================================
+-- BrightBuy Admin Two-Factor Authentication
+-- One-time verification codes emailed to admins at login
+-- (app/routes/auth.py); a code expires after a few minutes and is
+-- locked after too many attempts.
+-- ============================================
+
+USE `brightbuy`;
+
+CREATE TABLE IF NOT EXISTS admin_verification_codes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    verification_code VARCHAR(6) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    is_used BOOLEAN DEFAULT FALSE,
+    attempts INT DEFAULT 0,
+
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE,
+
+    INDEX idx_user_code (user_id, verification_code),
+    INDEX idx_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
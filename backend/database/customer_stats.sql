@@ -0,0 +1,51 @@
+-- ============================================
+-- BrightBuy Customer Statistics
+-- Per-customer aggregates kept up to date by the API at checkout and on
+-- payment/delivery status changes (app/services/customer_stats.py).
+-- Customer reports read this table instead of the
+-- customer_summary_statistics view.
+-- ============================================
+
+USE `brightbuy`;
+
+CREATE TABLE IF NOT EXISTS customer_stats (
+    user_id INT NOT NULL PRIMARY KEY,
+    total_orders INT NOT NULL DEFAULT 0,
+    total_spent DECIMAL(14,2) NOT NULL DEFAULT 0,
+    first_order_date DATETIME NULL,
+    last_order_date DATETIME NULL,
+    completed_payments INT NOT NULL DEFAULT 0,
+    pending_payments INT NOT NULL DEFAULT 0,
+    delivered_orders INT NOT NULL DEFAULT 0,
+    pending_deliveries INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE,
+
+    -- All-customers report: top N by total spent
+    INDEX idx_total_spent (total_spent)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+-- ============================================
+-- Backfill / rebuild from the existing orders
+-- Safe to re-run; run it with the API stopped so no checkout lands mid-rebuild
+-- ============================================
+REPLACE INTO customer_stats (
+    user_id, total_orders, total_spent, first_order_date, last_order_date,
+    completed_payments, pending_payments, delivered_orders, pending_deliveries
+)
+SELECT
+    o.user_id,
+    COUNT(DISTINCT o.order_id),
+    COALESCE(SUM(o.total_amount), 0),
+    MIN(o.order_date),
+    MAX(o.order_date),
+    SUM(CASE WHEN p.payment_status = 'completed' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN p.payment_status = 'pending' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN d.delivery_status = 'delivered' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN d.delivery_status = 'pending' THEN 1 ELSE 0 END)
+FROM orders o
+LEFT JOIN payment p ON o.order_id = p.order_id
+LEFT JOIN delivery d ON o.order_id = d.order_id
+GROUP BY o.user_id;
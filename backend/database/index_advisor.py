@@ -0,0 +1,306 @@
+"""
+Index Advisor
+Runs EXPLAIN on the SQL the API issues and flags the plans that read a whole
+table or sort without an index. Point it at a seeded database (realistic row
+counts matter: on a near-empty table MySQL scans whatever indexes exist).
+
+Statements come from:
+
+  app/**/*.py    every cursor.execute() whose SQL is a literal, a module
+                 level constant (from any app module) plus a literal, or an
+                 f-string whose only interpolation is an IN (%s, ...) list
+  database/      the statements inside the stored procedures and
+                 functions, and a SELECT * from each view
+
+Placeholders and routine parameters are replaced by '1' (1 after LIMIT and
+OFFSET), which keeps string and integer comparisons sargable.
+
+    python database/index_advisor.py                  # report flagged plans
+    python database/index_advisor.py --all --json     # every plan as JSON
+    python database/index_advisor.py --check          # hot queries only, exit 1 on a regression
+
+--check runs HOT_QUERIES, the statements behind the busiest routes (read
+from the route code), and fails when any of them falls back to a table scan
+or a filesort, or can no longer be found. The
+indexes that keep them off scans are in database/indexes/.
+"""
+import argparse
+import ast
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import mysql.connector
+
+# Add project root to path
+repo_root = Path(__file__).resolve().parents[1]
+if str(repo_root) not in sys.path:
+    sys.path.insert(0, str(repo_root))
+
+from app.db_config import DB_CONFIG
+from install_objects import load_objects
+
+APP_DIR = repo_root / "app"
+
+# name, the module issuing it, a fragment that picks the statement out of
+# that module's execute() calls, the table whose access is checked. The SQL
+# itself is taken from the call site, so the check follows route changes.
+HOT_QUERIES = [
+    ("login by email or user name", "app/routes/auth.py", "FROM user WHERE email = %s OR user_name = %s", "user"),
+    ("cart of user", "app/routes/cart.py", "SELECT cart_id FROM cart WHERE user_id = %s", "cart"),
+    ("cart line for variant", "app/routes/cart.py", "FROM cart_item WHERE cart_id = %s AND variant_id = %s",
+     "cart_item"),
+    ("cart lines at checkout", "app/routes/order.py", "FROM cart_item ci JOIN variant v", "ci"),
+    ("variants of product", "app/routes/product.py", "FROM variant WHERE product_id = %s", "variant"),
+    ("items of order", "app/routes/order.py", "FROM order_item oi JOIN variant v", "oi"),
+    ("orders containing variant", "app/routes/admin.py", "FROM order_item WHERE variant_id = %s", "order_item"),
+    ("order history", "app/routes/order.py", "FROM orders WHERE user_id = %s ORDER BY order_date DESC", "orders"),
+    ("orders in date range", "app/routes/analytics.py", "FROM orders WHERE order_date >= %s", "orders"),
+    ("delivery of order", "app/routes/analytics.py", "FROM delivery WHERE order_id = %s", "delivery"),
+    ("payment of order", "app/routes/admin.py", "FROM payment WHERE order_id = %s", "payment"),
+]
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+_IN_LIST = re.compile(r"""^', '\.join\(\[?['"]%s['"]\]? \* len\(""")
+_LIMIT_PLACEHOLDER = re.compile(r"\b(LIMIT|OFFSET)\s+%s", re.IGNORECASE)
+_ROUTINE_PARAMETER = re.compile(r"\b(?:IN|OUT|INOUT)\s+(\w+)\s", re.IGNORECASE)
+_FUNCTION_PARAMETER = re.compile(r"[(,]\s*(\w+)\s+(?:INT|DECIMAL|VARCHAR|DATE|DATETIME|TEXT|BOOLEAN|CHAR)\b", re.IGNORECASE)
+_DECLARED = re.compile(r"\bDECLARE\s+(\w+)\s", re.IGNORECASE)
+_NESTED_STATEMENT = re.compile(r"\b(?:THEN|ELSE)\s+((?:SELECT|UPDATE|DELETE|WITH)\b.*)", re.IGNORECASE | re.DOTALL)
+_SELECT_INTO = re.compile(r"\bINTO\s+\w+(?:\s*,\s*\w+)*\s+(?=FROM\b)", re.IGNORECASE)
+
+
+def bind_placeholders(sql: str) -> str:
+    """Literal SQL for EXPLAIN, with %s placeholders filled in"""
+    sql = _LIMIT_PLACEHOLDER.sub(r"\1 1", sql)
+    return sql.replace("%s", "'1'").replace("%%", "%")
+
+
+# ----------------------------------------------------------------------
+# Statement collection
+# ----------------------------------------------------------------------
+
+def _module_constants(tree: ast.Module) -> Dict[str, str]:
+    constants = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            constants[node.targets[0].id] = node.value.value
+    return constants
+
+
+def _static_sql(node: ast.AST, constants: Dict[str, str]) -> Optional[str]:
+    """SQL text of an execute() argument when it can be known without running the code"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _static_sql(node.left, constants), _static_sql(node.right, constants)
+        return left + right if left is not None and right is not None else None
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            elif isinstance(value, ast.FormattedValue) and _IN_LIST.match(ast.unparse(value.value)):
+                parts.append("%s")
+            else:
+                return None
+        return "".join(parts)
+    return None
+
+
+def collect_app_statements(app_dir: Path = APP_DIR) -> List[dict]:
+    trees = {path: ast.parse(path.read_text(encoding="utf-8-sig")) for path in sorted(app_dir.rglob("*.py"))}
+    # SQL constants are shared between modules (customer_stats -> report_rendering)
+    shared: Dict[str, str] = {}
+    for tree in trees.values():
+        shared.update(_module_constants(tree))
+
+    statements = []
+    for path, tree in trees.items():
+        constants = dict(shared, **_module_constants(tree))
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr == "execute" and node.args):
+                continue
+            source = f"{path.relative_to(repo_root).as_posix()}:{node.lineno}"
+            sql = _static_sql(node.args[0], constants)
+            if sql is None:
+                statements.append({"source": source, "sql": None})
+            elif sql.lstrip().upper().startswith(EXPLAINABLE):
+                statements.append({"source": source, "sql": bind_placeholders(sql.strip())})
+    return statements
+
+
+def _routine_body_statements(definition: str) -> List[str]:
+    header, _, body = definition.partition("BEGIN")
+    names = set(_ROUTINE_PARAMETER.findall(header)) | set(_FUNCTION_PARAMETER.findall(header))
+    names |= set(_DECLARED.findall(body))
+    statements = []
+    for chunk in body.rsplit("END", 1)[0].split(";"):
+        chunk = "\n".join(line for line in chunk.splitlines() if not line.strip().startswith("--")).strip()
+        if not chunk.upper().startswith(EXPLAINABLE):
+            # A statement nested in IF ... THEN starts after the THEN
+            nested = _NESTED_STATEMENT.search(chunk)
+            if not nested:
+                continue
+            chunk = nested.group(1)
+        chunk = _SELECT_INTO.sub("", chunk)
+        for name in sorted(names, key=len, reverse=True):
+            chunk = re.sub(rf"\b(LIMIT|OFFSET)\s+{name}\b", r"\1 1", chunk, flags=re.IGNORECASE)
+            chunk = re.sub(rf"(?<![.\w`]){name}\b", "'1'", chunk)
+        statements.append(chunk)
+    return statements
+
+
+def collect_routine_statements() -> List[dict]:
+    statements = []
+    for obj in load_objects():
+        source = f"database/{obj.source_file} {obj.object_type} {obj.name}"
+        if obj.object_type in ("function", "procedure"):
+            for sql in _routine_body_statements(obj.statements[0]):
+                statements.append({"source": source, "sql": sql})
+        elif obj.object_type == "view":
+            statements.append({"source": source, "sql": f"SELECT * FROM `{obj.name}`"})
+    return statements
+
+
+# ----------------------------------------------------------------------
+# EXPLAIN
+# ----------------------------------------------------------------------
+
+def plan_problems(plan: List[dict], min_rows: int = 0, table: Optional[str] = None) -> List[str]:
+    """Full scans, full index scans, filesorts and temporary tables in an EXPLAIN result"""
+    problems = []
+    for row in plan:
+        name = row.get("table") or ""
+        if name.startswith("<") or (table and name != table):
+            continue
+        rows = row.get("rows") or 0
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL" and rows >= min_rows:
+            problems.append(f"full scan of {name} ({rows} rows)")
+        elif row.get("type") == "index" and rows >= min_rows:
+            problems.append(f"full index scan of {name} ({rows} rows)")
+        if "Using filesort" in extra:
+            problems.append(f"filesort on {name}")
+        if "Using temporary" in extra and not table:
+            problems.append(f"temporary table for {name}")
+    return problems
+
+
+def explain(cursor, sql: str) -> List[dict]:
+    cursor.execute(f"EXPLAIN {sql}")
+    return cursor.fetchall()
+
+
+def advise(cursor, statements: List[dict], min_rows: int) -> List[dict]:
+    results = []
+    for statement in statements:
+        result = dict(statement)
+        if statement["sql"] is None:
+            result["status"] = "dynamic"
+        else:
+            try:
+                plan = explain(cursor, statement["sql"])
+            except mysql.connector.Error as err:
+                result["status"] = "error"
+                result["error"] = str(err)
+            else:
+                result["plan"] = [
+                    {k: row.get(k) for k in ("table", "type", "possible_keys", "key", "rows", "Extra")} for row in plan
+                ]
+                result["problems"] = plan_problems(plan, min_rows)
+                result["status"] = "flagged" if result["problems"] else "ok"
+        results.append(result)
+    return results
+
+
+def hot_query_statements(statements: Optional[List[dict]] = None) -> List[dict]:
+    """
+    The HOT_QUERIES as the app issues them: the first statement of each
+    entry's module containing its fragment (sql is None when none does)
+    """
+    if statements is None:
+        statements = collect_app_statements()
+    resolved = []
+    for name, module, fragment, table in HOT_QUERIES:
+        fragment = bind_placeholders(fragment)
+        match = next(
+            (s for s in statements
+             if s["sql"] and s["source"].startswith(f"{module}:") and fragment in " ".join(s["sql"].split())),
+            None
+        )
+        resolved.append({
+            "query": name,
+            "source": match["source"] if match else module,
+            "sql": match["sql"] if match else None,
+            "table": table,
+        })
+    return resolved
+
+
+def check_hot_queries(cursor, statements: Optional[List[dict]] = None) -> List[dict]:
+    failures = []
+    for hot in hot_query_statements(statements):
+        if hot["sql"] is None:
+            problems = [f"no statement in {hot['source']} matches any more"]
+            access = "-"
+        else:
+            plan = explain(cursor, hot["sql"])
+            problems = plan_problems(plan, table=hot["table"])
+            access = ", ".join(f"{row['table']}:{row['type']}/{row['key'] or '-'}" for row in plan)
+        status = "FAIL" if problems else "ok"
+        print(f"  {status:<4} {hot['query']:<28} {access}" + (f"  -- {'; '.join(problems)}" if problems else ""))
+        if problems:
+            failures.append({"query": hot["query"], "source": hot["source"], "problems": problems})
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the API's SQL and flag scans and filesorts")
+    parser.add_argument("--check", action="store_true", help="check the hot queries only; exit 1 on a regression")
+    parser.add_argument("--all", action="store_true", help="list every statement, not just the flagged ones")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--min-rows", type=int, default=100,
+                        help="ignore scans of tables estimated below this many rows (report mode)")
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(**dict(DB_CONFIG, raise_on_warnings=False))
+    cursor = connection.cursor(dictionary=True)
+    try:
+        if args.check:
+            print("Hot query plans:")
+            failures = check_hot_queries(cursor)
+            if failures:
+                print(f"❌ {len(failures)} of {len(HOT_QUERIES)} hot queries scan or sort without an index")
+                sys.exit(1)
+            print(f"✅ All {len(HOT_QUERIES)} hot queries use an index")
+            return
+
+        results = advise(cursor, collect_app_statements() + collect_routine_statements(), args.min_rows)
+    finally:
+        cursor.close()
+        connection.close()
+
+    shown = results if args.all else [r for r in results if r["status"] in ("flagged", "error")]
+    if args.json:
+        print(json.dumps(shown, indent=2, default=str))
+        return
+    for result in shown:
+        print(f"[{result['status']}] {result['source']}")
+        for problem in result.get("problems", []):
+            print(f"    {problem}")
+        if result.get("error"):
+            print(f"    {result['error']}")
+    counts = {status: sum(r["status"] == status for r in results) for status in ("ok", "flagged", "error", "dynamic")}
+    print(f"\n{len(results)} statements: {counts['ok']} ok, {counts['flagged']} flagged, "
+          f"{counts['error']} not explainable, {counts['dynamic']} built at runtime (skipped)")
+
+
+if __name__ == "__main__":
+    main()
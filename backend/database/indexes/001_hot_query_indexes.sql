@@ -0,0 +1,36 @@
+-- ============================================
+-- BrightBuy Hot Query Indexes
+-- Indexes for the query shapes database/index_advisor.py flagged as full
+-- scans or filesorts. Verify with
+--   python database/index_advisor.py --check
+--
+-- user       login looks a user up by email OR user_name; one index per
+--            column lets MySQL answer it with an index-merge union
+-- orders     order history is WHERE user_id = ? ORDER BY order_date DESC;
+--            (user_id, order_date) serves both and replaces the
+--            single-column user_id key (the foreign key uses the new one).
+--            order_date alone serves the date-range reports
+-- cart_item  add-to-cart looks for the variant's row in the cart;
+--            (cart_id, variant_id) replaces the single-column cart_id key
+--
+-- cart.user_id, variant.product_id, order_item.order_id / variant_id,
+-- delivery.order_id and payment.order_id are already indexed by their
+-- foreign keys.
+-- ============================================
+
+USE `brightbuy`;
+
+ALTER TABLE user
+    ADD INDEX idx_email (email),
+    ADD INDEX idx_user_name (user_name);
+
+ALTER TABLE orders
+    ADD INDEX idx_user_date (user_id, order_date),
+    DROP INDEX user_id;
+
+ALTER TABLE orders
+    ADD INDEX idx_order_date (order_date);
+
+ALTER TABLE cart_item
+    ADD INDEX idx_cart_variant (cart_id, variant_id),
+    DROP INDEX cart_item_ibfk_1;
@@ -0,0 +1,310 @@
+"""
+Install Database Objects
+Single installer for everything the SQL files under database/ define: the
+API's own tables (with their backfills), functions, stored procedures,
+triggers and views.
+
+Every file is parsed once into objects:
+
+  function / procedure / trigger / view   one CREATE statement each
+  script                                  the rest of a file (CREATE TABLE
+                                          IF NOT EXISTS plus backfills),
+                                          named after the file
+
+Each object is hashed and compared with the schema_objects table; only new
+or changed objects, and objects that have gone missing from the database,
+are applied, over one connection. With nothing to do a deploy costs three
+small queries.
+
+    python database/install_objects.py            # apply what changed
+    python database/install_objects.py --check    # list pending, exit 1 if any
+    python database/install_objects.py --force    # re-apply everything
+
+A changed script re-runs as a whole: CREATE TABLE IF NOT EXISTS leaves an
+existing table as it is (column changes still need an ALTER) and the
+backfills rebuild the counters, so run it with the API stopped.
+"""
+import argparse
+import hashlib
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import mysql.connector
+
+# Add project root to path
+repo_root = Path(__file__).resolve().parents[1]
+if str(repo_root) not in sys.path:
+    sys.path.insert(0, str(repo_root))
+
+from app.db_config import DB_CONFIG
+from app.services.db_restore import split_statements
+
+DATABASE_DIR = Path(__file__).resolve().parent
+
+# Install order: tables first, then the functions the procedures and views use
+OBJECT_FILES = [
+    "admin_2fa.sql",
+    "customer_stats.sql",
+    "sales_facts.sql",
+    "inventory_alerts.sql",
+    "indexes/*.sql",
+    "mysql_functions.sql",
+    "new_stored_procedures.sql",
+    "triggers/*.sql",
+    "views/*.sql",
+]
+
+_DEFINED_OBJECT = re.compile(
+    r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?"
+    r"(FUNCTION|PROCEDURE|TRIGGER|VIEW)\s+`?(\w+)`?",
+    re.IGNORECASE
+)
+_DEFINER = re.compile(r"^(CREATE\s+(?:OR\s+REPLACE\s+)?)DEFINER\s*=\s*\S+\s+", re.IGNORECASE)
+_DROP_OBJECT = re.compile(r"^DROP\s+(FUNCTION|PROCEDURE|TRIGGER|VIEW)\s+IF\s+EXISTS\b", re.IGNORECASE)
+_CREATE_TABLE = re.compile(r"^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?", re.IGNORECASE)
+
+# MySQL has no IF [NOT] EXISTS for indexes: index ALTERs are checked against
+# information_schema.STATISTICS clause by clause instead
+_ALTER_TABLE = re.compile(r"^ALTER\s+TABLE\s+`?(\w+)`?\s+(.*)$", re.IGNORECASE | re.DOTALL)
+_INDEX_CLAUSE = re.compile(r"^(ADD|DROP)\s+(?:UNIQUE\s+)?(?:INDEX|KEY)\s+`?(\w+)`?", re.IGNORECASE)
+
+SCHEMA_OBJECTS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_objects (
+    object_type VARCHAR(20) NOT NULL,
+    object_name VARCHAR(128) NOT NULL,
+    source_file VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (object_type, object_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+class SchemaObject:
+    def __init__(self, object_type: str, name: str, source_file: str):
+        self.object_type = object_type
+        self.name = name
+        self.source_file = source_file
+        self.statements: List[str] = []
+        self.tables: List[str] = []
+
+    @property
+    def key(self):
+        return (self.object_type, self.name.lower())
+
+    @property
+    def checksum(self) -> str:
+        # Whitespace-only edits do not count as a change
+        normalized = '\n'.join(' '.join(statement.split()) for statement in self.statements)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def parse_file(path: Path) -> List[SchemaObject]:
+    """Objects defined by one SQL file, in file order"""
+    source_file = path.relative_to(DATABASE_DIR).as_posix()
+    objects: List[SchemaObject] = []
+    script: Optional[SchemaObject] = None
+    for statement in split_statements(path.read_text(encoding='utf-8')):
+        if statement.upper().startswith('USE ') or _DROP_OBJECT.match(statement):
+            # The installer connects to DB_NAME and drops before creating
+            continue
+        defined = _DEFINED_OBJECT.match(statement)
+        if defined:
+            obj = SchemaObject(defined.group(1).lower(), defined.group(2), source_file)
+            # Objects are owned by the installing user, as in docker-entrypoint/01-init.sql
+            obj.statements.append(_DEFINER.sub(r"\1", statement))
+            objects.append(obj)
+            continue
+        if script is None:
+            script = SchemaObject('script', source_file, source_file)
+            objects.append(script)
+        table = _CREATE_TABLE.match(statement)
+        if table:
+            script.tables.append(table.group(1))
+        script.statements.append(statement)
+    return objects
+
+
+def load_objects(patterns: List[str] = OBJECT_FILES) -> List[SchemaObject]:
+    objects: List[SchemaObject] = []
+    seen: Dict[tuple, SchemaObject] = {}
+    for pattern in patterns:
+        paths = sorted(DATABASE_DIR.glob(pattern))
+        if not paths:
+            raise FileNotFoundError(f"No SQL file matches database/{pattern}")
+        for path in paths:
+            for obj in parse_file(path):
+                if obj.key in seen:
+                    raise ValueError(
+                        f"{obj.object_type} {obj.name} is defined in both "
+                        f"{seen[obj.key].source_file} and {obj.source_file}"
+                    )
+                seen[obj.key] = obj
+                objects.append(obj)
+    return objects
+
+
+def existing_objects(cursor) -> set:
+    """(type, lower name) of the routines, triggers, views and tables in the database"""
+    cursor.execute(
+        """SELECT LOWER(ROUTINE_TYPE), LOWER(ROUTINE_NAME) FROM information_schema.ROUTINES
+           WHERE ROUTINE_SCHEMA = DATABASE()
+           UNION ALL
+           SELECT 'trigger', LOWER(TRIGGER_NAME) FROM information_schema.TRIGGERS
+           WHERE TRIGGER_SCHEMA = DATABASE()
+           UNION ALL
+           SELECT IF(TABLE_TYPE = 'VIEW', 'view', 'table'), LOWER(TABLE_NAME) FROM information_schema.TABLES
+           WHERE TABLE_SCHEMA = DATABASE()"""
+    )
+    return {(object_type, name) for object_type, name in cursor.fetchall()}
+
+
+def pending_objects(cursor, objects: List[SchemaObject], force: bool = False) -> List[SchemaObject]:
+    cursor.execute(SCHEMA_OBJECTS_TABLE)
+    cursor.execute("SELECT object_type, LOWER(object_name), checksum FROM schema_objects")
+    applied = {(object_type, name): checksum for object_type, name, checksum in cursor.fetchall()}
+    if force:
+        return list(objects)
+
+    changed = [obj for obj in objects if applied.get(obj.key) != obj.checksum]
+    if len(changed) == len(objects):
+        return changed
+    # Recorded as current but dropped by hand since
+    existing = existing_objects(cursor)
+    changed_keys = {obj.key for obj in changed}
+    for obj in objects:
+        if obj.key in changed_keys:
+            continue
+        if obj.object_type == 'script':
+            missing = any(('table', table.lower()) not in existing for table in obj.tables)
+        else:
+            missing = obj.key not in existing
+        if missing:
+            changed.append(obj)
+    order = {id(obj): i for i, obj in enumerate(objects)}
+    return sorted(changed, key=lambda obj: order[id(obj)])
+
+
+def _split_clauses(body: str) -> List[str]:
+    """ALTER TABLE clauses, split on the commas outside parentheses"""
+    clauses, depth, start = [], 0, 0
+    for i, char in enumerate(body):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            clauses.append(body[start:i].strip())
+            start = i + 1
+    clauses.append(body[start:].strip())
+    return clauses
+
+
+def pending_index_alter(cursor, statement: str) -> Optional[str]:
+    """
+    An ALTER TABLE made only of ADD INDEX / DROP INDEX clauses, reduced to
+    the clauses the table still needs (None when it needs none). Any other
+    statement is returned unchanged. The remaining clauses stay one
+    statement, so an ADD that a DROP relies on (a foreign key moving to
+    the new index) is applied with it or not at all.
+    """
+    alter = _ALTER_TABLE.match(statement)
+    if not alter:
+        return statement
+    table, body = alter.groups()
+    clauses = _split_clauses(body)
+    parsed = [_INDEX_CLAUSE.match(clause) for clause in clauses]
+    if not all(parsed):
+        return statement
+
+    cursor.execute(
+        """SELECT DISTINCT LOWER(INDEX_NAME) FROM information_schema.STATISTICS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s""",
+        (table,)
+    )
+    existing = {name for (name,) in cursor.fetchall()}
+    remaining = []
+    for clause, match in zip(clauses, parsed):
+        action, index = match.group(1).upper(), match.group(2).lower()
+        if (action == 'ADD') == (index in existing):
+            print(f"  skipped on {table}: {' '.join(clause.split())} (already applied)")
+        else:
+            remaining.append(clause)
+    if not remaining:
+        return None
+    return f"ALTER TABLE `{table}`\n    " + ",\n    ".join(remaining)
+
+
+def apply_object(cursor, obj: SchemaObject):
+    if obj.object_type != 'script':
+        cursor.execute(f"DROP {obj.object_type.upper()} IF EXISTS `{obj.name}`")
+    for statement in obj.statements:
+        if obj.object_type == 'script':
+            # Index migrations on a database that already has them
+            # (docker-entrypoint/01-init.sql creates them up front)
+            statement = pending_index_alter(cursor, statement)
+            if statement is None:
+                continue
+        cursor.execute(statement)
+    cursor.execute(
+        """INSERT INTO schema_objects (object_type, object_name, source_file, checksum)
+           VALUES (%s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE source_file = %s, checksum = %s""",
+        (obj.object_type, obj.name, obj.source_file, obj.checksum, obj.source_file, obj.checksum)
+    )
+
+
+def install_objects(check: bool = False, force: bool = False) -> int:
+    """Apply the pending objects; returns how many were (or, with check, would be) applied"""
+    started = time.perf_counter()
+    objects = load_objects()
+
+    # IF [NOT] EXISTS notes are expected here
+    connection = mysql.connector.connect(**dict(DB_CONFIG, raise_on_warnings=False, autocommit=False))
+    cursor = connection.cursor()
+    try:
+        pending = pending_objects(cursor, objects, force)
+        if not pending:
+            print(f"✅ All {len(objects)} database objects are current ({time.perf_counter() - started:.2f}s)")
+            return 0
+        if check:
+            for obj in pending:
+                print(f"  pending: {obj.object_type} {obj.name} ({obj.source_file})")
+            print(f"{len(pending)} of {len(objects)} database objects need applying")
+            return len(pending)
+
+        for obj in pending:
+            # DDL commits implicitly in MySQL, so the version row is committed
+            # with each object and a failed run resumes where it stopped
+            apply_object(cursor, obj)
+            connection.commit()
+            print(f"  applied: {obj.object_type} {obj.name} ({obj.source_file})")
+        print(f"✅ Applied {len(pending)} of {len(objects)} database objects ({time.perf_counter() - started:.2f}s)")
+        return len(pending)
+    except mysql.connector.Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Install the database objects defined under database/")
+    parser.add_argument("--check", action="store_true", help="list pending objects and exit 1 if there are any")
+    parser.add_argument("--force", action="store_true", help="re-apply every object")
+    args = parser.parse_args()
+    try:
+        pending = install_objects(check=args.check, force=args.force)
+    except (mysql.connector.Error, FileNotFoundError, ValueError) as err:
+        print(f"❌ {err}")
+        sys.exit(2)
+    if args.check and pending:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+-- ============================================
+-- BrightBuy Inventory Alerts
+-- Admin subscriptions to low-stock alerts and the email outbox the alert
+-- worker delivers from (app/services/inventory_alerts.py,
+-- app/services/email_outbox.py)
+-- ============================================
+
+USE `brightbuy`;
+
+CREATE TABLE IF NOT EXISTS inventory_alert_subscriptions (
+    subscription_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    -- Least severe level that triggers an email: LOW, CRITICAL or OUT OF STOCK
+    min_level VARCHAR(20) NOT NULL DEFAULT 'CRITICAL',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_user (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    email_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    to_email VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    text_body TEXT NOT NULL,
+    html_body MEDIUMTEXT NOT NULL,
+    -- Same key twice is dropped, so several API processes can raise the same alert
+    dedupe_key VARCHAR(191) NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    last_error VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP NULL,
+
+    UNIQUE KEY unique_dedupe_key (dedupe_key),
+    INDEX idx_status (status, email_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -211,7 +211,9 @@ END$$
 
 -- ============================================
 -- Function 8: CalculateDeliveryDays
--- Description: Calculate estimated delivery days based on city
+-- Description: Calculate base home-delivery days based on city
+--              (same rules as app/services/delivery.py: 5 days for main
+--              cities, 7 otherwise; low stock adds 3 days at checkout)
 -- Parameters: p_city_id (INT) - City ID
 -- Returns: INT - Estimated delivery days
 -- ============================================
@@ -224,16 +226,16 @@ RETURNS INT
 DETERMINISTIC
 READS SQL DATA
 BEGIN
-    DECLARE delivery_days INT;
+    DECLARE main_city TINYINT DEFAULT NULL;
     
-    -- Get delivery time from location table
-    SELECT delivery_time
-    INTO delivery_days
+    -- Main cities get the faster delivery window
+    SELECT Is_main_city
+    INTO main_city
     FROM location
     WHERE city_id = p_city_id;
     
-    -- Default to 7 days if city not found
-    RETURN COALESCE(delivery_days, 7);
+    -- Unknown cities count as non-main cities
+    RETURN IF(main_city = 1, 5, 7);
 END$$
 
 -- ============================================
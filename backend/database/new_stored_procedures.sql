@@ -357,6 +357,36 @@ BEGIN
     ORDER BY o.order_date DESC;
 END$$
 
+-- ============================================
+-- Procedure: GetOrderSummary
+-- Description: One row per ordered item with product and delivery status
+-- Parameters: p_user_id (INT) - User ID
+-- Returns: Order items, newest order first
+-- ============================================
+DROP PROCEDURE IF EXISTS `GetOrderSummary`$$
+
+CREATE PROCEDURE `GetOrderSummary`(
+    IN p_user_id INT
+)
+BEGIN
+    SELECT
+        o.order_id,
+        o.order_date,
+        o.total_amount,
+        oi.quantity,
+        oi.price,
+        p.product_name,
+        v.variant_name,
+        d.delivery_status
+    FROM orders o
+    JOIN order_item oi ON o.order_id = oi.order_id
+    LEFT JOIN variant v ON oi.variant_id = v.variant_id
+    LEFT JOIN product p ON v.product_id = p.product_id
+    LEFT JOIN delivery d ON o.order_id = d.order_id
+    WHERE o.user_id = p_user_id
+    ORDER BY o.order_date DESC;
+END$$
+
 DELIMITER ;
 
 -- ============================================
@@ -370,4 +400,5 @@ DELIMITER ;
 -- 5. UpdateOrderStatus - Update order delivery status
 -- 6. GetTopSellingProducts - Best sellers analysis (BONUS)
 -- 7. GetCustomerOrderHistory - Complete customer order history (BONUS)
+-- 8. GetOrderSummary - Ordered items with delivery status
 -- ============================================
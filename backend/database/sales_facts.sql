@@ -0,0 +1,129 @@
+-- ============================================
+-- BrightBuy Daily Sales Facts
+-- Pre-aggregated daily rollups read by the analytics query engine
+-- (app/services/sales_analytics.py, GET /analytics/sales/query).
+-- The API upserts them at checkout (app/services/sales_facts.py).
+--
+-- sales_daily_orders      one row per day x payment method x city;
+--                         order-level measures
+-- sales_daily_categories  one row per day x category x payment method x city;
+--                         an order counts once in every category it contains
+-- sales_daily_variants    units and revenue per variant per day (sales
+--                         velocity for the inventory alerts)
+-- sales_daily_customer_sketches
+--                         one distinct-customer sketch per day, split into
+--                         register ranges
+--
+-- city_id 0 means no delivery city (store pickup), category_id 0 means the
+-- product or its category is gone.
+--
+-- Checkout adds each order to one of SALES_FACT_SHARDS rows per key
+-- (shard = order_id % shards), so concurrent checkouts on the same day,
+-- payment method and city don't queue on one row lock. Readers always sum
+-- over shard; the backfill below writes shard 0.
+-- ============================================
+
+USE `brightbuy`;
+
+CREATE TABLE IF NOT EXISTS sales_daily_orders (
+    sale_date DATE NOT NULL,
+    payment_method VARCHAR(30) NOT NULL,
+    city_id INT NOT NULL DEFAULT 0,
+    shard TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    orders INT NOT NULL DEFAULT 0,
+    first_orders INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    items_sold INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (sale_date, payment_method, city_id, shard)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS sales_daily_categories (
+    sale_date DATE NOT NULL,
+    category_id INT NOT NULL DEFAULT 0,
+    payment_method VARCHAR(30) NOT NULL,
+    city_id INT NOT NULL DEFAULT 0,
+    shard TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    orders INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    items_sold INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (sale_date, category_id, payment_method, city_id, shard)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS sales_daily_variants (
+    variant_id INT NOT NULL,
+    sale_date DATE NOT NULL,
+    shard TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (variant_id, sale_date, shard)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+-- One HyperLogLog sketch of the ordering customers per day (4096 one-byte
+-- registers), merged in Python for distinct customers over any range.
+-- Stored as 16 rows of 256 consecutive registers (shard 0 holds registers
+-- 0-255), so concurrent checkouts mostly update different rows.
+-- Not backfilled here: hashing is done in Python, run
+--   python -m app.services.customer_sketches --rebuild
+CREATE TABLE IF NOT EXISTS sales_daily_customer_sketches (
+    sale_date DATE NOT NULL,
+    shard TINYINT UNSIGNED NOT NULL,
+    sketch BLOB NOT NULL,
+    PRIMARY KEY (sale_date, shard)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+-- ============================================
+-- Backfill / rebuild from the existing orders
+-- Safe to re-run; run it with the API stopped so no checkout lands mid-rebuild.
+-- Replaces every shard, so the checkout shards are cleared first.
+-- ============================================
+DELETE FROM sales_daily_orders;
+DELETE FROM sales_daily_categories;
+DELETE FROM sales_daily_variants;
+
+INSERT INTO sales_daily_orders (sale_date, payment_method, city_id, orders, first_orders, revenue, items_sold)
+SELECT
+    DATE(o.order_date),
+    COALESCE(p.payment_method, 'unknown'),
+    COALESCE(a.city_id, 0),
+    COUNT(*),
+    SUM(CASE WHEN o.order_id = f.first_order_id THEN 1 ELSE 0 END),
+    SUM(o.total_amount),
+    SUM(COALESCE(i.items_sold, 0))
+FROM orders o
+JOIN (SELECT user_id, MIN(order_id) AS first_order_id FROM orders GROUP BY user_id) f ON o.user_id = f.user_id
+LEFT JOIN (SELECT order_id, SUM(quantity) AS items_sold FROM order_item GROUP BY order_id) i ON o.order_id = i.order_id
+LEFT JOIN payment p ON o.order_id = p.order_id
+LEFT JOIN delivery d ON o.order_id = d.order_id
+LEFT JOIN address a ON d.address_id = a.address_id
+GROUP BY DATE(o.order_date), COALESCE(p.payment_method, 'unknown'), COALESCE(a.city_id, 0);
+
+INSERT INTO sales_daily_categories (sale_date, category_id, payment_method, city_id, orders, revenue, items_sold)
+SELECT
+    DATE(o.order_date),
+    COALESCE(pr.category_id, 0),
+    COALESCE(p.payment_method, 'unknown'),
+    COALESCE(a.city_id, 0),
+    COUNT(DISTINCT o.order_id),
+    SUM(oi.quantity * oi.price),
+    SUM(oi.quantity)
+FROM order_item oi
+JOIN orders o ON oi.order_id = o.order_id
+LEFT JOIN variant v ON oi.variant_id = v.variant_id
+LEFT JOIN product pr ON v.product_id = pr.product_id
+LEFT JOIN payment p ON o.order_id = p.order_id
+LEFT JOIN delivery d ON o.order_id = d.order_id
+LEFT JOIN address a ON d.address_id = a.address_id
+GROUP BY DATE(o.order_date), COALESCE(pr.category_id, 0), COALESCE(p.payment_method, 'unknown'), COALESCE(a.city_id, 0);
+
+INSERT INTO sales_daily_variants (variant_id, sale_date, quantity, revenue)
+SELECT
+    oi.variant_id,
+    DATE(o.order_date),
+    SUM(oi.quantity),
+    SUM(oi.quantity * oi.price)
+FROM order_item oi
+JOIN orders o ON oi.order_id = o.order_id
+WHERE oi.variant_id IS NOT NULL
+GROUP BY oi.variant_id, DATE(o.order_date);
@@ -1,7 +1,5 @@
-"""
-SQL Trigger: Email Validation
-This trigger validates email addresses before inserting into the User table
-"""
+-- SQL Trigger: Email Validation
+-- This trigger validates email addresses before inserting into the User table
 
 -- Trigger to validate email format before user insertion
 DELIMITER $$
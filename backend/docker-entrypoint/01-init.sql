@@ -94,6 +94,8 @@ CREATE TABLE `user` (
   `address_id` int DEFAULT NULL,
   PRIMARY KEY (`user_id`),
   KEY `user_ibfk_1` (`address_id`),
+  KEY `idx_email` (`email`),
+  KEY `idx_user_name` (`user_name`),
   CONSTRAINT `user_ibfk_1` FOREIGN KEY (`address_id`) REFERENCES `address` (`address_id`) ON DELETE SET NULL
 ) ENGINE=InnoDB AUTO_INCREMENT=24 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
@@ -181,7 +183,7 @@ CREATE TABLE `cart_item` (
   `quantity` int DEFAULT NULL,
   PRIMARY KEY (`cart_item_id`),
   KEY `variant_id` (`variant_id`),
-  KEY `cart_item_ibfk_1` (`cart_id`),
+  KEY `idx_cart_variant` (`cart_id`,`variant_id`),
   CONSTRAINT `cart_item_ibfk_1` FOREIGN KEY (`cart_id`) REFERENCES `cart` (`cart_id`) ON DELETE CASCADE,
   CONSTRAINT `cart_item_ibfk_2` FOREIGN KEY (`variant_id`) REFERENCES `variant` (`variant_id`) ON DELETE SET NULL
 ) ENGINE=InnoDB AUTO_INCREMENT=36 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -196,7 +198,8 @@ CREATE TABLE `orders` (
   `total_amount` decimal(10,2) NOT NULL,
   PRIMARY KEY (`order_id`),
   KEY `cart_id` (`cart_id`),
-  KEY `user_id` (`user_id`),
+  KEY `idx_user_date` (`user_id`,`order_date`),
+  KEY `idx_order_date` (`order_date`),
   CONSTRAINT `orders_ibfk_1` FOREIGN KEY (`cart_id`) REFERENCES `cart` (`cart_id`) ON DELETE RESTRICT ON UPDATE CASCADE,
   CONSTRAINT `orders_ibfk_2` FOREIGN KEY (`user_id`) REFERENCES `user` (`user_id`) ON DELETE RESTRICT ON UPDATE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=18 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -263,6 +266,105 @@ CREATE TABLE `card` (
   CONSTRAINT `card_ibfk_1` FOREIGN KEY (`order_id`) REFERENCES `orders` (`order_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=7 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+-- Table: customer_stats (depends on: user)
+DROP TABLE IF EXISTS `customer_stats`;
+CREATE TABLE `customer_stats` (
+  `user_id` int NOT NULL,
+  `total_orders` int NOT NULL DEFAULT '0',
+  `total_spent` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `first_order_date` datetime DEFAULT NULL,
+  `last_order_date` datetime DEFAULT NULL,
+  `completed_payments` int NOT NULL DEFAULT '0',
+  `pending_payments` int NOT NULL DEFAULT '0',
+  `delivered_orders` int NOT NULL DEFAULT '0',
+  `pending_deliveries` int NOT NULL DEFAULT '0',
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`user_id`),
+  KEY `idx_total_spent` (`total_spent`),
+  CONSTRAINT `customer_stats_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`user_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Table: inventory_alert_subscriptions (depends on: user)
+DROP TABLE IF EXISTS `inventory_alert_subscriptions`;
+CREATE TABLE `inventory_alert_subscriptions` (
+  `subscription_id` int NOT NULL AUTO_INCREMENT,
+  `user_id` int NOT NULL,
+  `email` varchar(255) NOT NULL,
+  `min_level` varchar(20) NOT NULL DEFAULT 'CRITICAL',
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`subscription_id`),
+  UNIQUE KEY `unique_user` (`user_id`),
+  CONSTRAINT `inventory_alert_subscriptions_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`user_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Table: email_outbox (no dependencies)
+DROP TABLE IF EXISTS `email_outbox`;
+CREATE TABLE `email_outbox` (
+  `email_id` bigint NOT NULL AUTO_INCREMENT,
+  `to_email` varchar(255) NOT NULL,
+  `subject` varchar(255) NOT NULL,
+  `text_body` text NOT NULL,
+  `html_body` mediumtext NOT NULL,
+  `dedupe_key` varchar(191) DEFAULT NULL,
+  `status` varchar(10) NOT NULL DEFAULT 'pending',
+  `attempts` int NOT NULL DEFAULT '0',
+  `last_error` varchar(500) DEFAULT NULL,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `sent_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`email_id`),
+  UNIQUE KEY `unique_dedupe_key` (`dedupe_key`),
+  KEY `idx_status` (`status`,`email_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Table: sales_daily_orders (rollup, no dependencies)
+DROP TABLE IF EXISTS `sales_daily_orders`;
+CREATE TABLE `sales_daily_orders` (
+  `sale_date` date NOT NULL,
+  `payment_method` varchar(30) NOT NULL,
+  `city_id` int NOT NULL DEFAULT '0',
+  `shard` tinyint unsigned NOT NULL DEFAULT '0',
+  `orders` int NOT NULL DEFAULT '0',
+  `first_orders` int NOT NULL DEFAULT '0',
+  `revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `items_sold` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`sale_date`,`payment_method`,`city_id`,`shard`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Table: sales_daily_categories (rollup, no dependencies)
+DROP TABLE IF EXISTS `sales_daily_categories`;
+CREATE TABLE `sales_daily_categories` (
+  `sale_date` date NOT NULL,
+  `category_id` int NOT NULL DEFAULT '0',
+  `payment_method` varchar(30) NOT NULL,
+  `city_id` int NOT NULL DEFAULT '0',
+  `shard` tinyint unsigned NOT NULL DEFAULT '0',
+  `orders` int NOT NULL DEFAULT '0',
+  `revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `items_sold` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`sale_date`,`category_id`,`payment_method`,`city_id`,`shard`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Table: sales_daily_variants (rollup, no dependencies)
+DROP TABLE IF EXISTS `sales_daily_variants`;
+CREATE TABLE `sales_daily_variants` (
+  `variant_id` int NOT NULL,
+  `sale_date` date NOT NULL,
+  `shard` tinyint unsigned NOT NULL DEFAULT '0',
+  `quantity` int NOT NULL DEFAULT '0',
+  `revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`variant_id`,`sale_date`,`shard`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Table: sales_daily_customer_sketches (rollup, no dependencies)
+-- Filled by checkout; rebuild with python -m app.services.customer_sketches --rebuild
+DROP TABLE IF EXISTS `sales_daily_customer_sketches`;
+CREATE TABLE `sales_daily_customer_sketches` (
+  `sale_date` date NOT NULL,
+  `shard` tinyint unsigned NOT NULL,
+  `sketch` blob NOT NULL,
+  PRIMARY KEY (`sale_date`,`shard`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 SET FOREIGN_KEY_CHECKS=1;
 
 -- ============================================
@@ -821,6 +923,73 @@ INSERT INTO `variant_attribute_value` (`id`, `variant_id`, `attribute_id`, `valu
   (327, 82, 3, '2025'),
   (328, 82, 4, '15 months');
 
+-- Backfill customer_stats from the order data above
+INSERT INTO `customer_stats` (
+  `user_id`, `total_orders`, `total_spent`, `first_order_date`, `last_order_date`,
+  `completed_payments`, `pending_payments`, `delivered_orders`, `pending_deliveries`
+)
+SELECT
+  o.user_id,
+  COUNT(DISTINCT o.order_id),
+  COALESCE(SUM(o.total_amount), 0),
+  MIN(o.order_date),
+  MAX(o.order_date),
+  SUM(CASE WHEN p.payment_status = 'completed' THEN 1 ELSE 0 END),
+  SUM(CASE WHEN p.payment_status = 'pending' THEN 1 ELSE 0 END),
+  SUM(CASE WHEN d.delivery_status = 'delivered' THEN 1 ELSE 0 END),
+  SUM(CASE WHEN d.delivery_status = 'pending' THEN 1 ELSE 0 END)
+FROM orders o
+LEFT JOIN payment p ON o.order_id = p.order_id
+LEFT JOIN delivery d ON o.order_id = d.order_id
+GROUP BY o.user_id;
+
+-- Backfill the daily sales rollups from the order data above
+INSERT INTO sales_daily_orders (sale_date, payment_method, city_id, orders, first_orders, revenue, items_sold)
+SELECT
+    DATE(o.order_date),
+    COALESCE(p.payment_method, 'unknown'),
+    COALESCE(a.city_id, 0),
+    COUNT(*),
+    SUM(CASE WHEN o.order_id = f.first_order_id THEN 1 ELSE 0 END),
+    SUM(o.total_amount),
+    SUM(COALESCE(i.items_sold, 0))
+FROM orders o
+JOIN (SELECT user_id, MIN(order_id) AS first_order_id FROM orders GROUP BY user_id) f ON o.user_id = f.user_id
+LEFT JOIN (SELECT order_id, SUM(quantity) AS items_sold FROM order_item GROUP BY order_id) i ON o.order_id = i.order_id
+LEFT JOIN payment p ON o.order_id = p.order_id
+LEFT JOIN delivery d ON o.order_id = d.order_id
+LEFT JOIN address a ON d.address_id = a.address_id
+GROUP BY DATE(o.order_date), COALESCE(p.payment_method, 'unknown'), COALESCE(a.city_id, 0);
+
+INSERT INTO sales_daily_categories (sale_date, category_id, payment_method, city_id, orders, revenue, items_sold)
+SELECT
+    DATE(o.order_date),
+    COALESCE(pr.category_id, 0),
+    COALESCE(p.payment_method, 'unknown'),
+    COALESCE(a.city_id, 0),
+    COUNT(DISTINCT o.order_id),
+    SUM(oi.quantity * oi.price),
+    SUM(oi.quantity)
+FROM order_item oi
+JOIN orders o ON oi.order_id = o.order_id
+LEFT JOIN variant v ON oi.variant_id = v.variant_id
+LEFT JOIN product pr ON v.product_id = pr.product_id
+LEFT JOIN payment p ON o.order_id = p.order_id
+LEFT JOIN delivery d ON o.order_id = d.order_id
+LEFT JOIN address a ON d.address_id = a.address_id
+GROUP BY DATE(o.order_date), COALESCE(pr.category_id, 0), COALESCE(p.payment_method, 'unknown'), COALESCE(a.city_id, 0);
+
+INSERT INTO sales_daily_variants (variant_id, sale_date, quantity, revenue)
+SELECT
+    oi.variant_id,
+    DATE(o.order_date),
+    SUM(oi.quantity),
+    SUM(oi.quantity * oi.price)
+FROM order_item oi
+JOIN orders o ON oi.order_id = o.order_id
+WHERE oi.variant_id IS NOT NULL
+GROUP BY oi.variant_id, DATE(o.order_date);
+
 -- ============================================
 -- STORED PROCEDURES (DEFINER removed)
 -- ============================================
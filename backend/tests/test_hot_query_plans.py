@@ -0,0 +1,96 @@
+"""
+Tests for database/index_advisor.py: plan_problems on canned EXPLAIN rows,
+the hot query list against the route code, and the hot query plans against
+a seeded database (skipped when none is reachable).
+Run from backend/: python -m pytest -q
+"""
+import sys
+from pathlib import Path
+
+import mysql.connector
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "database"))
+
+from index_advisor import (  # noqa: E402
+    DB_CONFIG,
+    HOT_QUERIES,
+    check_hot_queries,
+    hot_query_statements,
+    plan_problems,
+)
+
+
+def row(table, type_, rows=1, key=None, extra=None):
+    return {"table": table, "type": type_, "rows": rows, "key": key, "Extra": extra}
+
+
+def test_plan_problems_flags_scans_and_sorts():
+    plan = [
+        row("o", "ALL", rows=5000, extra="Using where; Using temporary; Using filesort"),
+        row("oi", "index", rows=800, key="PRIMARY"),
+        row("v", "eq_ref", key="PRIMARY"),
+    ]
+    assert plan_problems(plan) == [
+        "full scan of o (5000 rows)",
+        "filesort on o",
+        "temporary table for o",
+        "full index scan of oi (800 rows)",
+    ]
+
+
+def test_plan_problems_passes_index_lookups():
+    plan = [
+        row("orders", "ref", rows=12, key="idx_orders_user_date", extra="Backward index scan"),
+        row("order_item", "ref", rows=3, key="order_id"),
+        row("user", "index_merge", rows=2, key="email,user_name", extra="Using union(email,user_name)"),
+    ]
+    assert plan_problems(plan) == []
+
+
+def test_plan_problems_min_rows_and_table_filter():
+    plan = [
+        row("category", "ALL", rows=12),
+        row("<derived2>", "ALL", rows=9000),
+        row("ci", "ref", rows=4, key="cart_id", extra="Using temporary"),
+    ]
+    # Small tables and derived tables are not worth an index; a temporary table still is
+    assert plan_problems(plan, min_rows=100) == ["temporary table for ci"]
+    # With a table given only that table counts, and its temporary table is the join's business
+    assert plan_problems(plan, table="category") == ["full scan of category (12 rows)"]
+    assert plan_problems(plan, table="ci") == []
+
+
+def test_hot_queries_are_found_in_the_routes():
+    resolved = hot_query_statements()
+    assert len(resolved) == len(HOT_QUERIES)
+    missing = [hot["query"] for hot in resolved if hot["sql"] is None]
+    assert not missing, f"hot queries no longer issued by their module: {missing}"
+
+
+def test_check_hot_queries_fails_on_missing_statement():
+    assert check_hot_queries(None, statements=[]) == [
+        {"query": name, "source": module, "problems": [f"no statement in {module} matches any more"]}
+        for name, module, _, _ in HOT_QUERIES
+    ]
+
+
+@pytest.fixture
+def seeded_cursor():
+    try:
+        connection = mysql.connector.connect(**dict(DB_CONFIG, raise_on_warnings=False, connection_timeout=3))
+    except mysql.connector.Error as err:
+        pytest.skip(f"no database reachable: {err}")
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT COUNT(*) AS n FROM orders")
+        if not cursor.fetchone()["n"]:
+            pytest.skip("database is not seeded")
+        yield cursor
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_hot_query_plans_use_indexes(seeded_cursor):
+    assert check_hot_queries(seeded_cursor) == []
@@ -0,0 +1,58 @@
+"""
+Tests for the index migrations in database/install_objects.py: clauses
+already applied are dropped from an ALTER TABLE before it runs, and the
+rest stays one statement.
+Run from backend/: python -m pytest -q
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "database"))
+
+from install_objects import pending_index_alter  # noqa: E402
+
+MOVE_ORDERS_KEY = """ALTER TABLE orders
+    ADD INDEX idx_user_date (user_id, order_date),
+    DROP INDEX user_id"""
+
+
+class IndexCursor:
+    """information_schema.STATISTICS for a fixed set of index names"""
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+
+    def fetchall(self):
+        return [(name,) for name in self.indexes]
+
+
+def test_nothing_applied_keeps_every_clause():
+    cursor = IndexCursor(["primary", "user_id"])
+    assert pending_index_alter(cursor, MOVE_ORDERS_KEY) == (
+        "ALTER TABLE `orders`\n    ADD INDEX idx_user_date (user_id, order_date),\n    DROP INDEX user_id"
+    )
+
+
+def test_fully_applied_alter_is_skipped():
+    assert pending_index_alter(IndexCursor(["primary", "idx_user_date"]), MOVE_ORDERS_KEY) is None
+
+
+def test_partly_applied_alter_keeps_the_rest():
+    # The index exists (created by 01-init.sql) but the old key was never dropped
+    cursor = IndexCursor(["primary", "idx_user_date", "user_id"])
+    assert pending_index_alter(cursor, MOVE_ORDERS_KEY) == "ALTER TABLE `orders`\n    DROP INDEX user_id"
+
+
+def test_other_statements_run_unchanged():
+    cursor = IndexCursor([])
+    for statement in (
+        "ALTER TABLE orders ADD COLUMN note VARCHAR(20), ADD INDEX idx_note (note)",
+        "CREATE TABLE IF NOT EXISTS t (id INT PRIMARY KEY)",
+        "INSERT INTO t (id) VALUES (1)",
+    ):
+        assert pending_index_alter(cursor, statement) == statement
+    assert cursor.queries == 0
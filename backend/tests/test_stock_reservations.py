@@ -0,0 +1,176 @@
+"""
+Concurrency tests for app/services/stock_reservations.py.
+Threads play customers hitting POST /orders/reserve and /orders/checkout at
+once; the database is a locked dict with the checkout's conditional
+decrement. Run from backend/: python -m pytest -q
+"""
+import random
+import threading
+
+import pytest
+
+from app.services.stock import StockService
+from app.services.stock_reservations import (
+    InsufficientStock,
+    ReservationLimitExceeded,
+    ReservationManager,
+)
+
+VARIANTS = (1, 2, 3)
+
+
+class FakeStockTable:
+    """variant.quantity rows with UPDATE ... WHERE quantity >= %s semantics"""
+
+    def __init__(self, quantities):
+        self.quantities = dict(quantities)
+        self.lock = threading.Lock()
+
+    def decrement(self, items) -> bool:
+        with self.lock:
+            if any(self.quantities[v] < q for v, q in items.items()):
+                return False
+            for variant_id, quantity in items.items():
+                self.quantities[variant_id] -= quantity
+            return True
+
+
+def make_manager(quantities, max_units=50, shards=4):
+    stock = StockService()
+    stock.prime([{"variant_id": v, "quantity": q} for v, q in quantities.items()])
+    return stock, ReservationManager(stock, shards=shards, max_units=max_units)
+
+
+def checkout(manager, stock, table, owner, items, reservation_id=None):
+    """The order route's sequence: reuse or reserve, decrement, commit, confirm"""
+    reservation = manager.get(reservation_id) if reservation_id else None
+    if not (reservation and reservation.owner == owner and reservation.items == items):
+        reservation = manager.reserve(None, items, owner=owner)
+    if not table.decrement(reservation.items):
+        manager.release(reservation.reservation_id)
+        return {}
+    manager.confirm(reservation.reservation_id)
+    for variant_id, quantity in reservation.items.items():
+        stock.adjust(variant_id, -quantity)
+    return reservation.items
+
+
+def assert_consistent(manager, stock, table, initial, sold):
+    for variant_id in VARIANTS:
+        remaining = table.quantities[variant_id]
+        assert remaining >= 0
+        assert sold[variant_id] + remaining == initial[variant_id]
+        assert stock.get_availability(None, [variant_id])[variant_id] == remaining
+
+        # Units held by the counters are exactly those of live reservations
+        live = sum(r.items.get(variant_id, 0) for r in manager._reservations.values())
+        counter = manager._counters[variant_id]
+        assert sum(counter.held) == live
+        assert counter.available() == max(remaining - live, 0)
+
+    owners = [r.owner for r in manager._reservations.values()]
+    assert len(owners) == len(set(owners))
+    assert set(manager._by_owner.values()) == set(manager._reservations)
+
+
+def test_concurrent_reserve_and_checkout_never_oversells():
+    initial = {1: 60, 2: 40, 3: 25}
+    stock, manager = make_manager(initial)
+    table = FakeStockTable(initial)
+    sold = {v: 0 for v in VARIANTS}
+    sold_lock = threading.Lock()
+    errors = []
+    barrier = threading.Barrier(16)
+
+    def customer(owner):
+        rng = random.Random(owner)
+        try:
+            barrier.wait()
+            for _ in range(300):
+                items = {v: rng.randint(1, 3) for v in rng.sample(VARIANTS, rng.randint(1, 3))}
+                try:
+                    if rng.random() < 0.5:
+                        manager.reserve(None, items, owner=owner)
+                        continue
+                    reservation_id = manager._by_owner.get(owner) if rng.random() < 0.5 else None
+                    bought = checkout(manager, stock, table, owner, items, reservation_id)
+                except InsufficientStock:
+                    continue
+                with sold_lock:
+                    for variant_id, quantity in bought.items():
+                        sold[variant_id] += quantity
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=customer, args=(owner,)) for owner in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert_consistent(manager, stock, table, initial, sold)
+
+    for reservation_id in list(manager._reservations):
+        manager.release(reservation_id)
+    for variant_id in VARIANTS:
+        assert manager._counters[variant_id].available() == table.quantities[variant_id]
+
+
+def test_repeated_reserve_replaces_previous_reservation():
+    stock, manager = make_manager({1: 10})
+
+    first = manager.reserve(None, {1: 4}, owner=7)
+    for _ in range(20):
+        latest = manager.reserve(None, {1: 4}, owner=7)
+
+    assert manager.get(first.reservation_id) is None
+    assert list(manager._reservations) == [latest.reservation_id]
+    assert manager._counters[1].available() == 6
+    # Another customer can still reserve what is left
+    manager.reserve(None, {1: 6}, owner=8)
+
+
+def test_concurrent_reserve_by_one_owner_keeps_one_reservation():
+    stock, manager = make_manager({1: 100})
+    barrier = threading.Barrier(8)
+
+    def reserve():
+        barrier.wait()
+        for _ in range(200):
+            manager.reserve(None, {1: 5}, owner=3)
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(manager._reservations) == 1
+    assert sum(manager._counters[1].held) == 5
+    assert manager._counters[1].available() == 95
+
+
+def test_reservation_is_capped_per_owner():
+    stock, manager = make_manager({1: 100, 2: 100}, max_units=10)
+
+    with pytest.raises(ReservationLimitExceeded):
+        manager.reserve(None, {1: 6, 2: 5}, owner=1)
+    assert manager._counters.get(1) is None or manager._counters[1].available() == 100
+
+    manager.reserve(None, {1: 5, 2: 5}, owner=1)
+    # Internal callers without an owner are not capped
+    manager.reserve(None, {1: 50})
+
+
+def test_release_checks_owner():
+    stock, manager = make_manager({1: 10})
+    reservation = manager.reserve(None, {1: 3}, owner=1)
+
+    assert manager.release(reservation.reservation_id, owner=2) is False
+    assert manager.get(reservation.reservation_id) is reservation
+
+    assert manager.release(reservation.reservation_id, owner=1) is True
+    assert manager.release(reservation.reservation_id, owner=1) is False
+    assert manager._counters[1].available() == 10
+    assert not manager._by_owner
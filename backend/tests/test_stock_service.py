@@ -0,0 +1,74 @@
+"""
+Tests for the reconcile pass in app/services/stock.py: write-throughs made
+while its SELECT is running must survive the swap.
+Run from backend/: python -m pytest -q
+"""
+import sys
+import types
+
+from app.services.stock import StockService
+
+
+class FakeConnection:
+    """Returns `rows` for the reconcile SELECT after running `during_read`"""
+
+    def __init__(self, rows, during_read=None):
+        self.rows = rows
+        self.during_read = during_read
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, sql, params=None):
+        if self.during_read:
+            self.during_read()
+
+    def fetchall(self):
+        return [{"variant_id": v, "quantity": q} for v, q in self.rows.items()]
+
+    def close(self):
+        pass
+
+
+def reconcile(monkeypatch, stock, rows, during_read=None):
+    database = types.ModuleType("app.database")
+    database.get_connection = lambda: FakeConnection(rows, during_read)
+    monkeypatch.setitem(sys.modules, "app.database", database)
+    stock.reconcile()
+
+
+def test_reconcile_keeps_write_throughs_made_during_the_read(monkeypatch):
+    stock = StockService()
+    stock.prime([{"variant_id": 1, "quantity": 10}, {"variant_id": 2, "quantity": 5}])
+    notified = []
+    stock.subscribe(lambda variant_id, quantity: notified.append((variant_id, quantity)))
+
+    def checkout_and_restock():
+        stock.adjust(1, -3)
+        stock.set_quantity(2, 20)
+
+    # The rows were read before the writes above committed
+    reconcile(monkeypatch, stock, {1: 10, 2: 5, 3: 7}, during_read=checkout_and_restock)
+
+    assert stock.snapshot() == {1: 7, 2: 20, 3: 7}
+    # Only the writes notify; the first reconcile doesn't announce new variants
+    assert notified == [(1, 7), (2, 20)]
+
+
+def test_reconcile_corrects_variants_not_written_during_the_read(monkeypatch):
+    stock = StockService()
+    stock.prime([{"variant_id": 1, "quantity": 10}, {"variant_id": 2, "quantity": 5}])
+    stock.adjust(1, -2)
+
+    # Writes before the read started are covered by the rows
+    reconcile(monkeypatch, stock, {1: 6})
+
+    assert stock.snapshot() == {1: 6}
+    assert not stock._written
+
+
+def test_reconcile_keeps_variant_removed_during_the_read_removed(monkeypatch):
+    stock = StockService()
+    stock.prime([{"variant_id": 1, "quantity": 10}])
+    reconcile(monkeypatch, stock, {1: 10}, during_read=lambda: stock.remove(1))
+    assert stock.snapshot() == {}